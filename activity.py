@@ -0,0 +1,167 @@
+import argparse
+import datetime
+import logging
+import os
+import threading
+import time
+
+import db
+import migrations
+
+# ==========================================
+# 📈 FAOLLIK: ROLLUP VA LOGLARNI SIQISH
+# ==========================================
+# Har bir log yozuvi bilan bir tranzaksiyada kunlik hisoblagichlar ham
+# yangilanadi: activity_daily (kun, amal) va activity_users (kun, user).
+# Admin ko'rsatkichlari faqat shu kichik jadvallardan o'qiladi. Eski xom
+# loglar qismlab o'chiriladi va bo'sh sahifalar incremental_vacuum bilan
+# faylga qaytariladi — baza cheksiz o'smaydi.
+
+RETENTION_DAYS = int(os.environ.get("ZUKKO_LOG_RETENTION_DAYS", "90"))
+COMPACT_BATCH = 5000
+VACUUM_PAGES = 2000         # bir qadamda qaytariladigan sahifalar
+MAINTENANCE_INTERVAL = 6 * 3600
+MAINTENANCE_DELAY = 15 * 60     # ilova ishga tushishi bilan emas — keyinroq
+CHAT_PREFIX = "Chat: "
+# Admin panelidagi "oxirgi loglar" (idx_logs_time)
+RECENT_LOGS_SQL = "SELECT * FROM logs ORDER BY time DESC LIMIT 100"
+
+log = logging.getLogger(__name__)
+
+
+def _now():
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def add_log(username, action, when=None):
+    when = when or _now()
+    day = when[:10]
+    with db.transaction() as c:
+        c.execute('INSERT INTO logs(username, action, time) VALUES (?,?,?)',
+                  (username, action, when))
+        c.execute('''INSERT INTO activity_daily(day, action, events) VALUES (?,?,1)
+                     ON CONFLICT(day, action) DO UPDATE SET events = events + 1''',
+                  (day, action))
+        c.execute('''INSERT INTO activity_users(day, username, events) VALUES (?,?,1)
+                     ON CONFLICT(day, username) DO UPDATE SET events = events + 1''',
+                  (day, username))
+
+
+def _since(days):
+    """Bugunni ham qo'shib, oxirgi `days` kunning birinchi kuni."""
+    start = datetime.date.today() - datetime.timedelta(days=days - 1)
+    return start.isoformat()
+
+
+def events_on(day=None):
+    day = day or datetime.date.today().isoformat()
+    return db.query_one('SELECT COALESCE(SUM(events), 0) FROM activity_daily WHERE day = ?',
+                        (day,))[0]
+
+
+def daily_active_users(days=14):
+    """[(kun, foydalanuvchilar, amallar)] — eskidan yangiga."""
+    return db.query('''SELECT day, COUNT(*) AS users, SUM(events) AS events
+                       FROM activity_users WHERE day >= ?
+                       GROUP BY day ORDER BY day''', (_since(days),))
+
+
+def active_users(days=7):
+    """Oxirgi `days` kundagi noyob foydalanuvchilar (WAU/MAU)."""
+    return db.query_one('''SELECT COUNT(DISTINCT username) FROM activity_users
+                           WHERE day >= ?''', (_since(days),))[0]
+
+
+def messages_per_mentor(days=7):
+    """[(mentor, xabarlar)] — ko'pdan kamga."""
+    return db.query('''SELECT substr(action, ?) AS mentor, SUM(events) AS messages
+                       FROM activity_daily
+                       WHERE day >= ? AND action LIKE ? || '%'
+                       GROUP BY action ORDER BY messages DESC''',
+                    (len(CHAT_PREFIX) + 1, _since(days), CHAT_PREFIX))
+
+
+# ==========================================
+# 🧹 ESKI LOGLARNI SIQISH
+# ==========================================
+def _incremental_vacuum_enabled():
+    with db.connection() as conn:
+        return conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+def convert():
+    """Eski (auto_vacuum'siz) faylni INCREMENTAL'ga o'tkazadi — to'liq VACUUM.
+
+    Butun bazani qayta yozadi va shu vaqt yozish qulfini ushlaydi, shuning
+    uchun faqat qo'lda, ilova to'xtatilganda: python activity.py --convert
+    """
+    if _incremental_vacuum_enabled():
+        return False
+    with db.connection() as conn:
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+    return True
+
+
+def compact(retention_days=RETENTION_DAYS, batch_size=COMPACT_BATCH, pause=0.05):
+    """`retention_days` dan eski xom loglarni qismlab o'chiradi.
+
+    Har qism alohida qisqa tranzaksiya — chat yozuvlari uzoq kutmaydi.
+    Rollup jadvallari tegilmaydi. O'chirilgan qatorlar sonini qaytaradi.
+    """
+    cutoff = (datetime.date.today() - datetime.timedelta(days=retention_days)).isoformat()
+    # Eski fayllarda bo'sh sahifalar faqat qayta ishlatiladi (fayl kichraymaydi)
+    # — VACUUM bu yerda emas, convert() orqali
+    incremental = _incremental_vacuum_enabled()
+    removed = 0
+    while True:
+        with db.transaction() as c:
+            n = c.execute('''DELETE FROM logs WHERE rowid IN (
+                                 SELECT rowid FROM logs WHERE time < ?
+                                 ORDER BY time LIMIT ?)''',
+                          (cutoff, batch_size)).rowcount
+        removed += n
+        if incremental:
+            with db.connection() as conn:
+                # execute() bu pragmani bir marta qadamlaydi (1 sahifa) —
+                # executescript oxirigacha bajaradi
+                conn.executescript(f"PRAGMA incremental_vacuum({VACUUM_PAGES});")
+        if n < batch_size:
+            break
+        time.sleep(pause)
+    return removed
+
+
+def start_maintenance(interval=MAINTENANCE_INTERVAL, retention_days=RETENTION_DAYS,
+                      delay=MAINTENANCE_DELAY):
+    """Fon thread'i: `delay` soniyadan keyin, so'ng har `interval` soniyada compact()."""
+    def run():
+        time.sleep(delay)
+        while True:
+            try:
+                removed = compact(retention_days)
+                if removed:
+                    log.info("%d ta eski log o'chirildi", removed)
+            except Exception:
+                log.exception("Loglarni siqishda xato")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, name="zukko-log-compact", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    # Qo'lda ishga tushirish (cron): python activity.py --days 30
+    # Eski faylni bir marta o'tkazish (ilova to'xtatilgan holda): --convert
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default=db.DB_PATH)
+    parser.add_argument("--days", type=int, default=RETENTION_DAYS)
+    parser.add_argument("--convert", action="store_true",
+                        help="auto_vacuum=INCREMENTAL uchun bir martalik to'liq VACUUM")
+    args = parser.parse_args()
+    db.configure(args.db)
+    migrations.ensure_schema()
+    if args.convert:
+        print("auto_vacuum=INCREMENTAL yoqildi" if convert() else "allaqachon INCREMENTAL")
+    print(f"{compact(args.days)} ta log o'chirildi")
@@ -1,14 +1,33 @@
 import streamlit as st
-import io
+import functools
+import ipaddress
+import os
 import random
 import time
-import json
-from openai import OpenAI
-import sqlite3
-import hashlib
+import db
+import migrations
+import events
+import gamification
+import ranking
+import stats_cache
+import streaming
+import llm
+import context
+import response_cache
+import tts
+import audio_cache
+import notes
+import activity
+import quiz
+import users
+import passwords
+import theme
+import gateway
+import usage
+import metrics
+import chats
 import datetime
 import pandas as pd
-from gtts import gTTS
 
 # ⚠️ Streamlit Secrets
 try:
@@ -18,602 +37,251 @@ except:
     st.stop()
 
 MODEL_NAME = "llama-3.3-70b-versatile"
+LLM_BASE_URL = os.environ.get("ZUKKO_LLM_BASE_URL", llm.DEFAULT_BASE_URL)
+# Ilova oldidagi ishonchli reverse proxy'lar soni (nginx va h.k.); 0 — proxy yo'q.
+# Proxy ortida 0 qoldirilsa mijoz IP'si noma'lum (proxy manzili ko'rinadi) —
+# login limiterining IP chelagi o'chadi, faqat username chelagi qoladi
+TRUSTED_PROXIES = int(os.environ.get("ZUKKO_TRUSTED_PROXIES", "0"))
 
 st.set_page_config(page_title="Zukko AI", page_icon="⚡", layout="wide")
 
 # ==========================================
 # 🗄️ BAZA (BACKEND)
 # ==========================================
-def init_db():
-    conn = sqlite3.connect('zukko_school.db')
-    c = conn.cursor()
-
-    # Asosiy users jadvali
-    c.execute('''CREATE TABLE IF NOT EXISTS users
-                 (username TEXT PRIMARY KEY, password TEXT, role TEXT)''')
-
-    # Yangi ustunlarni qo'shish (agar mavjud bo'lmasa)
-    existing = [row[1] for row in c.execute("PRAGMA table_info(users)").fetchall()]
-
-    new_columns = [
-        ("xp", "INTEGER DEFAULT 0"),
-        ("streak", "INTEGER DEFAULT 0"),
-        ("last_active", "TEXT DEFAULT ''"),
-        ("level", "INTEGER DEFAULT 1"),
-        ("badges", "TEXT DEFAULT '[]'"),
-        ("total_messages", "INTEGER DEFAULT 0"),
-        ("joined", "TEXT DEFAULT ''"),
-    ]
-    for col_name, col_type in new_columns:
-        if col_name not in existing:
-            c.execute(f"ALTER TABLE users ADD COLUMN {col_name} {col_type}")
-
-    # Logs jadvali
-    c.execute('''CREATE TABLE IF NOT EXISTS logs
-                 (username TEXT, action TEXT, time TEXT)''')
-
-    # Quiz scores jadvali
-    c.execute('''CREATE TABLE IF NOT EXISTS quiz_scores
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  username TEXT, subject TEXT, score INTEGER,
-                  total INTEGER, time TEXT)''')
-
-    # Notes jadvali
-    c.execute('''CREATE TABLE IF NOT EXISTS notes
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  username TEXT, title TEXT, content TEXT,
-                  subject TEXT, time TEXT)''')
-
-    conn.commit()
-    conn.close()
-
-def make_hashes(password):
-    return hashlib.sha256(str.encode(password)).hexdigest()
+def read_df(sql, params=()):
+    with db.connection() as conn:
+        cur = conn.execute(sql, params)
+        columns = [d[0] for d in cur.description]
+        return pd.DataFrame([tuple(r) for r in cur.fetchall()], columns=columns)
 
 def add_user(username, password, role="student"):
-    username = username.lower().strip()
-    conn = sqlite3.connect('zukko_school.db')
-    c = conn.cursor()
-    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     try:
-        c.execute('''INSERT INTO users(username, password, role, xp, streak,
-                     last_active, level, badges, total_messages, joined)
-                     VALUES (?,?,?,?,?,?,?,?,?,?)''',
-                  (username, make_hashes(password), role, 0, 0, now, 1, '[]', 0, now))
-        conn.commit()
-        return True
-    except sqlite3.IntegrityError:
-        return False
+        return users.create_user(username, password, role, pool=get_verify_pool())
+    except passwords.LoginBusy:
+        raise
     except Exception as e:
         st.error(f"Xatolik: {e}")
         return False
-    finally:
-        conn.close()
+
+# Parol tekshirish — chegaralangan hovuzda, IP va username bo'yicha limit
+@st.cache_resource
+def get_verify_pool():
+    return passwords.VerifyPool()
+
+@st.cache_resource
+def get_login_limiter():
+    return passwords.LoginLimiter()
+
+def client_ip():
+    """Mijoz IP'si; aniqlab bo'lmasa None (limiter IP chelagini o'tkazadi)."""
+    if TRUSTED_PROXIES:
+        # X-Forwarded-For boshini mijozning o'zi yozadi — faqat ishonchli proxy
+        # qo'shgan oxirgi yozuvlardan olamiz (1 ta proxy — oxirgi element)
+        hops = [h.strip() for h in st.context.headers.get("X-Forwarded-For", "").split(",")]
+        hops = [h for h in hops if h]
+        if len(hops) >= TRUSTED_PROXIES:
+            return hops[-TRUSTED_PROXIES]
+        return None
+    ip = getattr(st.context, "ip_address", None)
+    try:
+        # Lokal proxy (TRUSTED_PROXIES=0) ortida hamma 127.0.0.1 bo'lib ko'rinadi
+        if not ip or ipaddress.ip_address(ip).is_loopback:
+            return None
+    except ValueError:
+        return None
+    return ip
+
+# Foydalanuvchiga bog'liq sessiya holati: chat va sahifalash kursorlari.
+# Chiqishda va boshqa foydalanuvchi kirganda tozalanadi — aks holda yangi
+# foydalanuvchi oldingisining kursoridan (o'rtadagi sahifadan) boshlaydi.
+USER_STATE_KEYS = ("chat", "notes_cursors", "au_signature", "au_cursors")
+
+def reset_user_state():
+    for key in USER_STATE_KEYS:
+        st.session_state.pop(key, None)
 
 def login_user(username, password):
-    username = username.lower().strip()
-    conn = sqlite3.connect('zukko_school.db')
-    c = conn.cursor()
-    c.execute('SELECT * FROM users WHERE username =? AND password = ?',
-              (username, make_hashes(password)))
-    data = c.fetchall()
-    conn.close()
-    return data
-
-def add_log(username, action):
-    conn = sqlite3.connect('zukko_school.db')
-    c = conn.cursor()
-    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    c.execute('INSERT INTO logs(username, action, time) VALUES (?,?,?)',
-              (username, action, now))
-    conn.commit()
-    conn.close()
-
-def view_all_users():
-    conn = sqlite3.connect('zukko_school.db')
-    c = conn.cursor()
-    existing = [row[1] for row in c.execute("PRAGMA table_info(users)").fetchall()]
-    if "xp" in existing:
-        df = pd.read_sql_query(
-            "SELECT username, role, xp, level, streak, total_messages, joined FROM users",
-            conn)
-    else:
-        df = pd.read_sql_query("SELECT username, role FROM users", conn)
-    conn.close()
-    return df
+    return users.authenticate(username, password, get_verify_pool())
 
 def view_logs():
-    conn = sqlite3.connect('zukko_school.db')
-    df = pd.read_sql_query("SELECT * FROM logs ORDER BY time DESC LIMIT 100", conn)
-    conn.close()
-    return df
+    return read_df(activity.RECENT_LOGS_SQL)
 
 # ==========================================
 # 🏆 XP VA DARAJALAR TIZIMI
 # ==========================================
-def add_xp(username, amount):
-    conn = sqlite3.connect('zukko_school.db')
-    c = conn.cursor()
-    try:
-        c.execute('UPDATE users SET xp = COALESCE(xp,0) + ?, total_messages = COALESCE(total_messages,0) + 1 WHERE username = ?',
-                  (amount, username))
-        c.execute('SELECT xp FROM users WHERE username = ?', (username,))
-        row = c.fetchone()
-        if row:
-            xp = row[0] if row[0] else 0
-            new_level = max(1, xp // 100 + 1)
-            c.execute('UPDATE users SET level = ? WHERE username = ?',
-                      (new_level, username))
-        conn.commit()
-    except Exception as e:
-        pass
-    finally:
-        conn.close()
-
 def get_user_stats(username):
-    conn = sqlite3.connect('zukko_school.db')
-    c = conn.cursor()
-    try:
-        c.execute('''SELECT xp, streak, level, badges, total_messages, joined
-                     FROM users WHERE username = ?''', (username,))
-        row = c.fetchone()
-        conn.close()
-        if row:
-            return {
-                "xp": row[0] if row[0] else 0,
-                "streak": row[1] if row[1] else 0,
-                "level": row[2] if row[2] else 1,
-                "badges": json.loads(row[3]) if row[3] and row[3] != '' else [],
-                "total_messages": row[4] if row[4] else 0,
-                "joined": row[5] if row[5] else ""
-            }
-    except Exception:
-        conn.close()
-    return {"xp": 0, "streak": 0, "level": 1, "badges": [],
-            "total_messages": 0, "joined": ""}
-
-def update_streak(username):
-    conn = sqlite3.connect('zukko_school.db')
-    c = conn.cursor()
-    now = datetime.datetime.now()
-    now_str = now.strftime("%Y-%m-%d %H:%M:%S")
-    try:
-        c.execute('SELECT last_active FROM users WHERE username = ?', (username,))
-        row = c.fetchone()
-        if row and row[0] and row[0].strip() != '':
-            try:
-                last = datetime.datetime.strptime(row[0], "%Y-%m-%d %H:%M:%S")
-                diff = (now.date() - last.date()).days
-                if diff == 1:
-                    c.execute('''UPDATE users SET streak = COALESCE(streak,0) + 1,
-                                last_active = ? WHERE username = ?''',
-                              (now_str, username))
-                elif diff > 1:
-                    c.execute('''UPDATE users SET streak = 1,
-                                last_active = ? WHERE username = ?''',
-                              (now_str, username))
-                else:
-                    c.execute('UPDATE users SET last_active = ? WHERE username = ?',
-                              (now_str, username))
-            except ValueError:
-                c.execute('''UPDATE users SET streak = 1,
-                            last_active = ? WHERE username = ?''',
-                          (now_str, username))
-        else:
-            c.execute('''UPDATE users SET streak = 1,
-                        last_active = ? WHERE username = ?''',
-                      (now_str, username))
-        conn.commit()
-    except Exception:
-        pass
-    finally:
-        conn.close()
-
-def add_badge(username, badge):
-    conn = sqlite3.connect('zukko_school.db')
-    c = conn.cursor()
-    try:
-        c.execute('SELECT badges FROM users WHERE username = ?', (username,))
-        row = c.fetchone()
-        if row:
-            badges = json.loads(row[0]) if row[0] and row[0] != '' else []
-            if badge not in badges:
-                badges.append(badge)
-                c.execute('UPDATE users SET badges = ? WHERE username = ?',
-                          (json.dumps(badges), username))
-        conn.commit()
-    except Exception:
-        pass
-    finally:
-        conn.close()
-
-def check_achievements(username):
-    stats = get_user_stats(username)
-    earned = []
-    checks = [
-        (stats["total_messages"] >= 1, "🌟 Birinchi Qadam"),
-        (stats["total_messages"] >= 10, "💬 Suhbatdosh"),
-        (stats["total_messages"] >= 50, "🔥 Faol O'quvchi"),
-        (stats["total_messages"] >= 100, "🏆 Zukko Master"),
-        (stats["streak"] >= 3, "📅 3 Kunlik Streak"),
-        (stats["streak"] >= 7, "🔥 Haftalik Streak"),
-        (stats["level"] >= 5, "⭐ 5-Daraja"),
-        (stats["level"] >= 10, "👑 10-Daraja"),
-    ]
-    for condition, badge_name in checks:
-        if condition and badge_name not in stats["badges"]:
-            add_badge(username, badge_name)
-            earned.append(badge_name)
-    return earned
-
-# ==========================================
-# 📝 NOTES TIZIMI
-# ==========================================
-def save_note(username, title, content, subject):
-    conn = sqlite3.connect('zukko_school.db')
-    c = conn.cursor()
-    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    c.execute('''INSERT INTO notes(username, title, content, subject, time)
-                 VALUES (?,?,?,?,?)''',
-              (username, title, content, subject, now))
-    conn.commit()
-    conn.close()
-
-def get_notes(username):
-    conn = sqlite3.connect('zukko_school.db')
-    df = pd.read_sql_query(
-        "SELECT id, title, subject, time FROM notes WHERE username = ? ORDER BY time DESC",
-        conn, params=(username,))
-    conn.close()
-    return df
-
-def get_note_content(note_id):
-    conn = sqlite3.connect('zukko_school.db')
-    c = conn.cursor()
-    c.execute('SELECT title, content, subject, time FROM notes WHERE id = ?',
-              (note_id,))
-    row = c.fetchone()
-    conn.close()
-    return row
-
-def delete_note(note_id):
-    conn = sqlite3.connect('zukko_school.db')
-    c = conn.cursor()
-    c.execute('DELETE FROM notes WHERE id = ?', (note_id,))
-    conn.commit()
-    conn.close()
+    # Navbatdagi yozuvlar commit bo'lgach o'qiymiz (read-your-writes)
+    get_write_queue().sync(username)
+    if "stats_cache" not in st.session_state:
+        st.session_state.stats_cache = stats_cache.SessionStatsCache()
+    return st.session_state.stats_cache.get(username)
 
 # ==========================================
 # 📊 QUIZ TIZIMI
 # ==========================================
 def save_quiz_score(username, subject, score, total):
-    conn = sqlite3.connect('zukko_school.db')
-    c = conn.cursor()
-    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    c.execute('''INSERT INTO quiz_scores(username, subject, score, total, time)
-                 VALUES (?,?,?,?,?)''',
-              (username, subject, score, total, now))
-    conn.commit()
-    conn.close()
+    quiz.save_score(username, subject, score, total)
 
 def get_quiz_history(username):
-    conn = sqlite3.connect('zukko_school.db')
-    df = pd.read_sql_query(
-        "SELECT subject, score, total, time FROM quiz_scores WHERE username = ? ORDER BY time DESC LIMIT 20",
-        conn, params=(username,))
-    conn.close()
-    return df
-
-def get_leaderboard():
-    conn = sqlite3.connect('zukko_school.db')
-    c = conn.cursor()
-    existing = [row[1] for row in c.execute("PRAGMA table_info(users)").fetchall()]
-    if "xp" in existing:
-        df = pd.read_sql_query(
-            "SELECT username, xp, level, streak FROM users WHERE role != 'admin' ORDER BY xp DESC LIMIT 10",
-            conn)
-    else:
-        df = pd.DataFrame(columns=["username", "xp", "level", "streak"])
-    conn.close()
-    return df
-
-# DB ni ishga tushirish
-init_db()
-
-# Admin foydalanuvchi
-if "ADMIN_PASSWORD" in st.secrets:
-    real_pass = st.secrets["ADMIN_PASSWORD"]
-    add_user("admin", real_pass, "admin")
+    return read_df(quiz.HISTORY_SQL, (username,))
+
+# DB ni ishga tushirish (har rerun'da emas — jarayon uchun bir marta)
+@st.cache_resource
+def bootstrap():
+    # ZUKKO_METRICS=1 bo'lsa: DB o'ramlari va /metrics porti
+    metrics.setup()
+    migrations.ensure_schema()
+    # Eski xom loglarni fon rejimida siqish
+    activity.start_maintenance()
+    # Admin foydalanuvchi
+    if "ADMIN_PASSWORD" in st.secrets:
+        real_pass = st.secrets["ADMIN_PASSWORD"]
+        add_user("admin", real_pass, "admin")
+
+bootstrap()
+
+# Reyting indeksi — barcha sessiyalar uchun bitta, SQLite'dan quriladi
+@st.cache_resource
+def get_ranking():
+    index = ranking.RankingIndex()
+    index.rebuild()
+    return index
+
+# Chatdan keyingi yozuvlar fon thread'ida guruhlab yoziladi
+@st.cache_resource
+def get_write_queue():
+    rank_index = get_ranking()
+
+    def xp_event(username, amount):
+        result = gamification.add_xp(username, amount)
+        if result is None:
+            return
+        for b in result["badges"]:
+            write_queue.notify(username, b)
+        write_queue.after_commit(lambda: rank_index.update(
+            username, xp=result["xp"], level=result["level"]))
+
+    write_queue = events.WriteBehindQueue({
+        "xp": xp_event,
+        "log": activity.add_log,
+        "usage": usage.record,
+        "chat_summary": chats.save_summary,
+    })
+    return write_queue
 
 # ==========================================
 # 🎵 OVOZ FUNKSIYASI
 # ==========================================
-def text_to_audio(text):
-    try:
-        clean = text.replace("```", "").replace("#", "").replace("*", "")
-        if len(clean) > 500:
-            clean = clean[:500] + "..."
-        tts = gTTS(text=clean, lang='tr', slow=False)
-        audio_bytes = io.BytesIO()
-        tts.write_to_fp(audio_bytes)
-        return audio_bytes
-    except:
-        return None
+@st.cache_resource
+def get_audio_cache():
+    return audio_cache.AudioCache()
+
+@st.cache_resource
+def get_tts_backend():
+    backend = tts.GTTSBackend()
+    # Faqat haqiqiy sintez o'lchanadi (kesh hitlari emas)
+    backend.synthesize = metrics.timed(metrics.TTS_SECONDS, "synthesize")(backend.synthesize)
+    return audio_cache.CachedBackend(backend, get_audio_cache())
 
 # ==========================================
 # 🧠 AI ENGINE
 # ==========================================
+@st.cache_resource
+def get_llm_client():
+    client = llm.LLMClient(api_key=GROQ_API_KEY, base_url=LLM_BASE_URL)
+    client.warm_up()
+    return client
+
+@st.cache_resource
+def get_response_cache():
+    return response_cache.ResponseCache()
+
+# Barcha sessiyalar provayderga shu navbat orqali boradi
+@st.cache_resource
+def get_gateway():
+    return gateway.Gateway()
+
+def summarize_for(client, llm_gateway, write_queue, username, mentor, previous, turns):
+    """Fon xulosasi: o'quvchi limitiga kiradi, gateway navbatidan (LONG) o'tadi
+    va token_usage'ga yoziladi."""
+    request = context.summary_request(previous, turns)
+    cost = sum(context.message_tokens(m) for m in request)
+    write_queue.sync(username)
+    usage.check_quota(username, cost)
+    reported = []
+    ticket = llm_gateway.acquire(username, cost, klass=gateway.LONG)
+    try:
+        text = client.complete(MODEL_NAME, request, temperature=0.2, max_tokens=400,
+                               on_usage=lambda prompt, completion: reported.append((prompt, completion)))
+    finally:
+        llm_gateway.release(ticket)
+    if reported:
+        prompt, completion = reported[0]
+        write_queue.submit("usage", username, mentor, prompt, completion, False)
+    else:
+        write_queue.submit("usage", username, mentor, cost, context.count_tokens(text), True)
+    return text.strip()
+
 class ZukkoEngine:
-    def __init__(self):
-        self.client = OpenAI(
-            base_url="https://api.groq.com/openai/v1",
-            api_key=GROQ_API_KEY)
-
-    def generate(self, messages, system_prompt):
-        full_history = [{"role": "system", "content": system_prompt}] + messages
-        try:
-            stream = self.client.chat.completions.create(
-                model=MODEL_NAME,
-                messages=full_history,
-                temperature=0.6,
-                max_tokens=1500,
-                stream=True,
-            )
-            return stream
-        except Exception as e:
-            return str(e)
+    def __init__(self, window=None):
+        self.client = get_llm_client()
+        self.cache = get_response_cache()
+        self.gateway = get_gateway()
+        self.window = window
+
+    def generate(self, messages, system_prompt, user="", on_wait=None,
+                 mentor="", quota=True):
+        started = time.perf_counter()
+        if self.window is not None:
+            full_history = self.window.build(system_prompt, messages)
+        else:
+            full_history = [{"role": "system",
+                             "content": context.normalize_prompt(system_prompt)}] + messages
+        params = {"temperature": 0.6, "max_tokens": 1500}
+
+        # Bir xil savol + mentor — boshqa o'quvchilar uchun ham keshdan
+        key = None
+        if response_cache.cacheable(messages):
+            key = response_cache.make_key(MODEL_NAME, params, full_history)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return metrics.timed_stream(response_cache.replay(cached), started, "cache")
+
+        cost = sum(context.message_tokens(m) for m in full_history)
+        write_queue = get_write_queue()
+        if quota:
+            # Navbatdagi yozuvlar ham hisobga kirsin
+            write_queue.sync(user)
+            usage.check_quota(user, cost)
+        stream = self.gateway.stream(
+            user, cost,
+            lambda: self.client.stream_chat(MODEL_NAME, full_history,
+                                            stream_options=usage.STREAM_OPTIONS,
+                                            **params),
+            on_wait=on_wait)
+        stream = usage.metered(stream, cost, lambda prompt, completion, estimated:
+                               write_queue.submit("usage", user, mentor, prompt,
+                                                  completion, estimated))
+        stream = metrics.timed_stream(stream, started, "llm")
+        if key is not None:
+            return self.cache.recording(key, stream)
+        return stream
 
 # ==========================================
 # 🎨 MEGA DIZAYN (CSS)
 # ==========================================
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800;900&display=swap');
+# Mavzu assets/theme.css da; jarayon boshida static/theme.min.css ga
+# quriladi va brauzer uni bir marta yuklab keshlaydi
+@st.cache_resource
+def get_theme_link():
+    return theme.link_tag()
 
-    .stApp {
-        font-family: 'Inter', sans-serif;
-    }
-
-    section[data-testid="stSidebar"] {
-        background: linear-gradient(180deg, #0f0c29 0%, #302b63 50%, #24243e 100%);
-        border-right: 1px solid rgba(255,255,255,0.05);
-    }
-    section[data-testid="stSidebar"] .stMarkdown h1,
-    section[data-testid="stSidebar"] .stMarkdown h2,
-    section[data-testid="stSidebar"] .stMarkdown h3,
-    section[data-testid="stSidebar"] .stMarkdown p,
-    section[data-testid="stSidebar"] .stMarkdown span,
-    section[data-testid="stSidebar"] .stMarkdown label {
-        color: #ffffff !important;
-    }
-
-    .metric-card {
-        background: linear-gradient(135deg, rgba(99,102,241,0.15) 0%, rgba(139,92,246,0.1) 100%);
-        padding: 24px;
-        border-radius: 16px;
-        border: 1px solid rgba(139,92,246,0.2);
-        text-align: center;
-        margin-bottom: 12px;
-        backdrop-filter: blur(10px);
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 15px rgba(0,0,0,0.1);
-    }
-    .metric-card:hover {
-        transform: translateY(-4px);
-        box-shadow: 0 8px 25px rgba(139,92,246,0.25);
-        border-color: rgba(139,92,246,0.4);
-    }
-    .metric-card h3 {
-        font-size: 14px; font-weight: 500; opacity: 0.8; margin-bottom: 8px;
-    }
-    .metric-card h2 {
-        font-size: 28px; font-weight: 800; margin: 0;
-    }
-
-    .xp-card {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 24px; border-radius: 16px; color: white;
-        text-align: center; margin: 12px 0;
-        box-shadow: 0 6px 20px rgba(102,126,234,0.4);
-    }
-    .xp-card h2 { margin: 0; font-size: 32px; font-weight: 900; }
-    .xp-card p { margin: 4px 0 0 0; opacity: 0.9; font-size: 14px; }
-
-    .streak-card {
-        background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-        padding: 20px; border-radius: 16px; color: white;
-        text-align: center; margin: 12px 0;
-        box-shadow: 0 6px 20px rgba(245,87,108,0.4);
-    }
-    .streak-card h2 { margin: 0; font-size: 32px; font-weight: 900; }
-    .streak-card p { margin: 4px 0 0 0; opacity: 0.9; font-size: 14px; }
-
-    .level-card {
-        background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);
-        padding: 20px; border-radius: 16px; color: white;
-        text-align: center; margin: 12px 0;
-        box-shadow: 0 6px 20px rgba(79,172,254,0.4);
-    }
-    .level-card h2 { margin: 0; font-size: 32px; font-weight: 900; }
-    .level-card p { margin: 4px 0 0 0; opacity: 0.9; font-size: 14px; }
-
-    .badge-box {
-        background: linear-gradient(135deg, rgba(255,215,0,0.1) 0%, rgba(255,165,0,0.1) 100%);
-        padding: 20px; border-radius: 16px;
-        border: 1px solid rgba(255,215,0,0.3);
-        margin: 12px 0; text-align: center;
-    }
-    .badge-item {
-        display: inline-block; background: rgba(255,215,0,0.15);
-        padding: 8px 16px; border-radius: 25px; margin: 4px;
-        font-size: 14px; border: 1px solid rgba(255,215,0,0.3);
-        transition: all 0.2s ease;
-    }
-    .badge-item:hover {
-        transform: scale(1.1); background: rgba(255,215,0,0.25);
-    }
-
-    .progress-container {
-        background: rgba(128,128,128,0.15);
-        border-radius: 12px; padding: 4px; margin: 10px 0;
-    }
-    .progress-bar {
-        height: 20px; border-radius: 10px;
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 50%, #f093fb 100%);
-        transition: width 0.8s ease;
-        display: flex; align-items: center; justify-content: center;
-        color: white; font-size: 11px; font-weight: 700;
-        min-width: 30px;
-    }
-
-    div[data-testid="stChatMessage"] {
-        border-radius: 16px !important; margin: 8px 0 !important;
-        padding: 16px !important;
-        border: 1px solid rgba(128,128,128,0.15) !important;
-        backdrop-filter: blur(10px); transition: all 0.2s ease;
-    }
-    div[data-testid="stChatMessage"]:hover {
-        box-shadow: 0 4px 15px rgba(0,0,0,0.08);
-    }
-    div[data-testid="stChatMessage"][data-author="user"] {
-        background: linear-gradient(135deg, rgba(76,175,80,0.08) 0%, rgba(129,199,132,0.08) 100%) !important;
-        border-left: 3px solid #4CAF50 !important;
-    }
-    div[data-testid="stChatMessage"][data-author="assistant"] {
-        background: linear-gradient(135deg, rgba(33,150,243,0.08) 0%, rgba(100,181,246,0.08) 100%) !important;
-        border-left: 3px solid #2196F3 !important;
-    }
-
-    .stButton > button {
-        border-radius: 12px !important; padding: 8px 20px !important;
-        font-weight: 600 !important; transition: all 0.3s ease !important;
-        border: 1px solid rgba(139,92,246,0.3) !important;
-    }
-    .stButton > button:hover {
-        transform: translateY(-2px) !important;
-        box-shadow: 0 4px 15px rgba(139,92,246,0.3) !important;
-    }
-
-    .stSelectbox > div > div { border-radius: 12px !important; }
-
-    .stTabs [data-baseweb="tab-list"] { gap: 8px; }
-    .stTabs [data-baseweb="tab"] {
-        border-radius: 10px; padding: 8px 20px; font-weight: 600;
-    }
-
-    .glow-title {
-        text-align: center; font-size: 42px; font-weight: 900;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 50%, #f093fb 100%);
-        -webkit-background-clip: text; -webkit-text-fill-color: transparent;
-        background-clip: text; margin-bottom: 8px;
-        animation: glow-pulse 3s ease-in-out infinite;
-    }
-    @keyframes glow-pulse {
-        0%, 100% { filter: brightness(1); }
-        50% { filter: brightness(1.2); }
-    }
-
-    .subtitle {
-        text-align: center; font-size: 16px; opacity: 0.7; margin-bottom: 30px;
-    }
-
-    .note-card {
-        background: rgba(128,128,128,0.08); padding: 16px;
-        border-radius: 12px; border: 1px solid rgba(128,128,128,0.15);
-        margin: 8px 0; transition: all 0.2s ease;
-    }
-    .note-card:hover {
-        background: rgba(128,128,128,0.12); transform: translateX(4px);
-    }
-
-    .leader-row {
-        display: flex; align-items: center; justify-content: space-between;
-        padding: 12px 16px; background: rgba(128,128,128,0.06);
-        border-radius: 12px; margin: 6px 0;
-        border: 1px solid rgba(128,128,128,0.1); transition: all 0.2s ease;
-    }
-    .leader-row:hover {
-        background: rgba(139,92,246,0.1); border-color: rgba(139,92,246,0.3);
-    }
-    .leader-rank { font-size: 24px; font-weight: 900; width: 40px; }
-    .leader-name { font-weight: 600; font-size: 16px; flex: 1; margin-left: 12px; }
-    .leader-xp { font-weight: 700; color: #764ba2; font-size: 16px; }
-
-    .glass-box {
-        background: rgba(255,255,255,0.05); backdrop-filter: blur(10px);
-        border: 1px solid rgba(255,255,255,0.1);
-        border-radius: 16px; padding: 24px; margin: 12px 0;
-    }
-
-    .fancy-divider {
-        height: 2px;
-        background: linear-gradient(90deg, transparent 0%, rgba(139,92,246,0.5) 50%, transparent 100%);
-        margin: 20px 0; border: none;
-    }
-
-    .pulse-dot {
-        display: inline-block; width: 10px; height: 10px;
-        border-radius: 50%; background: #4CAF50;
-        animation: pulse 1.5s ease-in-out infinite; margin-right: 8px;
-    }
-    @keyframes pulse {
-        0%, 100% { transform: scale(1); opacity: 1; }
-        50% { transform: scale(1.3); opacity: 0.7; }
-    }
-
-    .feature-card {
-        background: linear-gradient(135deg, rgba(99,102,241,0.08) 0%, rgba(139,92,246,0.05) 100%);
-        padding: 20px; border-radius: 16px;
-        border: 1px solid rgba(139,92,246,0.15);
-        text-align: center; transition: all 0.3s ease; height: 100%;
-    }
-    .feature-card:hover {
-        transform: translateY(-6px);
-        box-shadow: 0 12px 30px rgba(139,92,246,0.2);
-        border-color: rgba(139,92,246,0.4);
-    }
-    .feature-icon { font-size: 40px; margin-bottom: 10px; }
-    .feature-title { font-weight: 700; font-size: 16px; margin-bottom: 6px; }
-    .feature-desc { font-size: 13px; opacity: 0.7; }
-
-    .welcome-banner {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 30px; border-radius: 20px; color: white;
-        margin-bottom: 20px;
-        box-shadow: 0 8px 30px rgba(102,126,234,0.4);
-    }
-    .welcome-banner h2 { margin: 0; font-size: 28px; font-weight: 800; color: white !important; }
-    .welcome-banner p { margin: 8px 0 0 0; opacity: 0.9; font-size: 15px; color: white !important; }
-
-    .status-online {
-        display: inline-flex; align-items: center;
-        background: rgba(76,175,80,0.15); padding: 6px 14px;
-        border-radius: 20px; color: #4CAF50;
-        font-weight: 600; font-size: 13px;
-        border: 1px solid rgba(76,175,80,0.3);
-    }
-
-    ::-webkit-scrollbar { width: 6px; }
-    ::-webkit-scrollbar-track { background: transparent; }
-    ::-webkit-scrollbar-thumb { background: rgba(139,92,246,0.3); border-radius: 3px; }
-    ::-webkit-scrollbar-thumb:hover { background: rgba(139,92,246,0.5); }
-
-    .stChatInput > div {
-        border-radius: 16px !important;
-        border: 2px solid rgba(139,92,246,0.2) !important;
-    }
-    .stChatInput > div:focus-within {
-        border-color: rgba(139,92,246,0.5) !important;
-        box-shadow: 0 0 15px rgba(139,92,246,0.15) !important;
-    }
-
-    .stAlert { border-radius: 12px !important; }
-</style>
-""", unsafe_allow_html=True)
+st.markdown(get_theme_link(), unsafe_allow_html=True)
 
 # ==========================================
 # 🏠 DASHBOARD
 # ==========================================
+@metrics.timed(metrics.PAGE_SECONDS, "dashboard")
 def show_dashboard(username):
     stats = get_user_stats(username)
 
@@ -755,33 +423,45 @@ def show_dashboard(username):
 # ==========================================
 # 🏆 REYTING SAHIFASI
 # ==========================================
-def show_leaderboard():
+def _leader_row(rank, row, highlight=False):
+    style = ' style="border: 2px solid rgba(139,92,246,0.6);"' if highlight else ''
+    st.markdown(f"""
+    <div class="leader-row"{style}>
+        <div class="leader-rank">{rank}</div>
+        <div class="leader-name">{row['username'].title()}</div>
+        <div class="leader-xp">⚡{row['xp']} XP · Lvl {row['level']} · 🔥{row['streak']}</div>
+    </div>""", unsafe_allow_html=True)
+
+@metrics.timed(metrics.PAGE_SECONDS, "leaderboard")
+def show_leaderboard(username):
     st.markdown(
         '<h2 style="text-align:center;">🏆 Top O\'quvchilar Reytingi</h2>',
         unsafe_allow_html=True)
     st.markdown('<div class="fancy-divider"></div>', unsafe_allow_html=True)
 
-    df = get_leaderboard()
-    if df.empty:
+    index = get_ranking()
+    top = index.top(10)
+    if not top:
         st.info("Hali reyting ma'lumotlari yo'q.")
         return
 
     medals = ["🥇", "🥈", "🥉"]
-    for i, row in df.iterrows():
-        rank = medals[i] if i < 3 else f"#{i+1}"
-        xp_val = row.get('xp', 0) if row.get('xp') else 0
-        lvl_val = row.get('level', 1) if row.get('level') else 1
-        str_val = row.get('streak', 0) if row.get('streak') else 0
-        st.markdown(f"""
-        <div class="leader-row">
-            <div class="leader-rank">{rank}</div>
-            <div class="leader-name">{row['username'].title()}</div>
-            <div class="leader-xp">⚡{xp_val} XP · Lvl {lvl_val} · 🔥{str_val}</div>
-        </div>""", unsafe_allow_html=True)
+    for pos, row in top:
+        rank = medals[pos - 1] if pos <= 3 else f"#{pos}"
+        _leader_row(rank, row, highlight=row['username'] == username)
+
+    # Top 10 da bo'lmasa — o'z o'rni va atrofidagilar
+    my_rank = index.rank(username)
+    if my_rank and my_rank > 10:
+        st.markdown('<div class="fancy-divider"></div>', unsafe_allow_html=True)
+        st.markdown(f"#### 📍 Sizning o'rningiz: #{my_rank} / {len(index)}")
+        for pos, row in index.around(username, 2):
+            _leader_row(f"#{pos}", row, highlight=row['username'] == username)
 
 # ==========================================
 # 📝 ESLATMALAR SAHIFASI
 # ==========================================
+@metrics.timed(metrics.PAGE_SECONDS, "notes")
 def show_notes(username):
     st.markdown("### 📝 Eslatmalar")
     st.markdown('<div class="fancy-divider"></div>', unsafe_allow_html=True)
@@ -792,41 +472,163 @@ def show_notes(username):
         with st.form("note_form"):
             title = st.text_input("Sarlavha",
                                   placeholder="Masalan: Python asoslari")
-            subject = st.selectbox("Fan", [
-                "Umumiy", "Ingliz tili", "IT", "Ona tili",
-                "Matematika", "Fizika", "Boshqa"])
+            subject = st.selectbox("Fan", notes.SUBJECTS)
             content = st.text_area("Matn", height=200,
                                    placeholder="Eslatma matnini yozing...")
             submitted = st.form_submit_button("💾 Saqlash")
             if submitted:
                 if title and content:
-                    save_note(username, title, content, subject)
+                    notes.save_note(username, title, content, subject)
+                    st.session_state.notes_cursors = [None]
                     st.success("✅ Eslatma saqlandi!")
                     st.rerun()
                 else:
                     st.warning("Sarlavha va matn to'ldiring!")
 
     with tab_view:
-        notes_df = get_notes(username)
-        if notes_df.empty:
+        s1, s2 = st.columns([3, 1])
+        with s1:
+            search_text = st.text_input("🔎 Qidirish", key="notes_search",
+                                        placeholder="Sarlavha yoki matn bo'yicha...")
+        with s2:
+            search_subject = st.selectbox("Fan", ["Barchasi"] + notes.SUBJECTS,
+                                          key="notes_search_subject")
+        if search_text.strip():
+            show_note_search(username, search_text,
+                             None if search_subject == "Barchasi" else search_subject)
+            return
+
+        # Sahifa boshlari kursorlari (keyset): [None, (time, id), ...]
+        if "notes_cursors" not in st.session_state:
+            st.session_state.notes_cursors = [None]
+        cursors = st.session_state.notes_cursors
+        page_size = st.session_state.get("notes_page_size", notes.PAGE_SIZE)
+
+        rows, next_cursor = notes.list_page(username, cursors[-1], page_size)
+        if not rows and len(cursors) == 1:
             st.info("Hali eslatma yo'q. Yangi eslatma qo'shing! ✍️")
         else:
-            for _, row in notes_df.iterrows():
+            bodies = notes.get_bodies(username, [row['id'] for row in rows])
+            for row in rows:
                 with st.expander(
                     f"📌 {row['title']} — [{row['subject']}] — {row['time'][:10]}"):
-                    note_data = get_note_content(row['id'])
-                    if note_data:
-                        st.markdown(note_data[1])
-                        c1d, c2d = st.columns([4, 1])
-                        with c2d:
-                            if st.button("🗑️ O'chirish",
-                                         key=f"del_{row['id']}"):
-                                delete_note(row['id'])
-                                st.rerun()
+                    st.markdown(bodies.get(row['id'], ""))
+                    c1d, c2d = st.columns([4, 1])
+                    with c2d:
+                        if st.button("🗑️ O'chirish",
+                                     key=f"del_{row['id']}"):
+                            notes.delete_note(username, row['id'])
+                            st.session_state.notes_cursors = [None]
+                            st.rerun()
+
+            nav1, nav2, nav3 = st.columns([1, 2, 1])
+            with nav1:
+                if len(cursors) > 1 and st.button("⬅️ Oldingi",
+                                                  use_container_width=True):
+                    cursors.pop()
+                    st.rerun()
+            with nav2:
+                st.selectbox("Sahifada", [10, 20, 50],
+                             index=[10, 20, 50].index(page_size)
+                             if page_size in (10, 20, 50) else 1,
+                             key="notes_page_size",
+                             on_change=lambda: st.session_state.update(
+                                 notes_cursors=[None]))
+            with nav3:
+                if next_cursor and st.button("Keyingi ➡️",
+                                             use_container_width=True):
+                    cursors.append(next_cursor)
+                    st.rerun()
+
+@metrics.timed(metrics.PAGE_SECONDS, "note_search")
+def show_note_search(username, text, subject):
+    results = notes.search(username, text, subject)
+    if not results:
+        st.info("Hech narsa topilmadi. 🔍")
+        return
+    st.caption(f"{len(results)} ta natija")
+    bodies = notes.get_bodies(username, [row['id'] for row in results])
+    for row in results:
+        with st.expander(
+            f"📌 {row['title']} — [{row['subject']}] — {row['time'][:10]}"):
+            st.markdown(row['snippet'])
+            st.markdown('<div class="fancy-divider"></div>', unsafe_allow_html=True)
+            st.markdown(bodies.get(row['id'], ""))
+
+# ==========================================
+# 👥 ADMIN: FOYDALANUVCHILAR RO'YXATI
+# ==========================================
+USER_SORTS = {
+    "XP": "xp", "Daraja": "level", "Xabarlar": "total_messages",
+    "Streak": "streak", "Qo'shilgan": "joined", "Username": "username",
+}
+
+@metrics.timed(metrics.PAGE_SECONDS, "user_browser")
+def show_user_browser():
+    f1, f2, f3, f4 = st.columns([3, 2, 2, 2])
+    with f1:
+        search = st.text_input("🔎 Username", key="au_search")
+    with f2:
+        role = st.selectbox("Rol", ["Barchasi", "student", "admin"], key="au_role")
+    with f3:
+        levels = st.slider("Daraja", 1, 50, (1, 50), key="au_levels")
+    with f4:
+        sort_label = st.selectbox("Saralash", list(USER_SORTS), key="au_sort")
+    page_size = st.selectbox("Sahifada", [25, 50, 100], index=1, key="au_page_size")
+
+    filters = {
+        "role": None if role == "Barchasi" else role,
+        "min_level": levels[0] if levels[0] > 1 else None,
+        "max_level": levels[1] if levels[1] < 50 else None,
+        "search": search or None,
+    }
+    # Filtr yoki saralash o'zgarsa — birinchi sahifaga
+    signature = (sort_label, page_size, tuple(filters.values()))
+    if st.session_state.get("au_signature") != signature:
+        st.session_state.au_signature = signature
+        st.session_state.au_cursors = [None]
+    cursors = st.session_state.au_cursors
+
+    total = users.count(**filters)
+    rows, next_cursor = users.browse(USER_SORTS[sort_label], cursors[-1],
+                                     page_size, **filters)
+    start = (len(cursors) - 1) * page_size
+    st.caption(f"{total} ta foydalanuvchi · {start + 1 if rows else 0}–{start + len(rows)}")
+    st.dataframe(pd.DataFrame([dict(r) for r in rows],
+                              columns=users.COLUMNS.split(", ")),
+                 use_container_width=True)
+
+    nav1, _, nav3 = st.columns([1, 2, 1])
+    with nav1:
+        if len(cursors) > 1 and st.button("⬅️ Oldingi", key="au_prev",
+                                          use_container_width=True):
+            cursors.pop()
+            st.rerun()
+    with nav3:
+        if next_cursor and st.button("Keyingi ➡️", key="au_next",
+                                     use_container_width=True):
+            cursors.append(next_cursor)
+            st.rerun()
+
+def show_metrics():
+    if not metrics.ENABLED:
+        st.info("Metrikalar o'chiq. Yoqish uchun: ZUKKO_METRICS=1 streamlit run app.py")
+        return
+    st.caption(f"Prometheus: http://{metrics.HOST}:{metrics.PORT}/metrics")
+    rows = metrics.summary()
+    if not rows:
+        st.info("Hali o'lchovlar yo'q.")
+        return
+    df = pd.DataFrame(rows)
+    st.dataframe(df, use_container_width=True, hide_index=True)
+    # Rerun vaqti qayerga ketadi: jami soniyalar bo'yicha
+    st.bar_chart(df.assign(name=df["metric"] + " " + df["labels"])
+                   .set_index("name")["total_s"])
 
 # ==========================================
 # 📊 STATISTIKA SAHIFASI
 # ==========================================
+@metrics.timed(metrics.PAGE_SECONDS, "statistics")
 def show_statistics(username):
     st.markdown("### 📊 Shaxsiy Statistika")
     st.markdown('<div class="fancy-divider"></div>', unsafe_allow_html=True)
@@ -848,17 +650,7 @@ def show_statistics(username):
 
     with col2:
         st.markdown("#### 🏅 Barcha Nishonlar")
-        all_badges = [
-            ("🌟 Birinchi Qadam", "1 ta xabar yozing"),
-            ("💬 Suhbatdosh", "10 ta xabar yozing"),
-            ("🔥 Faol O'quvchi", "50 ta xabar yozing"),
-            ("🏆 Zukko Master", "100 ta xabar yozing"),
-            ("📅 3 Kunlik Streak", "3 kun ketma-ket kiring"),
-            ("🔥 Haftalik Streak", "7 kun ketma-ket kiring"),
-            ("⭐ 5-Daraja", "5-darajaga yeting"),
-            ("👑 10-Daraja", "10-darajaga yeting"),
-        ]
-        for badge_name, desc in all_badges:
+        for badge_name, _, _, desc in gamification.badge_rules():
             earned = "✅" if badge_name in stats["badges"] else "🔒"
             st.markdown(f"""
             <div class="note-card">
@@ -877,6 +669,7 @@ def show_statistics(username):
 # ==========================================
 # 🖥️ ASOSIY DASTUR
 # ==========================================
+@metrics.timed(metrics.RERUN_SECONDS)
 def main():
     if "logged_in" not in st.session_state:
         st.session_state.logged_in = False
@@ -908,16 +701,33 @@ def main():
                     if not username or not password:
                         st.warning("Login va parolni to'ldiring!")
                     else:
-                        result = login_user(username, password)
+                        wait = get_login_limiter().check(
+                            client_ip(), username.lower().strip())
+                        result = None
+                        if wait:
+                            st.error(f"⏳ Juda ko'p urinish. {wait:.0f} soniyadan "
+                                     f"keyin qayta urinib ko'ring.")
+                        else:
+                            try:
+                                result = login_user(username, password)
+                                if not result:
+                                    st.error("❌ Login yoki parol xato!")
+                            except passwords.LoginBusy:
+                                st.warning("⏳ Server band, bir oz kutib qayta "
+                                           "urinib ko'ring.")
                         if result:
+                            reset_user_state()
                             st.session_state.logged_in = True
-                            st.session_state.username = result[0][0]
-                            st.session_state.role = result[0][2]
-                            update_streak(username.lower().strip())
-                            add_log(username, "Kirdi")
+                            st.session_state.username = result['username']
+                            st.session_state.role = result['role']
+                            streak = gamification.update_streak(result['username'])
+                            if streak:
+                                get_ranking().update(result['username'],
+                                                     streak=streak["streak"])
+                                # Toast rerun'dan keyin, boshqa nishonlar bilan birga
+                                st.session_state.login_badges = streak["badges"]
+                            activity.add_log(result['username'], "Kirdi")
                             st.rerun()
-                        else:
-                            st.error("❌ Login yoki parol xato!")
 
             with tab2:
                 new_user = st.text_input("👤 Yangi Login", key="reg_user",
@@ -937,15 +747,33 @@ def main():
                         st.warning("Parol kamida 4 ta belgidan iborat bo'lsin!")
                     elif new_pass != new_pass2:
                         st.error("Parollar mos kelmaydi!")
-                    elif add_user(new_user, new_pass):
-                        st.success(
-                            "✅ Akkaunt yaratildi! Endi kirish bo'limiga o'ting.")
-                        add_log(new_user, "Ro'yxatdan o'tdi")
+                    elif wait := get_login_limiter().check_ip(client_ip()):
+                        # Parol xeshi qimmat — ro'yxatdan o'tish ham IP chelagidan
+                        st.error(f"⏳ Juda ko'p urinish. {wait:.0f} soniyadan "
+                                 f"keyin qayta urinib ko'ring.")
                     else:
-                        st.error("❌ Bu login band!")
+                        try:
+                            created = add_user(new_user, new_pass)
+                        except passwords.LoginBusy:
+                            created = None
+                            st.warning("⏳ Server band, bir oz kutib qayta "
+                                       "urinib ko'ring.")
+                        if created:
+                            get_ranking().update(new_user.lower().strip())
+                            st.success(
+                                "✅ Akkaunt yaratildi! Endi kirish bo'limiga o'ting.")
+                            activity.add_log(new_user.lower().strip(), "Ro'yxatdan o'tdi")
+                        elif created is False:
+                            st.error("❌ Bu login band!")
 
     # --- TIZIM ICHIDA ---
     else:
+        # Kirishdagi streak nishonlari va fon yozuvchisi qo'lga kiritganlari
+        badges = st.session_state.pop("login_badges", [])
+        badges += get_write_queue().pop_notifications(st.session_state.username)
+        for b in badges:
+            st.toast(f"🎉 Yangi nishon: {b}", icon="🏅")
+
         with st.sidebar:
             st.markdown(f"""
             <div style="text-align:center; padding: 20px 0;">
@@ -991,7 +819,8 @@ def main():
                         unsafe_allow_html=True)
 
             if st.button("🚪 Chiqish", use_container_width=True):
-                add_log(st.session_state.username, "Chiqdi")
+                activity.add_log(st.session_state.username, "Chiqdi")
+                reset_user_state()
                 st.session_state.logged_in = False
                 st.session_state.username = ""
                 st.session_state.role = ""
@@ -1002,7 +831,7 @@ def main():
             show_dashboard(st.session_state.username)
 
         elif page == "🏆 Reyting":
-            show_leaderboard()
+            show_leaderboard(st.session_state.username)
 
         elif page == "📝 Eslatmalar":
             show_notes(st.session_state.username)
@@ -1016,36 +845,105 @@ def main():
                 st.markdown('<div class="fancy-divider"></div>',
                             unsafe_allow_html=True)
 
-                admin_tab1, admin_tab2, admin_tab3 = st.tabs(
-                    ["👥 Foydalanuvchilar", "📋 Loglar", "📊 Statistika"])
+                admin_tab1, admin_tab2, admin_tab3, admin_tab4 = st.tabs(
+                    ["👥 Foydalanuvchilar", "📋 Loglar", "📊 Statistika", "⏱️ Metrikalar"])
 
                 with admin_tab1:
-                    st.dataframe(view_all_users(),
-                                 use_container_width=True)
+                    show_user_browser()
 
                 with admin_tab2:
                     st.dataframe(view_logs(), use_container_width=True)
 
                 with admin_tab3:
-                    users_df = view_all_users()
+                    by_role = users.count_by_role()
                     st.markdown(f"""
                     <div class="metric-card">
                         <h3>Jami Foydalanuvchilar</h3>
-                        <h2>{len(users_df)}</h2>
+                        <h2>{sum(by_role.values())}</h2>
+                        <p style="margin:4px 0 0 0; font-size:14px;">
+                            {by_role.get('student', 0)} o'quvchi ·
+                            {by_role.get('admin', 0)} admin</p>
                     </div>""", unsafe_allow_html=True)
 
-                    logs_df = view_logs()
-                    today = datetime.datetime.now().strftime("%Y-%m-%d")
-                    if not logs_df.empty:
-                        today_logs = logs_df[
-                            logs_df['time'].str.startswith(today)]
-                    else:
-                        today_logs = pd.DataFrame()
                     st.markdown(f"""
                     <div class="metric-card">
                         <h3>Bugungi Faollik</h3>
-                        <h2>{len(today_logs)} ta</h2>
+                        <h2>{activity.events_on()} ta</h2>
+                        <p style="margin:4px 0 0 0; font-size:14px;">
+                            DAU {activity.active_users(1)} · WAU {activity.active_users(7)} ·
+                            MAU {activity.active_users(30)}</p>
+                    </div>""", unsafe_allow_html=True)
+
+                    dau = pd.DataFrame([tuple(r) for r in activity.daily_active_users(14)],
+                                       columns=["Kun", "Foydalanuvchilar", "Amallar"])
+                    if not dau.empty:
+                        st.markdown("#### 📈 Kunlik faol foydalanuvchilar (14 kun)")
+                        st.bar_chart(dau.set_index("Kun")["Foydalanuvchilar"])
+
+                    per_mentor = pd.DataFrame(
+                        [tuple(r) for r in activity.messages_per_mentor(7)],
+                        columns=["Mentor", "Xabarlar"])
+                    if not per_mentor.empty:
+                        st.markdown("#### 🎓 Mentorlar bo'yicha xabarlar (7 kun)")
+                        st.bar_chart(per_mentor.set_index("Mentor")["Xabarlar"])
+
+                    ctx = context.totals
+                    st.markdown(f"""
+                    <div class="metric-card">
+                        <h3>Tejalgan prompt tokenlar</h3>
+                        <h2>{ctx['tokens_full'] - ctx['tokens_sent']}</h2>
+                        <p style="margin:4px 0 0 0; font-size:14px;">
+                            {ctx['requests']} so'rov · o'rtacha
+                            {(ctx['tokens_full'] - ctx['tokens_sent']) // max(1, ctx['requests'])} token/so'rov</p>
+                    </div>""", unsafe_allow_html=True)
+
+                    rc = get_response_cache()
+                    st.markdown(f"""
+                    <div class="metric-card">
+                        <h3>AI javoblar keshi</h3>
+                        <h2>{rc.hit_rate():.0%}</h2>
+                        <p style="margin:4px 0 0 0; font-size:14px;">
+                            {rc.stats['memory_hits']} xotira · {rc.stats['db_hits']} baza ·
+                            {rc.stats['misses']} miss · {rc.stats['stores']} saqlandi</p>
                     </div>""", unsafe_allow_html=True)
+
+                    st.markdown("#### 🔢 Eng ko'p token sarflaganlar (30 kun)")
+                    top = pd.DataFrame(
+                        [tuple(r) for r in usage.top_consumers(30)],
+                        columns=["Foydalanuvchi", "So'rovlar", "Prompt",
+                                 "Javob", "Jami"])
+                    if top.empty:
+                        st.info("Hali token sarfi yo'q.")
+                    else:
+                        st.dataframe(top, use_container_width=True, hide_index=True)
+                        per_mentor_tokens = pd.DataFrame(
+                            [tuple(r) for r in usage.by_mentor(30)],
+                            columns=["Mentor", "So'rovlar", "Tokenlar"])
+                        st.bar_chart(per_mentor_tokens.set_index("Mentor")["Tokenlar"])
+                    st.caption(f"Limitlar: kuniga {usage.DAILY_TOKENS:,} · "
+                               f"oyiga {usage.MONTHLY_TOKENS:,} token (0 — cheksiz)")
+
+                    gw = get_gateway()
+                    st.markdown(f"""
+                    <div class="metric-card">
+                        <h3>AI navbati</h3>
+                        <h2>{gw.active()} / {gw.max_concurrent}</h2>
+                        <p style="margin:4px 0 0 0; font-size:14px;">
+                            {gw.waiting()} kutmoqda · eng ko'p {gw.stats['peak_active']} ·
+                            {gw.stats['timeouts']} timeout</p>
+                    </div>""", unsafe_allow_html=True)
+
+                    totals = stats_cache.totals
+                    st.markdown(f"""
+                    <div class="metric-card">
+                        <h3>Statistika keshi</h3>
+                        <h2>{stats_cache.hit_rate():.0%}</h2>
+                        <p style="margin:4px 0 0 0; font-size:14px;">
+                            {totals['hits']} hit · {totals['misses']} miss</p>
+                    </div>""", unsafe_allow_html=True)
+
+                with admin_tab4:
+                    show_metrics()
             else:
                 st.error("⛔ Siz Admin emassiz!")
 
@@ -1122,86 +1020,97 @@ def main():
                 📌 <strong>Tanlandi:</strong> {mentor_type}
             </div>""", unsafe_allow_html=True)
 
-            if "messages" not in st.session_state:
-                st.session_state.messages = []
-            if "current_mentor" not in st.session_state:
-                st.session_state.current_mentor = mentor_type
-
-            if st.session_state.current_mentor != mentor_type:
-                st.session_state.messages = []
-                st.session_state.current_mentor = mentor_type
+            # Suhbat bazada saqlanadi: mentor almashsa yoki sahifa yangilansa
+            # o'sha mentor bilan oxirgi suhbat davom etadi
+            chat = st.session_state.get("chat")
+            if (chat is None or chat.username != st.session_state.username
+                    or chat.mentor != mentor_type):
+                write_queue = get_write_queue()
+                chat = chats.ChatSession.resume(
+                    st.session_state.username, mentor_type,
+                    context.ContextWindow(functools.partial(
+                        summarize_for, get_llm_client(), get_gateway(), write_queue,
+                        st.session_state.username, mentor_type)),
+                    write_queue.submit, write_queue.sync)
+                st.session_state.chat = chat
 
             bcol1, bcol2, bcol3, bcol4 = st.columns(4)
             with bcol1:
                 if st.button("🗑️ Tozalash", use_container_width=True):
-                    st.session_state.messages = []
+                    chat.new_conversation()
                     st.rerun()
             with bcol2:
                 if st.button("📝 Test tuzish", use_container_width=True):
-                    st.session_state.messages.append({
-                        "role": "user",
-                        "content": "Mavzu bo'yicha 5 ta test savol tuzib ber (A, B, C, D variantlar bilan). Oxirida javoblarini ber."
-                    })
+                    chat.append("user", "Mavzu bo'yicha 5 ta test savol tuzib ber (A, B, C, D variantlar bilan). Oxirida javoblarini ber.")
                     st.rerun()
             with bcol3:
                 if st.button("💡 Mavzu taklif", use_container_width=True):
-                    st.session_state.messages.append({
-                        "role": "user",
-                        "content": "Menga o'rganish uchun qiziqarli mavzular taklif qil (hozirgi fan bo'yicha). Har biriga qisqa izoh ber."
-                    })
+                    chat.append("user", "Menga o'rganish uchun qiziqarli mavzular taklif qil (hozirgi fan bo'yicha). Har biriga qisqa izoh ber.")
                     st.rerun()
             with bcol4:
                 if st.button("📖 Xulosa", use_container_width=True):
-                    if st.session_state.messages:
-                        st.session_state.messages.append({
-                            "role": "user",
-                            "content": "Shu suhbatimiz bo'yicha qisqa xulosa yozib ber — asosiy fikrlar, o'rganilgan narsalar."
-                        })
+                    if chat.messages:
+                        chat.append("user", context.SUMMARY_PROMPT)
                         st.rerun()
 
             st.markdown('<div class="fancy-divider"></div>',
                         unsafe_allow_html=True)
 
-            for msg in st.session_state.messages:
+            # Eski xabarlar faqat so'ralganda bazadan yuklanadi
+            if chat.has_older and st.button("⬆️ Oldingi xabarlar", key="chat_older"):
+                chat.load_older()
+                st.rerun()
+
+            for msg in chat.visible():
                 with st.chat_message(msg["role"]):
                     st.markdown(msg["content"])
 
             if prompt := st.chat_input("💬 Savolingizni yozing..."):
-                st.session_state.messages.append(
-                    {"role": "user", "content": prompt})
+                chat.append("user", prompt)
                 with st.chat_message("user"):
                     st.markdown(prompt)
 
+            # Tugmalar qo'shgan savollar ham shu yerda javob oladi
+            if chat.messages and chat.messages[-1]["role"] == "user" and not chat.failed:
                 with st.chat_message("assistant"):
-                    engine = ZukkoEngine()
+                    engine = ZukkoEngine(chat.window)
                     placeholder = st.empty()
-                    full_text = ""
-                    stream = engine.generate(
-                        st.session_state.messages, system_prompt)
-
-                    if isinstance(stream, str):
-                        st.error(f"⚠️ Xatolik: {stream}")
-                        full_text = "Xatolik yuz berdi."
+                    started = time.perf_counter()
+                    # Ovoz sintezi javob oqib kelayotganda boshlanadi
+                    speech = tts.SpeechJob(get_tts_backend())
+                    try:
+                        stream = engine.generate(
+                            chat.messages, system_prompt,
+                            user=st.session_state.username,
+                            mentor=mentor_type,
+                            quota=st.session_state.role != "admin",
+                            on_wait=lambda pos: placeholder.markdown(
+                                f"⏳ Navbatda: **{pos}**-o'rin..."))
+                        renderer = streaming.StreamRenderer(
+                            placeholder.markdown, started=started,
+                            on_delta=speech.feed)
+                        full_text = renderer.consume(stream)
+                    except llm.LLMError as e:
+                        # Javob yo'q: tarixga ham, XP/logga ham hech narsa yozilmaydi
+                        chat.failed = True
+                        st.error(f"⚠️ Xatolik: {e.user_message}")
                     else:
-                        for chunk in stream:
-                            if chunk.choices[0].delta.content:
-                                full_text += chunk.choices[0].delta.content
-                                placeholder.markdown(full_text + "▌")
-                        placeholder.markdown(full_text)
-
-                        audio = text_to_audio(full_text)
+                        # Javob ovozdan oldin saqlanadi: kutish paytida tugma
+                        # bosilsa (rerun) ham yo'qolmaydi va qayta so'ralmaydi
+                        chat.append("assistant", full_text)
+                        chat.after_reply()
+                        write_queue = get_write_queue()
+                        write_queue.submit("xp", st.session_state.username, 10)
+                        write_queue.submit("log", st.session_state.username,
+                                           f"{activity.CHAT_PREFIX}{mentor_type}")
+
+                        audio = metrics.timed(metrics.TTS_SECONDS, "finish")(speech.finish)()
                         if audio:
                             st.audio(audio, format="audio/mp3")
-
-                st.session_state.messages.append(
-                    {"role": "assistant", "content": full_text})
-
-                add_xp(st.session_state.username, 10)
-                add_log(st.session_state.username, f"Chat: {mentor_type}")
-                new_badges = check_achievements(st.session_state.username)
-                if new_badges:
-                    for b in new_badges:
-                        st.toast(f"🎉 Yangi nishon: {b}", icon="🏅")
+            elif chat.failed:
+                if st.button("🔄 Qayta urinish", key="chat_retry"):
+                    chat.failed = False
+                    st.rerun()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
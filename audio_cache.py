@@ -0,0 +1,113 @@
+import collections
+import os
+import tempfile
+import threading
+
+import tts
+
+# ==========================================
+# 🎧 OVOZ KESHI (DISKDA, KONTENT MANZILLI)
+# ==========================================
+# Kalit = sha256(tozalangan matn, til, tezlik). Fayllar diskda, indeks
+# xotirada (LRU, bayt budjeti bilan). Yozish vaqtinchalik faylga qilinib
+# os.replace bilan almashtiriladi — boshqa sessiya yarim faylni ko'rmaydi.
+# Bo'laklar kichik (bir necha KiB) va baribir ulanadi — oddiy f.read().
+
+CACHE_DIR = os.environ.get("ZUKKO_AUDIO_CACHE", "audio_cache")
+MAX_BYTES = int(os.environ.get("ZUKKO_AUDIO_CACHE_MB", "256")) * 1024 * 1024
+SUFFIX = ".mp3"
+
+
+class AudioCache:
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index = collections.OrderedDict()   # key -> hajm
+        self._total = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        os.makedirs(root, exist_ok=True)
+        self._load()
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key + SUFFIX)
+
+    def _load(self):
+        # Eski fayllar oxirgi o'zgartirilgan vaqti bo'yicha LRU tartibida
+        found = []
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                if not name.endswith(SUFFIX):
+                    continue
+                st = os.stat(os.path.join(dirpath, name))
+                found.append((st.st_mtime, name[:-len(SUFFIX)], st.st_size))
+        for _, key, size in sorted(found):
+            self._index[key] = size
+            self._total += size
+        self._evict()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._index:
+                self.stats["misses"] += 1
+                return None
+            self._index.move_to_end(key)
+            self.stats["hits"] += 1
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            data = None
+        if not data:
+            # Fayl tashqaridan o'chirilgan yoki bo'sh
+            with self._lock:
+                self._total -= self._index.pop(key, 0)
+            return None
+        return data
+
+    def put(self, key, data):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        with self._lock:
+            self._total += len(data) - self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self._evict()
+
+    def _evict(self):
+        while self._total > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._total -= size
+            self.stats["evictions"] += 1
+            try:
+                os.unlink(self._path(key))
+            except OSError:
+                pass
+
+    def size(self):
+        with self._lock:
+            return self._total
+
+
+class CachedBackend:
+    """Har qanday TTS backend'ni gap darajasida keshlaydi."""
+
+    def __init__(self, backend, cache):
+        self.backend = backend
+        self.cache = cache
+
+    def synthesize(self, text, lang=tts.LANG, slow=False):
+        key = tts.cache_key(text, lang, slow)
+        hit = self.cache.get(key)
+        if hit is not None:
+            return hit
+        data = self.backend.synthesize(text, lang, slow)
+        self.cache.put(key, data)
+        return data
@@ -0,0 +1,105 @@
+# Faollik: rollup jadvallaridan o'qish va xom loglarni skanerlash, hamda
+# eski loglarni siqishdan keyin fayl hajmi. Rollup qiymatlari siqishdan
+# keyin o'zgarmasligi tekshiriladi.
+#
+#   python -m benchmarks.bench_activity --logs 1000000 --days 365
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+import activity
+import db
+import migrations
+
+MENTORS = ["🌐 Universal Yordamchi", "🇬🇧 Ingliz tili (Speaking)", "💻 IT va Dasturlash",
+           "📚 Ona tili va Adabiyot", "📐 Matematika va Fizika"]
+RAW_TODAY = "SELECT COUNT(*) FROM logs WHERE time LIKE ? || '%'"
+RAW_DAU = "SELECT COUNT(DISTINCT username) FROM logs WHERE time >= ?"
+RAW_MENTOR = '''SELECT action, COUNT(*) FROM logs WHERE time >= ? AND action LIKE 'Chat: %'
+                GROUP BY action'''
+
+
+def timed(label, fn, repeat=5):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    print(f"  {label:<30} {(time.perf_counter() - t0) / repeat * 1000:9.2f} ms")
+
+
+def file_size(path):
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logs", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--retention", type=int, default=30)
+    args = parser.parse_args()
+    rnd = random.Random(11)
+    today = datetime.date.today()
+
+    def row():
+        day = today - datetime.timedelta(days=rnd.randrange(args.days))
+        action = activity.CHAT_PREFIX + rnd.choice(MENTORS) if rnd.random() < 0.8 else "Kirdi"
+        return (f"u{rnd.randrange(args.users)}", action,
+                f"{day.isoformat()} {rnd.randrange(24):02d}:{rnd.randrange(60):02d}:00")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "activity.db")
+        db.configure(path)
+        # Xom loglar migratsiyadan oldin — 7-qadam ularni rollup'ga to'ldiradi
+        migrations.MIGRATIONS, full = migrations.MIGRATIONS[:6], migrations.MIGRATIONS
+        migrations.ensure_schema()
+        db.executemany("INSERT INTO logs(username, action, time) VALUES (?,?,?)",
+                       (row() for _ in range(args.logs)))
+        migrations.MIGRATIONS, migrations._done_for = full, None
+        t0 = time.perf_counter()
+        migrations.ensure_schema()
+        print(f"{args.logs:,} log, backfill {time.perf_counter() - t0:.1f}s, "
+              f"fayl {file_size(path) / 2**20:.1f} MiB")
+
+        t0 = time.perf_counter()
+        for i in range(2000):
+            activity.add_log(f"u{i % args.users}", "Kirdi")
+        print(f"  add_log (log + 2 rollup)       "
+              f"{(time.perf_counter() - t0) / 2000 * 1e6:9.1f} us")
+
+        week = (today - datetime.timedelta(days=6)).isoformat()
+        print("Xom loglar:")
+        timed("bugungi amallar", lambda: db.query_one(RAW_TODAY, (today.isoformat(),)))
+        timed("WAU", lambda: db.query_one(RAW_DAU, (week,)))
+        timed("mentorlar (7 kun)", lambda: db.query(RAW_MENTOR, (week,)))
+        print("Rollup:")
+        timed("bugungi amallar", activity.events_on)
+        timed("WAU", lambda: activity.active_users(7))
+        timed("DAU (14 kun)", lambda: activity.daily_active_users(14))
+        timed("mentorlar (7 kun)", lambda: activity.messages_per_mentor(7))
+
+        before = (activity.events_on(), activity.active_users(7),
+                  [tuple(r) for r in activity.messages_per_mentor(7)])
+        raw_today = db.query_one(RAW_TODAY, (today.isoformat(),))[0]
+        size_before = file_size(path)
+        t0 = time.perf_counter()
+        removed = activity.compact(args.retention, pause=0)
+        elapsed = time.perf_counter() - t0
+        with db.connection() as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        after = (activity.events_on(), activity.active_users(7),
+                 [tuple(r) for r in activity.messages_per_mentor(7)])
+        print(f"Siqish ({args.retention} kun): {removed:,} log o'chirildi, {elapsed:.1f}s, "
+              f"{size_before / 2**20:.1f} -> {file_size(path) / 2**20:.1f} MiB")
+        db.close_all()
+
+    ok = before == after and before[0] == raw_today
+    print("rollup'lar siqishdan keyin o'zgarmadi" if ok else f"XATO: {before} != {after}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
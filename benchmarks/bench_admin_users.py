@@ -0,0 +1,78 @@
+# Admin foydalanuvchilar jadvali: butun jadvalni o'qish (eski
+# view_all_users, sahifaga 2 marta) va SQL'dagi sahifalash + COUNT.
+# Vaqt va tracemalloc bo'yicha eng yuqori xotira.
+#
+#   python -m benchmarks.bench_admin_users --users 50000
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import db
+import migrations
+import users
+
+OLD_SQL = "SELECT username, role, xp, level, streak, total_messages, joined FROM users"
+
+
+def measure(label, fn, repeat=5):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - t0) / repeat * 1000
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"  {label:<34} {elapsed:8.2f} ms   peak {peak / 1024:9.1f} KiB")
+
+
+def walk(sort, pages, **filters):
+    cursor = None
+    for _ in range(pages):
+        rows, cursor = users.browse(sort, cursor, users.PAGE_SIZE, **filters)
+        if cursor is None:
+            break
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50_000)
+    args = parser.parse_args()
+    rnd = random.Random(17)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, "users.db"))
+        migrations.ensure_schema()
+        db.executemany(
+            '''INSERT INTO users(username, password, role, xp, level, streak,
+                                 total_messages, joined) VALUES (?,?,?,?,?,?,?,?)''',
+            ((f"student{i}", "x" * 64, "student", xp := rnd.randrange(20_000),
+              xp // 100 + 1, rnd.randrange(30), rnd.randrange(2000),
+              f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d} 09:00:00")
+             for i in range(args.users)))
+        print(f"{args.users:,} foydalanuvchi")
+
+        def old_render():
+            # Jadval uchun bir marta, len(users_df) uchun yana bir marta
+            table = db.query(OLD_SQL)
+            total = len(db.query(OLD_SQL))
+            return table, total
+
+        measure("eski: butun jadval x2", old_render)
+        measure("yangi: 1-sahifa + COUNT (xp)",
+                lambda: (users.browse("xp"), users.count()))
+        measure("yangi: 20-sahifa (xp, keyset)", lambda: walk("xp", 20))
+        measure("yangi: filtr daraja 50-60 + COUNT",
+                lambda: (users.browse("xp", min_level=50, max_level=60),
+                         users.count(min_level=50, max_level=60)))
+        measure("yangi: qidiruv '1234' + COUNT",
+                lambda: (users.browse("username", search="1234"),
+                         users.count(search="1234")))
+        measure("yangi: rollar soni", users.count_by_role)
+        db.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# Ommaviy import: har foydalanuvchi alohida tranzaksiyada (ro'yxatdan
+# o'tish formasi kabi) va users.import_csv (partiyalar + jarayonlar
+# hovuzida xeshlash). 1% qatorlar — takroriy username. KDF narxi
+# pasaytirilgan (--cost): bu yerda yozish usuli o'lchanadi, KDF narxi
+# bench_login'da.
+#
+#   python -m benchmarks.bench_bulk_import --rows 50000
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+import db
+import migrations
+import passwords
+import users
+
+
+def fresh(tmp, name):
+    db.configure(os.path.join(tmp, name))
+    migrations.ensure_schema()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--cost", type=int, default=8, help="scrypt ln")
+    args = parser.parse_args()
+    # Hovuz jarayonlari fork orqali shu qiymatni meros oladi
+    passwords.COST_LN = args.cost
+    rnd = random.Random(18)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "students.csv")
+        names = [f"student{i}" for i in range(args.rows)]
+        dups = set(rnd.sample(range(1, args.rows), args.rows // 100))
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["username", "password", "role"])
+            for i in range(args.rows):
+                writer.writerow([names[i - 1] if i in dups else names[i],
+                                 f"parol{rnd.randrange(10**9)}", "student"])
+        print(f"{args.rows:,} qator, {len(dups)} takroriy, scrypt ln={args.cost}")
+
+        fresh(tmp, "one_by_one.db")
+        t0 = time.perf_counter()
+        created = 0
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                created += users.create_user(row["username"], row["password"], row["role"])
+        single = time.perf_counter() - t0
+        print(f"  har biri alohida     {single:6.2f}s  {args.rows / single:9.0f} qator/s"
+              f"  ({created} qo'shildi)")
+
+        for workers in sorted({1, args.workers}):
+            fresh(tmp, f"bulk_{workers}.db")
+            t0 = time.perf_counter()
+            result = users.import_csv(path, workers=workers)
+            bulk = time.perf_counter() - t0
+            print(f"  import_csv ({workers} jarayon) {bulk:6.2f}s  {args.rows / bulk:9.0f} qator/s"
+                  f"  ({result['created']} qo'shildi, {result['failed']} xato)")
+            if result["created"] != created or result["failed"] != args.rows - created:
+                sys.exit("XATO: natija har-biri-alohida usuli bilan mos emas")
+
+        out = io.StringIO()
+        t0 = time.perf_counter()
+        written = users.export_csv(out)
+        print(f"  export_csv           {time.perf_counter() - t0:6.2f}s  "
+              f"{written} qator, {len(out.getvalue()) / 2**20:.1f} MiB")
+        db.close_all()
+
+
+if __name__ == "__main__":
+    main()
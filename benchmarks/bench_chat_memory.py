@@ -0,0 +1,135 @@
+# Uzun suhbatda sessiya xotirasi: hamma xabar st.session_state'dagi
+# ro'yxatda (eski) va chats.ChatSession oynasi (yangi). Xabarlar bazaga
+# write-behind orqali siqilgan holda yoziladi; oxirida barcha xabarlar
+# bazadan to'liq va o'zgarishsiz o'qilishi, davom ettirish va eski
+# xabarlarni yuklash vaqti tekshiriladi.
+#
+#   python -m benchmarks.bench_chat_memory --turns 300
+import argparse
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import chats
+import context
+import db
+import events
+import migrations
+
+WORDS = ("fotosintez energiya hujayra xlorofill quyosh nuri karbonat angidrid kislorod "
+         "glyukoza barg ildiz suv jarayon natija misol formula tenglama kuch tezlik "
+         "massa tezlanish Nyuton qonuni harakat jism masofa vaqt birlik o'lchov").split()
+
+
+def text(rnd, words):
+    return " ".join(rnd.choice(WORDS) for _ in range(words)) + "."
+
+
+def fake_summary(previous, turns):
+    # LLM o'rniga: xulosa hajmi cheklangan (haqiqiy max_tokens=400 kabi)
+    return (previous + " " + " ".join(m["content"][:40] for m in turns))[-1600:]
+
+
+def conversation(turns):
+    rnd = random.Random(3)
+    for i in range(turns):
+        yield "user", f"#{i} " + text(rnd, rnd.randint(8, 40))
+        yield "assistant", text(rnd, rnd.randint(150, 450))
+
+
+def measure(fn):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    keep = fn()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return keep, after - before
+
+
+def wait_summary(window):
+    # Fon xulosasi tugashini kutish (haqiqiy LLM'da bir necha soniya)
+    pending = window._pending
+    if pending is not None:
+        pending[0].result()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=300)
+    parser.add_argument("--cap-kb", type=int, default=chats.MEMORY_CAP // 1024)
+    args = parser.parse_args()
+    messages = list(conversation(args.turns))
+    raw_bytes = sum(len(c.encode()) for _, c in messages)
+
+    def old_session():
+        window = context.ContextWindow(fake_summary)
+        history = []
+        # Matnlar sessiya ichida yaratiladi (haqiqiy kiritish/javob kabi)
+        for role, content in conversation(args.turns):
+            history.append({"role": role, "content": content})
+            if role == "user":
+                window.build("system", history)
+                wait_summary(window)
+        return history, window
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, "chat.db"))
+        migrations.ensure_schema()
+        queue = events.WriteBehindQueue({"chat_summary": chats.save_summary})
+
+        def new_session():
+            window = context.ContextWindow(fake_summary)
+            session = chats.ChatSession("ali", "mentor", window, queue.submit, queue.sync,
+                                        memory_cap=args.cap_kb * 1024)
+            for role, content in conversation(args.turns):
+                session.append(role, content)
+                if role == "user":
+                    window.build("system", session.messages)
+                    wait_summary(window)
+                else:
+                    session.after_reply()
+            queue.flush(timeout=60)
+            return session
+
+        old, old_mem = measure(old_session)
+        session, new_mem = measure(new_session)
+        print(f"{args.turns} savol-javob ({len(messages)} xabar, {raw_bytes / 1024:.0f} KiB matn)")
+        print(f"  eski: session_state ro'yxati    {old_mem / 1024:8.0f} KiB")
+        print(f"  yangi: ChatSession oynasi        {new_mem / 1024:8.0f} KiB "
+              f"({len(session.messages)} xabar xotirada, {session.stats['spilled']} chiqarildi)")
+
+        stored = db.query_one("SELECT SUM(length(content)), SUM(codec) FROM messages")
+        print(f"  bazada: {stored[0] / 1024:.0f} KiB ({stored[1]} ta siqilgan, "
+              f"{stored[0] / raw_bytes:.0%} asl hajmdan)")
+
+        t0 = time.perf_counter()
+        resumed = chats.ChatSession.resume("ali", "mentor", context.ContextWindow(fake_summary),
+                                           queue.submit, queue.sync)
+        resume_ms = (time.perf_counter() - t0) * 1000
+        t0 = time.perf_counter()
+        loaded = resumed.load_older()
+        older_ms = (time.perf_counter() - t0) * 1000
+        print(f"  davom ettirish {resume_ms:.1f} ms ({len(resumed.messages)} xabar), "
+              f"eski {loaded} xabar {older_ms:.1f} ms")
+
+        everything = chats.load(session.conversation_id, limit=len(messages) + 1)
+        ok = [(m["role"], m["content"]) for _, m in everything] == messages
+        ok &= [s for s, _ in everything] == list(range(len(messages)))
+        ok &= session.messages == [{"role": r, "content": c}
+                                   for r, c in messages[session.offset:]]
+        ok &= bool(resumed.window.summary) and new_mem < old_mem
+        queue.stop()
+        db.close_all()
+
+    print("tarix to'liq va o'zgarishsiz" if ok else "XATO: tarix mos emas")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# Eski (har chaqiruvda sqlite3.connect) va yangi (db hovuzi) usullarni
+# bir vaqtdagi sessiyalar ostida solishtirish.
+#
+#   python -m benchmarks.bench_db_pool --sessions 50 --turns 40
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+import db
+
+SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS users
+       (username TEXT PRIMARY KEY, password TEXT, role TEXT,
+        xp INTEGER DEFAULT 0, level INTEGER DEFAULT 1,
+        badges TEXT DEFAULT '[]', total_messages INTEGER DEFAULT 0)''',
+    'CREATE TABLE IF NOT EXISTS logs (username TEXT, action TEXT, time TEXT)',
+]
+
+
+def setup(path, sessions):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    for sql in SCHEMA:
+        conn.execute(sql)
+    conn.executemany("INSERT INTO users(username, password, role) VALUES (?,?,?)",
+                     [(f"user{i}", "x", "student") for i in range(sessions)])
+    conn.commit()
+    conn.close()
+
+
+# Bitta chat navbati: stats o'qish, XP, log, yana stats (yutuqlar uchun)
+def turn_per_call(path, username):
+    def one(sql, params, write):
+        conn = sqlite3.connect(path, timeout=30)
+        c = conn.cursor()
+        c.execute(sql, params)
+        if write:
+            conn.commit()
+        else:
+            c.fetchone()
+        conn.close()
+
+    one('SELECT xp, level, badges FROM users WHERE username = ?', (username,), False)
+    one('UPDATE users SET xp = xp + 10, total_messages = total_messages + 1 WHERE username = ?',
+        (username,), True)
+    one('SELECT xp FROM users WHERE username = ?', (username,), False)
+    one('UPDATE users SET level = xp / 100 + 1 WHERE username = ?', (username,), True)
+    one('INSERT INTO logs VALUES (?, ?, ?)', (username, "Chat", "2026-01-01 00:00:00"), True)
+    one('SELECT xp, level, badges FROM users WHERE username = ?', (username,), False)
+
+
+def turn_pooled(path, username):
+    db.query_one('SELECT xp, level, badges FROM users WHERE username = ?', (username,))
+    with db.transaction() as c:
+        c.execute('UPDATE users SET xp = xp + 10, total_messages = total_messages + 1 WHERE username = ?',
+                  (username,))
+        c.execute('SELECT xp FROM users WHERE username = ?', (username,)).fetchone()
+        c.execute('UPDATE users SET level = xp / 100 + 1 WHERE username = ?', (username,))
+        c.execute('INSERT INTO logs VALUES (?, ?, ?)', (username, "Chat", "2026-01-01 00:00:00"))
+    db.query_one('SELECT xp, level, badges FROM users WHERE username = ?', (username,))
+
+
+def run(turn, path, sessions, turns):
+    latencies = []
+    lock = threading.Lock()
+
+    def session(i):
+        local = []
+        for _ in range(turns):
+            t0 = time.perf_counter()
+            turn(path, f"user{i}")
+            local.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "turns_per_s": len(latencies) / wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=40)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, turn in [("per-call", turn_per_call), ("pooled", turn_pooled)]:
+            path = os.path.join(tmp, f"{name}.db")
+            setup(path, args.sessions)
+            db.configure(path)
+            res = run(turn, path, args.sessions, args.turns)
+            db.close_all()
+            print(f"{name:>9}: {res['turns_per_s']:8.1f} turn/s  "
+                  f"p50 {res['p50_ms']:6.2f} ms  p95 {res['p95_ms']:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# Parallel tablar stsenariysi: bir nechta thread bitta o'quvchiga bir
+# vaqtda XP beradi. Yo'qolgan XP yoki takroriy nishon bo'lsa — xato bilan
+# chiqadi.
+#
+#   python -m benchmarks.bench_gamification_stress --threads 16 --awards 200
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import db
+import gamification
+import migrations
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--awards", type=int, default=200)
+    parser.add_argument("--amount", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, "stress.db"))
+        migrations.ensure_schema()
+        db.execute("INSERT INTO users(username, password, role) VALUES ('ali', 'x', 'student')")
+
+        earned = []
+        lock = threading.Lock()
+
+        def tab():
+            for _ in range(args.awards):
+                got = gamification.add_xp("ali", args.amount)
+                with lock:
+                    earned.extend(got["badges"])
+
+        threads = [threading.Thread(target=tab) for _ in range(args.threads)]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - t0
+
+        total = args.threads * args.awards
+        stats = gamification.get_user_stats("ali")
+        expected_badges = sorted(
+            b for b, metric, threshold, _ in gamification.badge_rules()
+            if (metric == "total_messages" and threshold <= total)
+            or (metric == "level" and threshold <= gamification.level_for(total * args.amount)))
+        db.close_all()
+
+    print(f"{total} award, {total / wall:.0f} award/s")
+    problems = []
+    if stats["xp"] != total * args.amount:
+        problems.append(f"xp {stats['xp']} != {total * args.amount}")
+    if stats["total_messages"] != total:
+        problems.append(f"total_messages {stats['total_messages']} != {total}")
+    if stats["level"] != gamification.level_for(total * args.amount):
+        problems.append(f"level {stats['level']}")
+    if sorted(earned) != expected_badges or sorted(stats["badges"]) != expected_badges:
+        problems.append(f"badges {sorted(earned)} != {expected_badges}")
+    if problems:
+        sys.exit("lost updates: " + "; ".join(problems))
+    print("ok: no lost updates")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# Sinf bir vaqtda "Test tuzish" bosadi: 300 ta so'rov lokal stub'ga.
+# Stub provayder kabi parallel so'rovlarni cheklaydi (oshsa 429).
+# Uch holat: to'g'ridan-to'g'ri (gateway'siz), gateway FIFO va gateway
+# adolatli (round-robin + qisqalar oldinda). Navbatda kutish p50/p95/p99,
+# qisqa/uzun va "ko'p so'rov yuboruvchi" o'quvchi alohida.
+#
+#   python -m benchmarks.bench_gateway --requests 300 --concurrency 8
+import argparse
+import random
+import statistics
+import threading
+import time
+
+import context
+import gateway
+import llm
+from benchmarks.stub_llm import start_stub
+
+LONG_TEXT = "Matematika bo'yicha uzun mavzu matni. " * 400   # ~2-3k token
+SHORT_TEXT = "Test tuzib ber: kasrlar."
+
+
+def percentile(samples, p):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def workload(n, rnd):
+    """(user, messages) — bitta o'quvchi so'rovlarning 20% ini yuboradi."""
+    jobs = []
+    for i in range(n):
+        user = "spammer" if i % 5 == 0 else f"student{rnd.randrange(30)}"
+        text = LONG_TEXT if rnd.random() < 0.25 else SHORT_TEXT
+        jobs.append((user, [{"role": "user", "content": text}]))
+    rnd.shuffle(jobs)
+    return jobs
+
+
+def run(mode, jobs, base_url, concurrency, max_tokens):
+    client = llm.LLMClient(api_key="stub", base_url=base_url)
+    gw = gateway.Gateway(max_concurrent=concurrency) if mode != "direct" else None
+    barrier = threading.Barrier(len(jobs))
+    results = []
+    lock = threading.Lock()
+
+    def worker(user, messages):
+        cost = sum(context.message_tokens(m) for m in messages)
+        barrier.wait()
+        t0 = time.monotonic()
+        wait, error = 0.0, None
+        try:
+            def open_stream():
+                return client.stream_chat("stub", messages, max_tokens=max_tokens)
+            if gw is None:
+                stream = open_stream()
+            elif mode == "fifo":
+                # Hamma bitta navbatda, tartib kelish bo'yicha
+                stream = gw.stream("all", 0, open_stream)
+            else:
+                stream = gw.stream(user, cost, open_stream)
+            wait = time.monotonic() - t0
+            for _ in stream:
+                pass
+        except llm.LLMError as exc:
+            error = type(exc).__name__
+        with lock:
+            results.append((user, cost, wait, time.monotonic() - t0, error))
+
+    threads = [threading.Thread(target=worker, args=job) for job in jobs]
+    t0 = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - t0
+    client.close()
+    if gw is not None:
+        gw.close()
+    return results, elapsed
+
+
+def report(mode, results, elapsed, short_tokens):
+    ok = [r for r in results if r[4] is None]
+    errors = len(results) - len(ok)
+    print(f"{mode}: {elapsed:.1f}s, {len(ok)} ok, {errors} xato")
+
+    def line(label, rows, col=2):
+        waits = [r[col] for r in rows]
+        print(f"  {label:<26} n={len(rows):<4} p50 {percentile(waits, 0.5):6.2f}s  "
+              f"p95 {percentile(waits, 0.95):6.2f}s  p99 {percentile(waits, 0.99):6.2f}s")
+
+    line("navbatda kutish (hammasi)", ok)
+    line("  qisqa so'rovlar", [r for r in ok if r[1] <= short_tokens])
+    line("  uzun so'rovlar", [r for r in ok if r[1] > short_tokens])
+    line("  spammer", [r for r in ok if r[0] == "spammer"])
+    line("  boshqa o'quvchilar", [r for r in ok if r[0] != "spammer"])
+    line("to'liq javob vaqti", ok, col=3)
+    if ok:
+        print(f"  o'rtacha javob vaqti {statistics.mean(r[3] for r in ok):.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--provider-limit", type=int, default=10)
+    parser.add_argument("--rate", type=float, default=400, help="token/s har stream")
+    parser.add_argument("--max-tokens", type=int, default=100)
+    parser.add_argument("--modes", default="direct,fifo,fair")
+    args = parser.parse_args()
+    jobs = workload(args.requests, random.Random(21))
+
+    for mode in args.modes.split(","):
+        server, base_url, cfg = start_stub(rate=args.rate, tokens=args.max_tokens,
+                                           latency=0.05, max_concurrent=args.provider_limit)
+        results, elapsed = run(mode, jobs, base_url, args.concurrency, args.max_tokens)
+        report(mode, results, elapsed, gateway.SHORT_TOKENS)
+        print(f"  stub: eng ko'p parallel {cfg.peak_active}, 429 javoblar {cfg.rejected}")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# Har xabar uchun yangi klient (eski ZukkoEngine) va umumiy LLMClient ni
+# lokal stub'ga qarshi solishtirish, hamda retry/xato turlarini tekshirish.
+#
+#   python -m benchmarks.bench_llm_client --messages 50
+import argparse
+import statistics
+import sys
+import time
+
+import llm
+from benchmarks.stub_llm import start_stub
+
+MESSAGES = [{"role": "user", "content": "Salom!"}]
+
+
+def first_token_latency(client):
+    t0 = time.perf_counter()
+    stream = client.stream_chat("stub", MESSAGES, max_tokens=20)
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            ttft = time.perf_counter() - t0
+            break
+    for _ in stream:
+        pass
+    return ttft
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=50)
+    args = parser.parse_args()
+
+    server, base_url, config = start_stub(rate=0, tokens=20, latency=0.0)
+
+    cold = []
+    for _ in range(args.messages):
+        client = llm.LLMClient("stub-key", base_url=base_url)
+        cold.append(first_token_latency(client))
+        client.close()
+    cold_conns = config.connections
+
+    shared = llm.LLMClient("stub-key", base_url=base_url)
+    shared.warm_up().join()
+    warm = [first_token_latency(shared) for _ in range(args.messages)]
+    warm_conns = config.connections - cold_conns
+    shared.close()
+    server.shutdown()
+
+    print(f"per-message client: ttft p50 {statistics.median(cold) * 1000:6.2f} ms, "
+          f"{cold_conns} ulanish")
+    print(f"      shared client: ttft p50 {statistics.median(warm) * 1000:6.2f} ms, "
+          f"{warm_conns} ulanish")
+
+    # 429 -> qayta urinish muvaffaqiyatli bo'lishi kerak
+    problems = []
+    server, base_url, _ = start_stub(rate=0, tokens=5, latency=0.0,
+                                     fail_first=2, fail_status=429)
+    sleeps = []
+    client = llm.LLMClient("stub-key", base_url=base_url, sleep=sleeps.append)
+    try:
+        first_token_latency(client)
+        if len(sleeps) != 2:
+            problems.append(f"429: {len(sleeps)} marta kutildi, 2 kutilgan edi")
+    except llm.LLMError as e:
+        problems.append(f"429 dan keyin tiklanmadi: {e!r}")
+    client.close()
+    server.shutdown()
+
+    # Doimiy 500 -> LLMUnavailable, MAX_RETRIES urinishdan keyin
+    server, base_url, _ = start_stub(fail_first=10**6, fail_status=500)
+    client = llm.LLMClient("stub-key", base_url=base_url, sleep=lambda s: None)
+    try:
+        first_token_latency(client)
+        problems.append("500: xato kutilgan edi")
+    except llm.LLMUnavailable:
+        pass
+    client.close()
+    server.shutdown()
+
+    if problems:
+        sys.exit("; ".join(problems))
+    print("ok: retry va xato turlari to'g'ri")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+# Bir server nechta o'quvchini ko'tara oladi: N ta sessiya (Streamlit
+# AppTest, bitta jarayon — haqiqiy server kabi umumiy cache_resource,
+# navbat va DB hovuzi bilan) kiradi, chatda yozadi, eslatmalar va
+# reytingni ochadi. LLM — lokal stub (token tezligi sozlanadi), baza —
+# vaqtinchalik fayl, ovoz — tarmoqsiz soxta backend.
+#
+# Natija JSON: har bosqich (sessiyalar soni) uchun amallar bo'yicha
+# p50/p95/p99, xatolar, DB yozish qulfini kutish, LLM TTFT va o'tkazuvchanlik.
+#
+#   python -m benchmarks.bench_load --sessions 1,5,10,20 --rate 100 --out load.json
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest
+
+import db
+import metrics
+import migrations
+import passwords
+import tts
+import users
+from benchmarks.stub_llm import start_stub
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+PASSWORD = "yuklama123"
+LIMITED = "Juda ko'p urinish"
+TOPICS = ["fotosintez", "Nyuton qonunlari", "Present Perfect", "Python ro'yxatlari",
+          "kasrlarni qo'shish", "Alisher Navoiy", "elektr toki", "sikllar"]
+
+
+class SilentBackend:
+    """Tarmoqsiz TTS: gTTS kechikishini taqlid qiladi."""
+
+    delay = 0.05
+
+    def synthesize(self, text, lang=tts.LANG, slow=False):
+        time.sleep(self.delay)
+        return b"\xff\xf3" + text.encode()[:64]
+
+
+def share_runtime():
+    """AppTest bitta sessiya uchun yozilgan: har run oxirida global Runtime'ni
+    None qiladi va skriptni qayta kompilyatsiya qiladi. Haqiqiy serverdagidek
+    Runtime va skript bayt-kodi sessiyalar orasida umumiy qilinadi."""
+    last = []
+    compiled = {}
+    compile_lock = threading.Lock()
+    get_bytecode = ScriptCache.get_bytecode
+
+    def shared_bytecode(self, script_path):
+        with compile_lock:
+            if script_path not in compiled:
+                compiled[script_path] = get_bytecode(self, script_path)
+            return compiled[script_path]
+
+    def instance(cls):
+        if cls._instance is not None:
+            last[:] = [cls._instance]
+            return cls._instance
+        if last:
+            return last[0]
+        raise RuntimeError("Runtime hasn't been created!")
+
+    Runtime.instance = classmethod(instance)
+    ScriptCache.get_bytecode = shared_bytecode
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summarize(samples):
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 1),
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+
+def histogram_delta(histogram, before):
+    """Bosqich davomidagi o'zgarish (metrikalar jarayon bo'yi yig'iladi)."""
+    counts = [0] * (len(histogram.buckets) + 1)
+    total = 0.0
+    for values, series in histogram.series():
+        now, sum_, _ = series.snapshot()
+        old, old_sum = before.get(values, ([0] * len(now), 0.0))
+        counts = [c + n - o for c, n, o in zip(counts, now, old)]
+        total += sum_ - old_sum
+    n = sum(counts)
+    if not n:
+        return {"count": 0}
+    return {
+        "count": n,
+        "total_ms": round(total * 1000, 1),
+        "p50_ms": round(metrics.quantile(histogram.buckets, counts, 0.50) * 1000, 2),
+        "p95_ms": round(metrics.quantile(histogram.buckets, counts, 0.95) * 1000, 2),
+        "p99_ms": round(metrics.quantile(histogram.buckets, counts, 0.99) * 1000, 2),
+    }
+
+
+def histogram_state(histogram):
+    return {values: series.snapshot()[:2] for values, series in histogram.series()}
+
+
+class Session:
+    def __init__(self, index, args, results, lock):
+        self.username = f"load{index}"
+        self.args = args
+        self.results = results
+        self.lock = lock
+        self.rnd = random.Random(index)
+        self.at = AppTest.from_file(APP, default_timeout=args.timeout)
+        self.at.secrets["GROQ_API_KEY"] = "stub"
+
+    def _timed(self, action, fn):
+        t0 = time.perf_counter()
+        error = None
+        try:
+            fn()
+            if self.at.exception:
+                error = self.at.exception[0].message
+        except Exception as exc:   # timeout yoki skript xatosi — natijaga yoziladi
+            error = repr(exc)
+        elapsed = time.perf_counter() - t0
+        with self.lock:
+            entry = self.results.setdefault(action, {"samples": [], "errors": []})
+            (entry["errors"] if error else entry["samples"]).append(error or elapsed)
+        return error is None
+
+    def _think(self):
+        time.sleep(self.rnd.uniform(0, 2 * self.args.think))
+
+    def _login(self):
+        for _ in range(30):
+            self.at.text_input(key="login_user").input(self.username)
+            self.at.text_input(key="login_pass").input(PASSWORD)
+            next(b for b in self.at.button if b.label == "🚀 Kirish").click().run()
+            # Sinf bitta IP ortida: limiter ruxsat berguncha kutamiz
+            if not any(LIMITED in e.value for e in self.at.error):
+                break
+            time.sleep(1.0)
+        if not self.at.session_state["logged_in"]:
+            raise RuntimeError("login failed")
+
+    def _page(self, label):
+        self.at.sidebar.radio[0].set_value(label).run()
+
+    def _chat(self, turn):
+        topic = self.rnd.choice(TOPICS)
+        text = f"{self.username} #{turn}: {topic} haqida qisqacha tushuntiring"
+        self.at.chat_input[0].set_value(text).run()
+        reply = self.at.session_state["chat"].messages[-1]
+        if reply["role"] != "assistant":
+            raise RuntimeError(self.at.error[0].value if self.at.error else "no reply")
+
+    def run(self):
+        self._timed("open", self.at.run)
+        if not self._timed("login", self._login):
+            return
+        self._think()
+        if self._timed("open_chat", lambda: self._page("🤖 AI Chat")):
+            for turn in range(self.args.turns):
+                self._think()
+                self._timed("chat", lambda: self._chat(turn))
+        self._think()
+        self._timed("notes", lambda: self._page("📝 Eslatmalar"))
+        self._think()
+        self._timed("leaderboard", lambda: self._page("🏆 Reyting"))
+
+
+def run_step(n, first, args):
+    results = {}
+    lock = threading.Lock()
+    lock_before = histogram_state(metrics.DB_LOCK_WAIT)
+    ttft_before = histogram_state(metrics.LLM_TTFT)
+    # Har bosqichda yangi o'quvchilar — oldingi savollar javob keshiga tushmasin
+    sessions = [Session(first + i, args, results, lock) for i in range(n)]
+    threads = [threading.Thread(target=s.run, name=f"load-{i}") for i, s in enumerate(sessions)]
+    t0 = time.perf_counter()
+    for i, t in enumerate(threads):
+        t.start()
+        time.sleep(args.ramp / max(1, n))   # bir vaqtda emas, qisqa oraliqda kelishadi
+    for t in threads:
+        t.join()
+    duration = time.perf_counter() - t0
+    actions = {}
+    completed = 0
+    for name, entry in sorted(results.items()):
+        actions[name] = summarize(entry["samples"])
+        actions[name]["errors"] = len(entry["errors"])
+        if entry["errors"]:
+            actions[name]["first_error"] = entry["errors"][0][:200]
+        completed += len(entry["samples"])
+    return {
+        "sessions": n,
+        "duration_s": round(duration, 2),
+        "throughput_actions_per_s": round(completed / duration, 2),
+        "chats_per_s": round(actions.get("chat", {}).get("count", 0) / duration, 2),
+        "actions": actions,
+        "db_lock_wait": histogram_delta(metrics.DB_LOCK_WAIT, lock_before),
+        "llm_ttft": histogram_delta(metrics.LLM_TTFT, ttft_before),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", default="1,5,10", help="bosqichlar, vergul bilan")
+    parser.add_argument("--turns", type=int, default=2, help="har sessiyada chat xabarlari")
+    parser.add_argument("--rate", type=float, default=100, help="stub token/s")
+    parser.add_argument("--tokens", type=int, default=120, help="javob uzunligi (token)")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub birinchi bayt kechikishi")
+    parser.add_argument("--think", type=float, default=0.3, help="amallar orasidagi o'rtacha pauza")
+    parser.add_argument("--ramp", type=float, default=2.0, help="sessiyalar kelish oralig'i (s)")
+    parser.add_argument("--tts-delay", type=float, default=0.05)
+    parser.add_argument("--cost", type=int, default=10, help="scrypt log2(N) (login narxi)")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--out", help="JSON fayl (bo'lmasa stdout)")
+    args = parser.parse_args()
+    steps = [int(s) for s in args.sessions.split(",")]
+
+    server, base_url, stub = start_stub(rate=args.rate, tokens=args.tokens,
+                                        latency=args.latency)
+    os.environ["ZUKKO_LLM_BASE_URL"] = base_url
+    SilentBackend.delay = args.tts_delay
+    tts.GTTSBackend = SilentBackend
+    passwords.COST_LN = args.cost
+    metrics.ENABLED = True
+    share_runtime()
+
+    report = {"config": vars(args), "runs": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, "load.db"))
+        migrations.ensure_schema()
+        metrics.instrument_db()
+        for i in range(sum(steps)):
+            users.create_user(f"load{i}", PASSWORD)
+        first = 0
+        for n in steps:
+            run = run_step(n, first, args)
+            first += n
+            report["runs"].append(run)
+            chat = run["actions"].get("chat", {})
+            print(f"{n:>4} sessiya: chat p50 {chat.get('p50_ms')} ms, p95 {chat.get('p95_ms')} ms, "
+                  f"{run['throughput_actions_per_s']} amal/s, "
+                  f"qulf p99 {run['db_lock_wait'].get('p99_ms')} ms", file=sys.stderr)
+        db.close_all()
+    server.shutdown()
+    report["stub"] = {"requests": stub.requests, "peak_active": stub.peak_active}
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    failed = sum(a.get("errors", 0) for r in report["runs"] for a in r["actions"].values())
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# Ertalabki "kirish to'lqini": ko'p sessiya bir vaqtda kiradi. Har xil
+# scrypt narxlarida (ln) o'tkazuvchanlik va kechikish, VerifyPool bilan.
+# Eski SHA-256 qatorlar birinchi kirishda qayta xeshlanishi tekshiriladi.
+#
+#   python -m benchmarks.bench_login --costs 12,13,14,15 --sessions 32
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import db
+import migrations
+import passwords
+import users
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def rush(pool, names, sessions):
+    latencies = []
+    failures = []
+    lock = threading.Lock()
+    chunks = [names[i::sessions] for i in range(sessions)]
+
+    def session(chunk):
+        for name in chunk:
+            t0 = time.perf_counter()
+            try:
+                ok = users.authenticate(name, f"pw-{name}", pool) is not None
+            except passwords.LoginBusy:
+                ok = False
+            with lock:
+                latencies.append(time.perf_counter() - t0)
+                if not ok:
+                    failures.append(name)
+
+    threads = [threading.Thread(target=session, args=(c,)) for c in chunks]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - t0, latencies, failures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--costs", default="12,13,14,15")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=passwords.VERIFY_WORKERS)
+    args = parser.parse_args()
+    costs = [int(c) for c in args.costs.split(",")]
+    print(f"{args.logins} kirish, {args.sessions} sessiya, {args.workers} ishchi, "
+          f"{os.cpu_count()} CPU")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, "login.db"))
+        migrations.ensure_schema()
+        pool = passwords.VerifyPool(workers=args.workers,
+                                    max_pending=max(args.sessions, args.workers))
+
+        # Eski bazadagi kabi: tuzsiz SHA-256
+        legacy = [f"old{i}" for i in range(args.logins)]
+        db.executemany("INSERT INTO users(username, password, role) VALUES (?,?,'student')",
+                       ((n, hashlib.sha256(f"pw-{n}".encode()).hexdigest()) for n in legacy))
+        passwords.COST_LN = costs[0]
+        elapsed, lat, failed = rush(pool, legacy, args.sessions)
+        migrated = db.query_one("SELECT COUNT(*) FROM users WHERE password LIKE 'scrypt$%'")[0]
+        print(f"  eski SHA-256 -> ln={costs[0]}: {args.logins / elapsed:7.1f} kirish/s, "
+              f"{migrated}/{len(legacy)} qayta xeshlandi")
+        if failed or migrated != len(legacy):
+            sys.exit("XATO: eski xeshlar to'liq almashtirilmadi")
+
+        for ln in costs:
+            passwords.COST_LN = ln
+            passwords.dummy_hash.cache_clear()
+            names = [f"s{ln}_{i}" for i in range(args.logins)]
+            hashed = passwords.hash_password("x")   # narxni o'lchash uchun
+            t0 = time.perf_counter()
+            passwords.verify("x", hashed)
+            one = (time.perf_counter() - t0) * 1000
+            db.executemany("INSERT INTO users(username, password, role) VALUES (?,?,'student')",
+                           ((n, passwords.hash_password(f"pw-{n}")) for n in names))
+            elapsed, lat, failed = rush(pool, names, args.sessions)
+            print(f"  ln={ln:<2} ({one:6.1f} ms/xesh)  {args.logins / elapsed:7.1f} kirish/s   "
+                  f"p50 {percentile(lat, 0.5) * 1000:7.1f} ms  "
+                  f"p95 {percentile(lat, 0.95) * 1000:7.1f} ms  "
+                  f"p99 {percentile(lat, 0.99) * 1000:7.1f} ms  xato {len(failed)}")
+
+        limiter = passwords.LoginLimiter()
+        allowed = sum(limiter.check("10.0.0.1", "ali") == 0 for _ in range(20))
+        print(f"  limiter: bitta username uchun 20 urinishdan {allowed} tasi o'tdi")
+        pool.close()
+        db.close_all()
+
+
+if __name__ == "__main__":
+    main()
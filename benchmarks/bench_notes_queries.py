@@ -0,0 +1,68 @@
+# Eslatmalar sahifasi: bitta rerun'da nechta SQL so'rov bajariladi.
+# Eski usul: ro'yxat + har eslatma uchun alohida matn (1 + N).
+# Yangi usul: bitta sahifa + bitta batched matn so'rovi (2).
+#
+#   python -m benchmarks.bench_notes_queries --sizes 10,100,500,2000
+import argparse
+import os
+import tempfile
+import time
+
+import db
+import migrations
+import notes
+
+
+def old_rerun(username):
+    # Asl app.py: get_notes, keyin har qator uchun get_note_content
+    rows = db.query('''SELECT id, title, subject, time FROM notes
+                       WHERE username = ? ORDER BY time DESC''', (username,))
+    for row in rows:
+        db.query_one("SELECT content FROM notes WHERE id = ?", (row['id'],))
+
+
+def new_rerun(username, page_size):
+    rows, _ = notes.list_page(username, None, page_size)
+    notes.get_bodies(username, [row['id'] for row in rows])
+
+
+def measure(fn, *args):
+    statements = []
+    with db.connection() as conn:
+        conn.set_trace_callback(statements.append)
+        t0 = time.perf_counter()
+        try:
+            fn(*args)
+        finally:
+            conn.set_trace_callback(None)
+    return len(statements), (time.perf_counter() - t0) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10,100,500,2000")
+    parser.add_argument("--page-size", type=int, default=notes.PAGE_SIZE)
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, "notes.db"))
+        migrations.ensure_schema()
+        print(f"{'eslatmalar':>10} {'eski so`rov':>12} {'eski ms':>9} "
+              f"{'yangi so`rov':>13} {'yangi ms':>9}")
+        for n in sizes:
+            username = f"student{n}"
+            db.executemany(
+                '''INSERT INTO notes(username, title, content, subject, time)
+                   VALUES (?,?,?,?,?)''',
+                ((username, f"Mavzu {i}", "matn " * 200, "IT",
+                  f"2025-01-01 00:{i // 60 % 60:02d}:{i % 60:02d}")
+                 for i in range(n)))
+            old_q, old_ms = measure(old_rerun, username)
+            new_q, new_ms = measure(new_rerun, username, args.page_size)
+            print(f"{n:>10} {old_q:>12} {old_ms:>9.2f} {new_q:>13} {new_ms:>9.2f}")
+        db.close_all()
+
+
+if __name__ == "__main__":
+    main()
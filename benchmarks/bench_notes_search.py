@@ -0,0 +1,98 @@
+# Eslatmalar qidiruvi: FTS5 (bm25 + snippet) va LIKE '%...%' skanini
+# solishtirish. Bitta maktab — 100k eslatma, ko'p o'quvchi. So'zlar Zipf
+# taqsimotida: bir nechtasi deyarli har eslatmada, ko'pchiligi kam.
+#
+#   python -m benchmarks.bench_notes_search --notes 100000 --students 400
+import argparse
+import itertools
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import db
+import migrations
+import notes
+
+VOCAB = 20_000
+SYLLABLES = "ka ro mi su te lo na vi de ba zu qo sha chi yo gu fe ni ma tu".split()
+LIKE_SQL = '''SELECT id, title, subject, time FROM notes
+              WHERE username = ? AND (title LIKE ? OR content LIKE ?)
+              ORDER BY time DESC LIMIT ?'''
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def bench(label, fn, cases):
+    samples = []
+    for case in cases:
+        t0 = time.perf_counter()
+        fn(*case)
+        samples.append((time.perf_counter() - t0) * 1000)
+    print(f"  {label:<26} p50 {statistics.median(samples):7.2f} ms"
+          f"   p95 {percentile(samples, 0.95):7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--notes", type=int, default=100_000)
+    parser.add_argument("--students", type=int, default=400)
+    parser.add_argument("--queries", type=int, default=100)
+    args = parser.parse_args()
+    rnd = random.Random(5)
+
+    vocab = list(dict.fromkeys(
+        "".join(rnd.choices(SYLLABLES, k=rnd.randint(2, 4))) for _ in range(VOCAB * 2)))[:VOCAB]
+    cum = list(itertools.accumulate(1 / (i + 1) for i in range(len(vocab))))
+
+    def text(n):
+        return " ".join(rnd.choices(vocab, cum_weights=cum, k=n))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, "search.db"))
+        migrations.ensure_schema()
+        t0 = time.perf_counter()
+        db.executemany(
+            '''INSERT INTO notes(username, title, content, subject, time)
+               VALUES (?,?,?,?,?)''',
+            ((f"s{rnd.randrange(args.students)}", text(3), text(120),
+              rnd.choice(notes.SUBJECTS),
+              f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d} 10:00:00")
+             for _ in range(args.notes)))
+        print(f"{args.notes:,} eslatma (trigger orqali indekslandi): "
+              f"{time.perf_counter() - t0:.1f}s")
+
+        # Trigger'lar indeksni to'g'ri ushlab turadimi
+        top = db.query_one("SELECT COUNT(*) FROM notes_fts WHERE notes_fts MATCH ?",
+                           (f'"{vocab[0]}"',))[0]
+        db.execute("DELETE FROM notes WHERE id IN (SELECT id FROM notes LIMIT 100)")
+        db.execute("UPDATE notes SET title = 'zzqqxx' WHERE id = (SELECT MAX(id) FROM notes)")
+        assert db.query_one("SELECT COUNT(*) FROM notes_fts WHERE notes_fts MATCH 'zzqqxx'")[0] == 1
+        db.execute("INSERT INTO notes_fts(notes_fts, rank) VALUES ('integrity-check', 1)")
+        print(f"  eng ko'p uchraydigan so'z {top:,} eslatmada; integrity-check ok")
+
+        users = [f"s{rnd.randrange(args.students)}" for _ in range(args.queries)]
+        subjects = [rnd.choice(notes.SUBJECTS) for _ in range(args.queries)]
+        buckets = [("tez-tez (top 10)", 0, 10), ("o'rta (100-1000)", 100, 1000),
+                   ("kam (5000+)", 5000, len(vocab))]
+        for label, lo, hi in buckets:
+            words = [vocab[rnd.randrange(lo, hi)] for _ in range(args.queries)]
+            print(f"So'zlar: {label}")
+            bench("LIKE '%so'z%' (bm25siz)",
+                  lambda u, w: db.query(LIKE_SQL, (u, f"%{w}%", f"%{w}%", 50)),
+                  zip(users, words))
+            bench("FTS5 bm25 + snippet", lambda u, w: notes.search(u, w),
+                  zip(users, words))
+            bench("FTS5 so'z + prefiks", lambda u, w: notes.search(u, f"{w} {w[:3]}"),
+                  zip(users, words))
+            bench("FTS5 + fan filtri", lambda u, w, s: notes.search(u, w, s),
+                  zip(users, words, subjects))
+        db.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# Sintetik ma'lumotlar generatori + asosiy o'qish so'rovlari uchun
+# EXPLAIN QUERY PLAN tekshiruvi va vaqt o'lchovi.
+#
+#   python -m benchmarks.bench_queries --rows 10000,1000000,10000000
+#   python -m benchmarks.bench_queries --check-only
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+import activity
+import db
+import migrations
+import notes
+import quiz
+
+# Ilova bajaradigan so'rovlar — SQL modullardan olinadi, nusxa emas:
+# (nomi, SQL, parametrlar, kutilgan indeks). Reyting endi ranking.py dagi
+# xotira indeksidan o'qiladi, shuning uchun bu yerda users so'rovi yo'q.
+QUERIES = [
+    ("view_logs", activity.RECENT_LOGS_SQL, (), "idx_logs_time"),
+    ("notes.list_page", notes.PAGE_SQL,
+     ("user7", notes.PAGE_SIZE + 1), "idx_notes_user_time_id"),
+    ("notes.list_page+", notes.PAGE_AFTER_SQL,
+     ("user7", "2025-10-01 00:00:00", 10**9, notes.PAGE_SIZE + 1), "idx_notes_user_time_id"),
+    ("get_quiz_history", quiz.HISTORY_SQL, ("user7",), "idx_quiz_user_time"),
+]
+
+SUBJECTS = ["Umumiy", "Ingliz tili", "IT", "Ona tili", "Matematika", "Fizika"]
+BATCH = 50_000
+
+
+def _times(n, start=datetime.datetime(2025, 9, 1)):
+    for i in range(n):
+        yield (start + datetime.timedelta(seconds=i * 7)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def generate(rows, seed=1):
+    """Jadvallarni `rows` qatorgacha to'ldiradi (users — rows // 10)."""
+    rnd = random.Random(seed)
+    n_users = max(100, rows // 10)
+
+    def insert(sql, gen):
+        batch = []
+        for item in gen:
+            batch.append(item)
+            if len(batch) >= BATCH:
+                db.executemany(sql, batch)
+                batch = []
+        if batch:
+            db.executemany(sql, batch)
+
+    insert("INSERT INTO users(username, password, role, xp, level, streak) VALUES (?,?,?,?,?,?)",
+           ((f"user{i}", "x", "admin" if i == 0 else "student",
+             xp := rnd.randrange(5000), xp // 100 + 1, rnd.randrange(30))
+            for i in range(n_users)))
+    insert("INSERT INTO logs(username, action, time) VALUES (?,?,?)",
+           ((f"user{rnd.randrange(n_users)}", "Chat: 🌐 Universal Yordamchi", t)
+            for t in _times(rows)))
+    insert("INSERT INTO notes(username, title, content, subject, time) VALUES (?,?,?,?,?)",
+           ((f"user{rnd.randrange(n_users)}", f"Eslatma {i}", "matn " * 20,
+             rnd.choice(SUBJECTS), t) for i, t in enumerate(_times(rows))))
+    insert("INSERT INTO quiz_scores(username, subject, score, total, time) VALUES (?,?,?,?,?)",
+           ((f"user{rnd.randrange(n_users)}", rnd.choice(SUBJECTS), rnd.randrange(6), 5, t)
+            for t in _times(rows)))
+    db.execute("ANALYZE")
+
+
+def check_plans():
+    failures = []
+    for name, sql, params, index in QUERIES:
+        plan = " | ".join(r[3] for r in db.query("EXPLAIN QUERY PLAN " + sql, params))
+        ok = index in plan and "USE TEMP B-TREE" not in plan
+        print(f"  {'ok ' if ok else 'BAD'} {name:<17} {plan}")
+        if not ok:
+            failures.append(name)
+    return failures
+
+
+def time_queries(repeat=20):
+    for name, sql, params, _ in QUERIES:
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            db.query(sql, params)
+        print(f"  {name:<17} {(time.perf_counter() - t0) / repeat * 1000:9.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", default="10000,1000000,10000000")
+    parser.add_argument("--check-only", action="store_true")
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        sizes = [0] if args.check_only else [int(x) for x in args.rows.split(",")]
+        for rows in sizes:
+            db.configure(os.path.join(tmp, f"bench_{rows}.db"))
+            migrations.ensure_schema()
+            if rows:
+                t0 = time.perf_counter()
+                generate(rows)
+                print(f"{rows:,} qator ({time.perf_counter() - t0:.1f}s generatsiya)")
+            failures += check_plans()
+            if rows:
+                time_queries()
+            db.close_all()
+    if failures:
+        sys.exit(f"indeks ishlatilmadi: {', '.join(sorted(set(failures)))}")
+
+
+if __name__ == "__main__":
+    main()
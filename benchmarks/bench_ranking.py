@@ -0,0 +1,70 @@
+# Reyting: SQL (ORDER BY xp DESC) va RankingIndex ni solishtirish.
+#
+#   python -m benchmarks.bench_ranking --students 100000
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import db
+import migrations
+import ranking
+
+SQL_TOP = '''SELECT username, xp, level, streak FROM users
+             WHERE role != 'admin' ORDER BY xp DESC LIMIT 10'''
+SQL_RANK = '''SELECT COUNT(*) + 1 FROM users WHERE role != 'admin'
+              AND (xp > ? OR (xp = ? AND username < ?))'''
+SQL_AROUND = '''SELECT username, xp, level, streak FROM users
+                WHERE role != 'admin' ORDER BY xp DESC, username LIMIT 5 OFFSET ?'''
+
+
+def bench(label, fn, repeat):
+    t0 = time.perf_counter()
+    for i in range(repeat):
+        fn(i)
+    print(f"  {label:<22} {(time.perf_counter() - t0) / repeat * 1e6:10.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    rnd = random.Random(3)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, "rank.db"))
+        migrations.ensure_schema()
+        db.executemany(
+            "INSERT INTO users(username, password, role, xp, level, streak) VALUES (?,?,?,?,?,?)",
+            ((f"s{i}", "x", "student", xp := rnd.randrange(100_000), xp // 100 + 1, 0)
+             for i in range(args.students)))
+        db.execute("ANALYZE")
+        names = [f"s{rnd.randrange(args.students)}" for _ in range(args.repeat)]
+        xps = {r[0]: r[1] for r in db.query("SELECT username, xp FROM users")}
+
+        index = ranking.RankingIndex()
+        t0 = time.perf_counter()
+        index.rebuild()
+        print(f"{args.students:,} o'quvchi, rebuild {time.perf_counter() - t0:.2f}s")
+
+        def sql_rank(i):
+            u = names[i]
+            return db.query_one(SQL_RANK, (xps[u], xps[u], u))[0]
+
+        print("SQL:")
+        bench("top 10", lambda i: db.query(SQL_TOP), args.repeat)
+        bench("my rank", sql_rank, args.repeat)
+        bench("around me", lambda i: db.query(SQL_AROUND, (max(0, sql_rank(i) - 3),)), args.repeat)
+        print("RankingIndex:")
+        bench("top 10", lambda i: index.top(10), args.repeat)
+        bench("my rank", lambda i: index.rank(names[i]), args.repeat)
+        bench("around me", lambda i: index.around(names[i], 2), args.repeat)
+        bench("update (xp +10)", lambda i: index.update(names[i], xp=xps[names[i]] + 10 * (i + 1)),
+              args.repeat)
+        db.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Har rerun'da bajariladigan "bootstrap" ishining narxi: eski init_db() +
+# admin qo'shish + PRAGMA tekshiruvlari va yangi migrations.ensure_schema().
+#
+#   python -m benchmarks.bench_rerun_bootstrap --reruns 500
+import argparse
+import hashlib
+import os
+import sqlite3
+import tempfile
+import time
+
+import db
+import migrations
+
+OLD_COLUMNS = [
+    ("xp", "INTEGER DEFAULT 0"), ("streak", "INTEGER DEFAULT 0"),
+    ("last_active", "TEXT DEFAULT ''"), ("level", "INTEGER DEFAULT 1"),
+    ("badges", "TEXT DEFAULT '[]'"), ("total_messages", "INTEGER DEFAULT 0"),
+    ("joined", "TEXT DEFAULT ''"),
+]
+
+
+def old_rerun(path):
+    # init_db()
+    conn = sqlite3.connect(path)
+    c = conn.cursor()
+    c.execute('CREATE TABLE IF NOT EXISTS users (username TEXT PRIMARY KEY, password TEXT, role TEXT)')
+    existing = [row[1] for row in c.execute("PRAGMA table_info(users)").fetchall()]
+    for col_name, col_type in OLD_COLUMNS:
+        if col_name not in existing:
+            c.execute(f"ALTER TABLE users ADD COLUMN {col_name} {col_type}")
+    c.execute('CREATE TABLE IF NOT EXISTS logs (username TEXT, action TEXT, time TEXT)')
+    c.execute('''CREATE TABLE IF NOT EXISTS quiz_scores (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                 username TEXT, subject TEXT, score INTEGER, total INTEGER, time TEXT)''')
+    c.execute('''CREATE TABLE IF NOT EXISTS notes (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                 username TEXT, title TEXT, content TEXT, subject TEXT, time TEXT)''')
+    conn.commit()
+    conn.close()
+    # add_user("admin", ...)
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("INSERT INTO users(username, password, role) VALUES (?,?,?)",
+                     ("admin", hashlib.sha256(b"secret").hexdigest(), "admin"))
+        conn.commit()
+    except sqlite3.IntegrityError:
+        pass
+    conn.close()
+    # get_leaderboard() dagi PRAGMA tekshiruvi
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA table_info(users)").fetchall()
+    conn.close()
+
+
+def new_rerun(path):
+    migrations.ensure_schema()
+
+
+def measure(fn, path, reruns):
+    fn(path)
+    t0 = time.perf_counter()
+    for _ in range(reruns):
+        fn(path)
+    return (time.perf_counter() - t0) / reruns * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reruns", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_path = os.path.join(tmp, "old.db")
+        new_path = os.path.join(tmp, "new.db")
+        db.configure(new_path)
+        before = measure(old_rerun, old_path, args.reruns)
+        after = measure(new_rerun, new_path, args.reruns)
+        db.close_all()
+    print(f"before: {before:9.1f} us/rerun")
+    print(f" after: {after:9.1f} us/rerun")
+
+
+if __name__ == "__main__":
+    main()
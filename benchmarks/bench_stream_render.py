@@ -0,0 +1,65 @@
+# Soxta stream ustida eski (har chunk'da markdown) va yangi (StreamRenderer)
+# usulda nechta render va qancha bayt yuborilishini solishtirish.
+#
+#   python -m benchmarks.bench_stream_render --tokens 1500 --rate 300
+import argparse
+import time
+from types import SimpleNamespace
+
+import streaming
+
+
+def fake_stream(tokens, rate):
+    delay = 1.0 / rate if rate else 0
+    for i in range(tokens):
+        if delay:
+            time.sleep(delay)
+        delta = SimpleNamespace(content=f"so'z{i} ")
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+    # usage chunk — choices bo'sh
+    yield SimpleNamespace(choices=[])
+
+
+class Sink:
+    def __init__(self):
+        self.renders = 0
+        self.bytes = 0
+
+    def __call__(self, text):
+        self.renders += 1
+        self.bytes += len(text.encode())
+
+
+def naive(stream, sink):
+    full_text = ""
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            full_text += chunk.choices[0].delta.content
+            sink(full_text + "▌")
+    sink(full_text)
+    return full_text
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=1500)
+    parser.add_argument("--rate", type=float, default=300, help="token/s (0 = cheksiz)")
+    args = parser.parse_args()
+
+    before = Sink()
+    text_before = naive(fake_stream(args.tokens, args.rate), before)
+
+    after = Sink()
+    renderer = streaming.StreamRenderer(after)
+    text_after = renderer.consume(fake_stream(args.tokens, args.rate))
+    assert text_before == text_after
+
+    print(f"before: {before.renders:6d} render  {before.bytes / 1e6:8.2f} MB")
+    print(f" after: {after.renders:6d} render  {after.bytes / 1e6:8.2f} MB")
+    s = renderer.stats
+    print(f"ttft {s['ttft'] * 1000:.1f} ms, {s['tokens_per_s']:.0f} token/s, "
+          f"{s['renders']} render")
+
+
+if __name__ == "__main__":
+    main()
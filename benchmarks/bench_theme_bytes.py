@@ -0,0 +1,64 @@
+# Har rerun'da websocket orqali mavzu uchun yuboriladigan baytlar:
+# eski usul (butun <style> bloki st.markdown ichida) va yangi (<link>).
+# Streamlit o'rnatilgan bo'lsa — haqiqiy ForwardMsg protobuf hajmi,
+# aks holda markdown body hajmi (protobuf qo'shimchasi bir necha bayt).
+#
+#   python -m benchmarks.bench_theme_bytes --reruns 50
+import argparse
+import gzip
+import os
+import textwrap
+
+import theme
+
+OLD_IMPORT = ("@import url('https://fonts.googleapis.com/css2?family=Inter:"
+              "wght@300;400;500;600;700;800;900&display=swap');\n")
+
+
+def old_body():
+    # Eski app.py: @import + butun mavzu, har rerun'da
+    with open(theme.SOURCE, encoding="utf-8") as f:
+        css = f.read()
+    css = css[css.index(".stApp"):]      # @font-face bloklari eskisida yo'q edi
+    return "\n<style>\n" + textwrap.indent(f"{OLD_IMPORT}\n{css}", "    ") + "</style>\n"
+
+
+def message_size(body):
+    try:
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+    except ImportError:
+        return len(body.encode()), "markdown body"
+    msg = ForwardMsg()
+    msg.metadata.delta_path[:] = [0, 0]
+    msg.delta.new_element.markdown.body = body
+    msg.delta.new_element.markdown.allow_html = True
+    return msg.ByteSize(), "ForwardMsg"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reruns", type=int, default=50)
+    args = parser.parse_args()
+
+    path, v = theme.build(force=True)
+    with open(path, "rb") as f:
+        static = f.read()
+    old, unit = message_size(old_body())
+    new, _ = message_size(theme.link_tag())
+    fonts = sum(os.path.getsize(os.path.join(theme.FONT_DIR, n))
+                for n in os.listdir(theme.FONT_DIR)) if os.path.isdir(theme.FONT_DIR) else 0
+
+    print(f"O'lchov: {unit}")
+    print(f"  eski: har rerun         {old:8d} bayt")
+    print(f"  yangi: har rerun        {new:8d} bayt")
+    print(f"  {args.reruns} rerun: {old * args.reruns / 1024:8.1f} KiB -> "
+          f"{new * args.reruns / 1024:6.1f} KiB")
+    print(f"  theme.min.css (bir marta, HTTP kesh) {len(static)} bayt, "
+          f"gzip {len(gzip.compress(static))} bayt, v={v}")
+    print(f"  Inter shriftlari (bir marta) {fonts / 1024:.0f} KiB"
+          + ("" if fonts else " — yuklanmagan, system-ui"))
+    print("  fonts.googleapis.com so'rovlari: eski 2 (css + woff2), yangi 0")
+
+
+if __name__ == "__main__":
+    main()
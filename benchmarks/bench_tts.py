@@ -0,0 +1,68 @@
+# Oxirgi tokendan eshitiladigan ovozgacha vaqt: eski usul (stream tugagach
+# butun matnni sintez qilish) va SpeechJob (gaplar stream davomida).
+# Tarmoqsiz soxta backend ishlatiladi.
+#
+#   python -m benchmarks.bench_tts --tokens 400 --rate 150
+import argparse
+import time
+import types
+
+import streaming
+import tts
+
+
+class FakeBackend:
+    """gTTS ga o'xshash kechikish: so'rov narxi + belgi boshiga vaqt."""
+
+    def __init__(self, base=0.25, per_char=0.0008):
+        self.base = base
+        self.per_char = per_char
+        self.calls = 0
+
+    def synthesize(self, text, lang=tts.LANG, slow=False):
+        self.calls += 1
+        time.sleep(self.base + self.per_char * len(text))
+        return f"[{text}]".encode()
+
+
+def answer_stream(tokens, rate):
+    # Har 12-so'zda gap tugaydi
+    delay = 1.0 / rate if rate else 0
+    for i in range(tokens):
+        if delay:
+            time.sleep(delay)
+        word = f"so'z{i}" + ("." if i % 12 == 11 else "") + " "
+        yield types.SimpleNamespace(choices=[types.SimpleNamespace(
+            delta=types.SimpleNamespace(content=word))])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=400)
+    parser.add_argument("--rate", type=float, default=150, help="token/s (0 = cheksiz)")
+    args = parser.parse_args()
+
+    # Eski: stream tugagach butun matn bitta so'rovda
+    backend = FakeBackend()
+    text = streaming.StreamRenderer(lambda t: None).consume(
+        answer_stream(args.tokens, args.rate))
+    t0 = time.perf_counter()
+    backend.synthesize(tts.clean_text(text))
+    before = time.perf_counter() - t0
+
+    # Yangi: gaplar stream davomida pool'da
+    backend = FakeBackend()
+    job = tts.SpeechJob(backend)
+    streaming.StreamRenderer(lambda t: None, on_delta=job.feed).consume(
+        answer_stream(args.tokens, args.rate))
+    t0 = time.perf_counter()
+    audio = job.finish()
+    after = time.perf_counter() - t0
+
+    print(f"before: {before * 1000:7.1f} ms oxirgi tokendan ovozgacha (1 so'rov)")
+    print(f" after: {after * 1000:7.1f} ms oxirgi tokendan ovozgacha "
+          f"({backend.calls} bo'lak, {len(audio)} bayt)")
+
+
+if __name__ == "__main__":
+    main()
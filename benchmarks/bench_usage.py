@@ -0,0 +1,124 @@
+# Token hisobi: har so'rovni alohida tranzaksiyada yozish va write-behind
+# navbati orqali guruhlab yozish; to'la jadvalda kvota tekshiruvi narxi.
+# Oxirida stub provayderga haqiqiy stream bilan include_usage yo'li va
+# tokenizer taxmini tekshiriladi.
+#
+#   python -m benchmarks.bench_usage --requests 20000 --users 500
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+import context
+import db
+import events
+import llm
+import migrations
+import streaming
+import usage
+from benchmarks.stub_llm import start_stub
+
+MENTORS = ["🌐 Universal Yordamchi", "🇬🇧 Ingliz tili (Speaking)", "💻 IT va Dasturlash",
+           "📚 Ona tili va Adabiyot", "📐 Matematika va Fizika"]
+
+
+def totals():
+    return tuple(db.query_one('''SELECT COALESCE(SUM(requests), 0), COALESCE(SUM(prompt_tokens), 0),
+                                        COALESCE(SUM(completion_tokens), 0)
+                                 FROM token_usage'''))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--days", type=int, default=90)
+    args = parser.parse_args()
+    rnd = random.Random(5)
+    calls = [(f"u{rnd.randrange(args.users)}", rnd.choice(MENTORS),
+              rnd.randint(200, 3000), rnd.randint(50, 1500), False)
+             for _ in range(args.requests)]
+    expected = (len(calls), sum(c[2] for c in calls), sum(c[3] for c in calls))
+    ok = True
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, "usage.db"))
+        migrations.ensure_schema()
+
+        t0 = time.perf_counter()
+        for call in calls:
+            usage.record(*call)
+        direct = time.perf_counter() - t0
+        ok &= totals() == expected
+        db.execute("DELETE FROM token_usage")
+
+        queue = events.WriteBehindQueue({"usage": usage.record})
+        t0 = time.perf_counter()
+        for call in calls:
+            queue.submit("usage", *call)
+        queue.flush(timeout=120)
+        batched = time.perf_counter() - t0
+        queue.stop()
+        ok &= totals() == expected
+        rows = db.query_one("SELECT COUNT(*) FROM token_usage")[0]
+        print(f"{args.requests:,} so'rov -> {rows:,} qator (user, kun, mentor)")
+        print(f"  har so'rov alohida tranzaksiya  {direct / len(calls) * 1e6:9.1f} us/so'rov")
+        print(f"  write-behind (guruhlab)         {batched / len(calls) * 1e6:9.1f} us/so'rov")
+
+        # Tarix: har foydalanuvchi har kuni har mentor bilan
+        today = datetime.date.today()
+        history = ((f"u{u}", (today - datetime.timedelta(days=d)).isoformat(), m,
+                    3, rnd.randint(500, 5000), rnd.randint(100, 2000))
+                   for u in range(args.users) for d in range(1, args.days) for m in MENTORS)
+        db.executemany('''INSERT INTO token_usage(username, day, mentor, requests,
+                              prompt_tokens, completion_tokens) VALUES (?,?,?,?,?,?)''', history)
+        rows = db.query_one("SELECT COUNT(*) FROM token_usage")[0]
+        samples = []
+        for i in range(2000):
+            t0 = time.perf_counter()
+            try:
+                usage.check_quota(f"u{i % args.users}", 1000)
+            except usage.QuotaExceeded:
+                pass
+            samples.append(time.perf_counter() - t0)
+        samples.sort()
+        print(f"Kvota tekshiruvi ({rows:,} qator): p50 {samples[1000] * 1e6:.0f} us, "
+              f"p99 {samples[1980] * 1e6:.0f} us")
+        t0 = time.perf_counter()
+        usage.top_consumers(30)
+        print(f"  top_consumers(30)               {(time.perf_counter() - t0) * 1000:9.2f} ms")
+
+        day, month = usage.used("u0")
+        try:
+            usage.check_quota("u0", 1, daily=day + 1, monthly=0)
+            usage.check_quota("u0", 1, daily=0, monthly=month)
+            ok = False
+        except usage.QuotaExceeded as e:
+            ok &= e.period == "monthly"
+
+        # Stub provayder: include_usage bo'lagi va taxmin
+        server, base_url, _ = start_stub(tokens=40, rate=0)
+        client = llm.LLMClient(api_key="stub", base_url=base_url)
+        messages = [{"role": "user", "content": "Salom, fotosintez nima?"}]
+        got = []
+        for extra in ({"stream_options": usage.STREAM_OPTIONS}, {}):
+            stream = usage.metered(client.stream_chat("stub", messages, **extra),
+                                   12, lambda *counts: got.append(counts))
+            text = "".join(streaming.delta_text(c) for c in stream)
+        client.close()
+        server.shutdown()
+        reported, estimated = got
+        print(f"  provayder hisobi: {reported}, taxmin: {estimated}")
+        ok &= reported[1:] == (40, False)
+        ok &= estimated == (12, context.count_tokens(text), True)
+        db.close_all()
+
+    print("hisoblar mos" if ok else "XATO: hisoblar mos emas")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+# Lokal OpenAI-mos stub server: /v1/models va /v1/chat/completions
+# (stream=True bo'lsa SSE, chunked keep-alive bilan). Token tezligi,
+# kechikish, dastlabki N so'rovda xato qaytarish va provayderning
+# parallel so'rovlar limiti (oshsa 429) sozlanadi.
+#
+#   python -m benchmarks.stub_llm --port 8799 --rate 200 --tokens 300
+#   ZUKKO_LLM_BASE_URL=http://127.0.0.1:8799/v1 streamlit run app.py
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubConfig:
+    def __init__(self, rate=200.0, tokens=300, latency=0.05,
+                 fail_first=0, fail_status=429, retry_after=None, max_concurrent=None):
+        self.rate = rate
+        self.tokens = tokens
+        self.latency = latency
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.retry_after = retry_after
+        self.max_concurrent = max_concurrent
+        self.requests = 0
+        self.active = 0
+        self.peak_active = 0
+        self.rejected = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = None
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.config.lock:
+            self.config.connections += 1
+
+    def _json(self, status, payload, headers=()):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._json(200, {"object": "list", "data": [
+                {"id": "stub", "object": "model", "owned_by": "stub"}]})
+        else:
+            self._json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        cfg = self.config
+        with cfg.lock:
+            cfg.requests += 1
+            failing = cfg.requests <= cfg.fail_first
+            overloaded = cfg.max_concurrent is not None and cfg.active >= cfg.max_concurrent
+            if overloaded:
+                cfg.rejected += 1
+            else:
+                cfg.active += 1
+                cfg.peak_active = max(cfg.peak_active, cfg.active)
+        if overloaded:
+            self._json(429, {"error": {"message": "rate limit", "type": "stub"}},
+                       [("Retry-After", "1")])
+            return
+        try:
+            self._respond(request, failing)
+        finally:
+            with cfg.lock:
+                cfg.active -= 1
+
+    def _respond(self, request, failing):
+        cfg = self.config
+        if failing:
+            headers = [("Retry-After", str(cfg.retry_after))] if cfg.retry_after else []
+            self._json(cfg.fail_status, {"error": {"message": "stub failure",
+                                                   "type": "stub"}}, headers)
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._json(404, {"error": {"message": "not found"}})
+            return
+
+        time.sleep(cfg.latency)
+        prompt_chars = sum(len(m.get("content") or "") for m in request.get("messages", []))
+        n_tokens = min(cfg.tokens, request.get("max_tokens") or cfg.tokens)
+        usage = {"prompt_tokens": prompt_chars // 4 + 1,
+                 "completion_tokens": n_tokens,
+                 "total_tokens": prompt_chars // 4 + 1 + n_tokens}
+        words = [f"so'z{i} " for i in range(n_tokens)]
+        base = {"id": "chatcmpl-stub", "created": int(time.time()),
+                "model": request.get("model", "stub")}
+
+        if not request.get("stream"):
+            self._json(200, dict(base, object="chat.completion", choices=[{
+                "index": 0, "finish_reason": "stop",
+                "message": {"role": "assistant", "content": "".join(words)}}],
+                usage=usage))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def send(payload):
+            data = f"data: {payload}\n\n".encode()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        delay = 1.0 / cfg.rate if cfg.rate else 0
+        for i, word in enumerate(words):
+            if delay:
+                time.sleep(delay)
+            send(json.dumps(dict(base, object="chat.completion.chunk", choices=[{
+                "index": 0, "finish_reason": None,
+                "delta": {"role": "assistant", "content": word} if i == 0
+                else {"content": word}}])))
+        send(json.dumps(dict(base, object="chat.completion.chunk", choices=[{
+            "index": 0, "finish_reason": "stop", "delta": {}}])))
+        if (request.get("stream_options") or {}).get("include_usage"):
+            send(json.dumps(dict(base, object="chat.completion.chunk",
+                                 choices=[], usage=usage)))
+        send("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+def start_stub(host="127.0.0.1", port=0, **options):
+    """Stub'ni fon thread'ida ishga tushiradi: (server, base_url, config)."""
+    config = StubConfig(**options)
+    handler = type("Handler", (StubHandler,), {"config": config})
+    # Butun sinf bir vaqtda ulanadi — standart backlog (5) yetmaydi
+    server_class = type("Server", (ThreadingHTTPServer,), {"request_queue_size": 1024})
+    server = server_class((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1", config
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--rate", type=float, default=200, help="token/s")
+    parser.add_argument("--tokens", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--fail-first", type=int, default=0)
+    parser.add_argument("--fail-status", type=int, default=429)
+    parser.add_argument("--max-concurrent", type=int, default=None)
+    args = parser.parse_args()
+    server, base_url, _ = start_stub(
+        port=args.port, rate=args.rate, tokens=args.tokens, latency=args.latency,
+        fail_first=args.fail_first, fail_status=args.fail_status,
+        max_concurrent=args.max_concurrent)
+    print(f"stub: {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+import datetime
+import os
+import sys
+import zlib
+
+import db
+
+# ==========================================
+# 💬 SUHBATLAR TARIXI (SQLITE, SIQILGAN)
+# ==========================================
+# Har bir xabar messages jadvaliga faqat qo'shiladi (append-only), katta
+# matnlar zlib bilan siqiladi. Sessiya xotirasida faqat oxirgi oyna
+# turadi; eski xabarlar so'ralganda bazadan yuklanadi. Xotira limiti
+# oshsa — xulosaga kirgan eng eski xabarlar xotiradan chiqariladi (ular
+# allaqachon diskda).
+
+WINDOW_MESSAGES = 40            # xotirada turadigan oxirgi xabarlar
+MEMORY_CAP = int(os.environ.get("ZUKKO_CHAT_MEMORY_KB", "256")) * 1024
+HARD_LIMIT = 4 * WINDOW_MESSAGES  # xulosa ulgurmasa ham bundan oshmaydi
+OLDER_PAGE = 20
+COMPRESS_MIN = 512              # bayt; kichik matnlar siqilmaydi
+
+PLAIN, ZLIB = 0, 1
+
+
+def encode(text):
+    """(payload, codec): siqish foyda bersagina zlib."""
+    raw = text.encode("utf-8")
+    if len(raw) >= COMPRESS_MIN:
+        packed = zlib.compress(raw, 6)
+        if len(packed) < len(raw) * 0.9:
+            return packed, ZLIB
+    return text, PLAIN
+
+
+def decode(payload, codec):
+    if codec == ZLIB:
+        return zlib.decompress(payload).decode("utf-8")
+    return payload
+
+
+def _now():
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _size(message):
+    return sys.getsizeof(message["content"]) + sys.getsizeof(message)
+
+
+# ==========================================
+# 🗄️ BAZA
+# ==========================================
+def start(username, mentor):
+    """Yangi suhbat; id qaytaradi (sinxron — keyingi yozuvlar unga bog'lanadi)."""
+    now = _now()
+    with db.transaction() as c:
+        return c.execute('''INSERT INTO conversations(username, mentor, created, updated)
+                            VALUES (?,?,?,?)''', (username, mentor, now, now)).lastrowid
+
+
+def latest(username, mentor):
+    return db.query_one('''SELECT id, turns, summary, summary_upto FROM conversations
+                           WHERE username = ? AND mentor = ?
+                           ORDER BY updated DESC, id DESC LIMIT 1''', (username, mentor))
+
+
+def append(username, conversation_id, role, content, when=None):
+    """Bitta xabar; seq yozish tranzaksiyasi ichida bazada beriladi va qaytariladi.
+
+    Bir suhbatni ikki tab (yoki qayta ochilgan sessiya) yozsa ham xabarlar
+    bir-birini bosmaydi: BEGIN IMMEDIATE ostida MAX(seq)+1.
+    """
+    when = when or _now()
+    payload, codec = encode(content)
+    with db.transaction() as c:
+        seq = c.execute('''SELECT COALESCE(MAX(seq), -1) + 1 FROM messages
+                           WHERE conversation_id = ?''', (conversation_id,)).fetchone()[0]
+        c.execute('''INSERT INTO messages(conversation_id, seq, role, content, codec, time)
+                     VALUES (?,?,?,?,?,?)''',
+                  (conversation_id, seq, role, payload, codec, when))
+        c.execute('''UPDATE conversations SET turns = ?, updated = ?
+                     WHERE id = ? AND username = ?''',
+                  (seq + 1, when, conversation_id, username))
+    return seq
+
+
+def save_summary(username, conversation_id, summary, upto):
+    """Write-behind handler: kontekst xulosasi va u qamragan xabarlar soni."""
+    db.execute('''UPDATE conversations SET summary = ?, summary_upto = ?
+                  WHERE id = ? AND username = ? AND summary_upto <= ?''',
+               (summary, upto, conversation_id, username, upto))
+
+
+def load(conversation_id, before=None, limit=OLDER_PAGE, since=0):
+    """seq < before (yoki oxirgi) xabarlar, eskidan yangiga."""
+    if before is None:
+        before = 2 ** 62
+    rows = db.query('''SELECT seq, role, content, codec FROM messages
+                       WHERE conversation_id = ? AND seq >= ? AND seq < ?
+                       ORDER BY seq DESC LIMIT ?''',
+                    (conversation_id, since, before, limit))
+    return [(r["seq"], {"role": r["role"], "content": decode(r["content"], r["codec"])})
+            for r in reversed(rows)]
+
+
+# ==========================================
+# 🧠 SESSIYA OYNASI
+# ==========================================
+class ChatSession:
+    """Bitta foydalanuvchi + mentor suhbatining xotiradagi oynasi.
+
+    messages — LLM konteksti va ekranda ko'rinadigan oxirgi xabarlar,
+    seqs — ularning bazadagi seq'lari (boshqa tab yozgan bo'lsa oraliq
+    bo'lishi mumkin). older — faqat ko'rsatish uchun yuklangan eski xabarlar.
+    """
+
+    def __init__(self, username, mentor, window, submit, sync,
+                 memory_cap=MEMORY_CAP, window_messages=WINDOW_MESSAGES):
+        self.username = username
+        self.mentor = mentor
+        self.window = window
+        self.submit = submit
+        self.sync = sync
+        self.memory_cap = memory_cap
+        self.window_messages = window_messages
+        self.conversation_id = None
+        self.messages = []
+        self.seqs = []
+        self.older = []
+        self.next_seq = 0
+        self.bytes = 0
+        self._saved_summary = ""
+        self.failed = False     # oxirgi savolga javob olinmadi — qayta urinishni kutadi
+        self.stats = {"spilled": 0, "loaded": 0}
+
+    @classmethod
+    def resume(cls, username, mentor, window, submit, sync, **options):
+        """Oxirgi suhbatni davom ettiradi: xulosa + xulosaga kirmagan oxirgi xabarlar."""
+        session = cls(username, mentor, window, submit, sync, **options)
+        sync(username)
+        row = latest(username, mentor)
+        if row is None:
+            return session
+        session.conversation_id = row["id"]
+        session.next_seq = row["turns"]
+        # Xulosaga kirmagan hamma xabar kontekstga qaytadi (oyna emas, HARD_LIMIT
+        # bilan cheklanadi); undan eskilari "Oldingi xabarlar" orqali ko'rinadi
+        rows = load(row["id"], limit=HARD_LIMIT, since=row["summary_upto"])
+        for seq, message in rows:
+            session._push(message, seq)
+        # Javobsiz qolgan savol qayta ochilganda o'zi so'ralmaydi
+        session.failed = bool(session.messages) and session.messages[-1]["role"] == "user"
+        window.reset()
+        window.summary = row["summary"] or ""
+        session._saved_summary = window.summary
+        return session
+
+    @property
+    def offset(self):
+        """Xotiradagi birinchi xabarning seq'i (bo'sh bo'lsa — keyingisi)."""
+        return self.seqs[0] if self.seqs else self.next_seq
+
+    def _push(self, message, seq):
+        self.messages.append(message)
+        self.seqs.append(seq)
+        self.next_seq = max(self.next_seq, seq + 1)
+        self.bytes += _size(message)
+
+    def append(self, role, content):
+        if self.conversation_id is None:
+            self.conversation_id = start(self.username, self.mentor)
+        seq = append(self.username, self.conversation_id, role, content)
+        self.failed = False
+        self._push({"role": role, "content": content}, seq)
+
+    def new_conversation(self):
+        """Tozalash tugmasi: eski suhbat bazada qoladi, yangisi bo'sh boshlanadi."""
+        self.conversation_id = None
+        self.messages = []
+        self.seqs = []
+        self.older = []
+        self.next_seq = 0
+        self.bytes = 0
+        self._saved_summary = ""
+        self.failed = False
+        self.window.reset()
+
+    @property
+    def has_older(self):
+        start_seq = self.older[0][0] if self.older else self.offset
+        return start_seq > 0
+
+    def load_older(self, limit=OLDER_PAGE):
+        """Ekranga yana `limit` ta eski xabar (bazadan, talab bo'yicha)."""
+        if self.conversation_id is None or not self.has_older:
+            return 0
+        before = self.older[0][0] if self.older else self.offset
+        rows = load(self.conversation_id, before=before, limit=limit)
+        self.older[:0] = rows
+        self.bytes += sum(_size(m) for _, m in rows)
+        self.stats["loaded"] += len(rows)
+        self._spill()
+        return len(rows)
+
+    def visible(self):
+        return [m for _, m in self.older] + self.messages
+
+    def after_reply(self):
+        """Javobdan keyin: yangi xulosani saqlash va xotira limitini tekshirish."""
+        summary = self.window.summary
+        folded = min(self.window.folded, len(self.seqs))
+        if (summary and summary != self._saved_summary and folded
+                and self.conversation_id is not None):
+            self._saved_summary = summary
+            self.submit("chat_summary", self.username, self.conversation_id,
+                        summary, self.seqs[folded - 1] + 1)
+        self._spill()
+
+    def _spill(self):
+        # Avval faqat ko'rsatish uchun yuklanganlar, keyin xulosaga kirganlar
+        while self.older and self.bytes > self.memory_cap:
+            _, message = self.older.pop(0)
+            self.bytes -= _size(message)
+        drop = 0
+        while drop < len(self.messages) - 1:
+            over = (len(self.messages) - drop > self.window_messages
+                    or self.bytes > self.memory_cap)
+            if not over:
+                break
+            # Xulosa hali qamramagan xabar faqat qattiq limitda chiqariladi
+            if drop >= self.window.folded and len(self.messages) - drop <= HARD_LIMIT:
+                break
+            self.bytes -= _size(self.messages[drop])
+            drop += 1
+        if drop:
+            # Oraliq ochilmasin: ko'rsatish uchun yuklangan eskilar ham chiqadi
+            for _, message in self.older:
+                self.bytes -= _size(message)
+            self.older = []
+            del self.messages[:drop]
+            del self.seqs[:drop]
+            self.window.drop(drop)
+            self.stats["spilled"] += drop
@@ -0,0 +1,131 @@
+import collections
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# ==========================================
+# 🧠 KONTEKST OYNASI (TOKEN BUDJETI)
+# ==========================================
+# Oxirgi xabarlar so'zma-so'z yuboriladi; budjetdan chiqqan eski xabarlar
+# fon thread'ida yig'ma xulosaga qo'shiladi va system prompt ichida boradi.
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # ixtiyoriy: bo'lmasa taxminiy hisob
+    _encoding = None
+
+HISTORY_BUDGET = 3000       # system + xulosa + xabarlar, token
+FOLD_MIN = 4                # kamida shuncha xabar yig'ilganda xulosalanadi
+MESSAGE_OVERHEAD = 4
+
+# "📖 Xulosa" tugmasi ham, fon xulosasi ham shu so'rovdan foydalanadi
+SUMMARY_PROMPT = ("Shu suhbatimiz bo'yicha qisqa xulosa yozib ber — "
+                  "asosiy fikrlar, o'rganilgan narsalar.")
+SUMMARY_HEADER = "Oldingi suhbat xulosasi:"
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="zukko-summary")
+_lock = threading.Lock()
+totals = {"requests": 0, "tokens_full": 0, "tokens_sent": 0}
+history = collections.deque(maxlen=200)
+
+_spaces = re.compile(r"[ \t]+")
+
+
+def normalize_prompt(text):
+    # Uch qo'shtirnoqli satrlardagi chekinishlar va ortiqcha bo'shliqlar
+    lines = (_spaces.sub(" ", line).strip() for line in text.strip().splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def count_tokens(text):
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return len(text) // 4 + 1
+
+
+def message_tokens(message):
+    return count_tokens(message["content"]) + MESSAGE_OVERHEAD
+
+
+def summary_request(previous, turns):
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in turns)
+    if previous:
+        transcript = f"{SUMMARY_HEADER}\n{previous}\n\n{transcript}"
+    return [
+        {"role": "system", "content": "Sen suhbatni qisqa va aniq xulosalaydigan yordamchisan."},
+        {"role": "user", "content": f"{transcript}\n\n{SUMMARY_PROMPT}"},
+    ]
+
+
+class ContextWindow:
+    def __init__(self, summarize, budget=HISTORY_BUDGET, fold_min=FOLD_MIN):
+        self.summarize = summarize
+        self.budget = budget
+        self.fold_min = fold_min
+        self.stats = {}
+        self.reset()
+
+    def reset(self):
+        self.summary = ""
+        self.folded = 0         # messages[:folded] xulosa ichida
+        self._pending = None    # (future, upto)
+
+    def drop(self, count):
+        """Xotiradan eng eski `count` ta xabar chiqarilganda indekslarni suradi."""
+        self.folded = max(0, self.folded - count)
+        if self._pending is not None:
+            future, upto = self._pending
+            self._pending = (future, max(0, upto - count))
+
+    def _collect(self):
+        if self._pending is None or not self._pending[0].done():
+            return
+        future, upto = self._pending
+        self._pending = None
+        try:
+            self.summary = future.result()
+            self.folded = upto
+        except Exception:
+            pass  # keyingi so'rovda qayta uriniladi
+
+    def build(self, system_prompt, messages):
+        """LLM ga yuboriladigan xabarlar ro'yxatini qaytaradi."""
+        self._collect()
+        if len(messages) < self.folded:
+            self.reset()
+
+        system = normalize_prompt(system_prompt)
+        if self.summary:
+            system = f"{system}\n\n{SUMMARY_HEADER}\n{self.summary}"
+        used = count_tokens(system)
+
+        kept = []
+        start = len(messages)
+        for i in range(len(messages) - 1, self.folded - 1, -1):
+            cost = message_tokens(messages[i])
+            # Oxirgi xabar har doim yuboriladi
+            if kept and used + cost > self.budget:
+                break
+            used += cost
+            kept.append({"role": messages[i]["role"], "content": messages[i]["content"]})
+            start = i
+        kept.reverse()
+
+        if self._pending is None and start - self.folded >= self.fold_min:
+            future = _executor.submit(self.summarize, self.summary,
+                                      list(messages[self.folded:start]))
+            self._pending = (future, start)
+
+        full = count_tokens(system_prompt) + sum(message_tokens(m) for m in messages)
+        self.stats = {"tokens_full": full, "tokens_sent": used,
+                      "tokens_saved": max(0, full - used),
+                      "kept": len(kept), "folded": self.folded}
+        history.append(self.stats)
+        with _lock:
+            totals["requests"] += 1
+            totals["tokens_full"] += full
+            totals["tokens_sent"] += used
+        return [{"role": "system", "content": system}] + kept
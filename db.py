@@ -0,0 +1,195 @@
+import sqlite3
+import sys
+import threading
+import queue
+import time
+from contextlib import contextmanager
+
+# ==========================================
+# 🗄️ SQLITE ULANISHLAR HOVUZI (POOL)
+# ==========================================
+# Streamlit har bir rerun'ni alohida thread'da bajaradi. Ulanish thread'ga
+# faqat ishlatilayotgan vaqtda bog'lanadi, keyin hovuzga qaytariladi —
+# shuning uchun yangi thread'lar yangi ulanish ochmaydi.
+
+DB_PATH = 'zukko_school.db'
+BUSY_TIMEOUT_MS = 5000
+CACHED_STATEMENTS = 256
+POOL_SIZE = 32
+
+# Metrikalar yoqilganda BEGIN IMMEDIATE qulfini kutish vaqti shu yerga beriladi
+lock_wait_observer = None
+# ... va eng tashqi connection()/transaction() doirasi vaqti:
+# scope_observer(turi, chaqiruvchi kodi, chaqiruvchi moduli, soniya).
+# Shu modul ichidan ochilgan doiralar berilmaydi (yordamchilar o'zi o'lchanadi)
+scope_observer = None
+
+_local = threading.local()
+_globals = globals()
+_pool = queue.LifoQueue(maxsize=POOL_SIZE)
+_pool_lock = threading.Lock()
+_generation = 0
+
+
+def _connect(path):
+    conn = sqlite3.connect(
+        path,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        isolation_level=None,
+        check_same_thread=False,
+        cached_statements=CACHED_STATEMENTS,
+    )
+    conn.row_factory = sqlite3.Row
+    # Yangi fayllarda bo'sh sahifalar qismlab qaytariladi (WAL'dan oldin
+    # bo'lishi shart); mavjud fayllarga ta'sir qilmaydi
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def configure(path):
+    """Boshqa baza fayliga o'tish (benchmark va skriptlar uchun)."""
+    global DB_PATH
+    close_all()
+    DB_PATH = path
+
+
+def close_all():
+    global _generation
+    with _pool_lock:
+        _generation += 1
+        while True:
+            try:
+                _pool.get_nowait()[0].close()
+            except queue.Empty:
+                break
+
+
+def _checkout():
+    while True:
+        try:
+            conn, gen = _pool.get_nowait()
+        except queue.Empty:
+            return _connect(DB_PATH), _generation
+        if gen == _generation:
+            return conn, gen
+        conn.close()
+
+
+def _checkin(conn, gen):
+    if conn.in_transaction:
+        conn.rollback()
+    if gen != _generation:
+        conn.close()
+        return
+    try:
+        _pool.put_nowait((conn, gen))
+    except queue.Full:
+        conn.close()
+
+
+@contextmanager
+def connection():
+    """Thread uchun ulanish. Ichma-ich chaqirilsa o'sha ulanish qaytadi."""
+    held = getattr(_local, "held", None)
+    if held is not None:
+        _local.depth += 1
+        try:
+            yield held[0]
+        finally:
+            _local.depth -= 1
+        return
+
+    observe = scope_observer
+    if observe is not None:
+        # 0 — shu generator, 1 — __enter__, 2 — `with` yozilgan joy
+        caller = sys._getframe(2)
+        if caller.f_globals is _globals:
+            observe = None
+        t0 = time.perf_counter()
+    held = _checkout()
+    _local.held = held
+    _local.depth = 1
+    try:
+        yield held[0]
+    finally:
+        _local.held = None
+        _local.depth = 0
+        _checkin(*held)
+        if observe is not None:
+            observe("connection", caller.f_code, caller.f_globals.get("__name__"),
+                    time.perf_counter() - t0)
+
+
+@contextmanager
+def transaction(immediate=True):
+    """Aniq tranzaksiya doirasi. Ichki chaqiruvlar SAVEPOINT bo'ladi."""
+    with connection() as conn:
+        if conn.in_transaction:
+            conn.execute("SAVEPOINT nested")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK TO nested")
+                conn.execute("RELEASE nested")
+                raise
+            conn.execute("RELEASE nested")
+            return
+
+        observe = scope_observer
+        if observe is not None:
+            caller = sys._getframe(2)
+            if caller.f_globals is _globals:
+                observe = None
+            t0 = time.perf_counter()
+        if lock_wait_observer is None:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        else:
+            t0 = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            lock_wait_observer(time.perf_counter() - t0)
+        _local.on_commit = []
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            _local.on_commit = None
+            conn.rollback()
+            raise
+        callbacks, _local.on_commit = _local.on_commit, None
+        if observe is not None:
+            observe("transaction", caller.f_code, caller.f_globals.get("__name__"),
+                    time.perf_counter() - t0)
+        for callback in callbacks:
+            callback()
+
+
+def on_commit(callback):
+    """Joriy tranzaksiya commit bo'lgach chaqiradi (tranzaksiya bo'lmasa — darhol)."""
+    pending = getattr(_local, "on_commit", None)
+    if pending is None:
+        callback()
+    else:
+        pending.append(callback)
+
+
+def query(sql, params=()):
+    with connection() as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def query_one(sql, params=()):
+    with connection() as conn:
+        return conn.execute(sql, params).fetchone()
+
+
+def execute(sql, params=()):
+    with transaction() as conn:
+        return conn.execute(sql, params).rowcount
+
+
+def executemany(sql, seq):
+    with transaction() as conn:
+        return conn.executemany(sql, seq).rowcount
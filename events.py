@@ -0,0 +1,177 @@
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+import db
+
+# ==========================================
+# ✍️ WRITE-BEHIND NAVBAT
+# ==========================================
+# Chatdan keyingi yozuvlar (XP, log, yutuqlar) UI thread'ida emas, fon
+# thread'ida bir tranzaksiyada guruhlab yoziladi. O'qishdan oldin sync()
+# chaqirilsa, foydalanuvchi o'zi yuborgan yozuvlarni albatta ko'radi.
+
+log = logging.getLogger(__name__)
+
+_STOP = object()
+# Qulf band (SQLITE_BUSY/LOCKED) — vaqtinchalik: shu pauzalar bilan qayta urinamiz
+RETRY_DELAYS = (0.1, 0.5, 1.0, 2.0, 5.0)
+
+
+def _transient(exc):
+    if not isinstance(exc, sqlite3.OperationalError):
+        return False
+    message = str(exc).lower()
+    return "locked" in message or "busy" in message
+
+
+class WriteBehindQueue:
+    def __init__(self, handlers, maxsize=10_000, batch_size=256):
+        self.handlers = dict(handlers)
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._cond = threading.Condition()
+        self._submitted = {}
+        self._committed = {}
+        self._inbox = {}
+        self._after_commit = []
+        self._held = []         # baza band bo'lgani uchun yozilmagan hodisalar
+        self._thread = threading.Thread(
+            target=self._run, name="zukko-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    # --- UI thread tomoni ---
+    def submit(self, kind, username, *args):
+        if kind not in self.handlers:
+            raise KeyError(kind)
+        with self._cond:
+            seq = self._submitted.get(username, 0) + 1
+            self._submitted[username] = seq
+        # Navbat to'lsa — yozuvchi ulgurguncha kutamiz (backpressure)
+        self._queue.put((kind, username, args, seq))
+
+    def sync(self, username, timeout=5.0):
+        """Shu paytgacha yuborilgan `username` yozuvlari commit bo'lguncha kutadi."""
+        if threading.current_thread() is self._thread:
+            return True
+        with self._cond:
+            target = self._submitted.get(username, 0)
+            return self._cond.wait_for(
+                lambda: self._committed.get(username, 0) >= target, timeout)
+
+    def flush(self, timeout=10.0):
+        with self._cond:
+            targets = dict(self._submitted)
+            return self._cond.wait_for(
+                lambda: all(self._committed.get(u, 0) >= s for u, s in targets.items()),
+                timeout)
+
+    def pop_notifications(self, username):
+        with self._cond:
+            return self._inbox.pop(username, [])
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def stop(self, timeout=10.0):
+        if not self._thread.is_alive():
+            return
+        self.flush(timeout)
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    # --- Yozuvchi thread tomoni ---
+    def notify(self, username, message):
+        """Handler ichidan: xabar commit'dan keyin foydalanuvchiga ko'rinadi."""
+        def deliver():
+            with self._cond:
+                self._inbox.setdefault(username, []).append(message)
+        self._after_commit.append(deliver)
+
+    def after_commit(self, callback):
+        """Handler ichidan: `callback` guruh commit bo'lgandan keyin chaqiriladi."""
+        self._after_commit.append(callback)
+
+    def _run(self):
+        while True:
+            # Yozilmay qolganlar birinchi boradi — tartib va seq saqlanadi
+            batch, self._held = self._held, []
+            if not batch:
+                first = self._queue.get()
+                if first is _STOP:
+                    return
+                batch = [first]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+            if stop:
+                if self._held:
+                    log.error("write-behind: to'xtatishda %d ta hodisa yozilmadi", len(self._held))
+                return
+
+    def _commit(self, batch):
+        done = batch
+        try:
+            self._apply_retrying(batch)
+        except Exception as exc:
+            if _transient(exc):
+                done = self._hold(batch, 0)
+            else:
+                # Bitta buzuq hodisa butun guruhni yo'qotmasin
+                for i, event in enumerate(batch):
+                    try:
+                        self._apply_retrying([event])
+                    except Exception as event_exc:
+                        if _transient(event_exc):
+                            done = self._hold(batch, i)
+                            break
+                        log.exception("write-behind hodisasi bajarilmadi: %s", event[0])
+        # Faqat yozilgan (yoki qaytarib bo'lmas xato bilan tashlangan) hodisalar
+        # commit hisoblanadi — band bazada qolganlarini sync() kutaveradi
+        with self._cond:
+            for _, username, _, seq in done:
+                if seq > self._committed.get(username, 0):
+                    self._committed[username] = seq
+            self._cond.notify_all()
+
+    def _hold(self, batch, start):
+        # Qayta urinishlar tugadi, baza hamon band: hodisalar tashlanmaydi,
+        # keyingi aylanishda yana yoziladi
+        self._held = batch[start:]
+        log.error("write-behind: baza band, %d ta hodisa qayta yoziladi", len(self._held))
+        return batch[:start]
+
+    def _apply_retrying(self, batch):
+        for delay in RETRY_DELAYS:
+            try:
+                return self._apply(batch)
+            except sqlite3.OperationalError as exc:
+                if not _transient(exc):
+                    raise
+                log.warning("write-behind: %s, %.1fs dan keyin qayta urinamiz", exc, delay)
+                time.sleep(delay)
+        return self._apply(batch)
+
+    def _apply(self, batch):
+        self._after_commit = []
+        with db.transaction():
+            for kind, username, args, _ in batch:
+                self.handlers[kind](username, *args)
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                log.exception("after_commit callback xatosi")
@@ -0,0 +1,143 @@
+import datetime
+import itertools
+
+import db
+
+# ==========================================
+# 🏆 XP, DARAJA VA NISHONLAR
+# ==========================================
+# Har bir yozuv bitta tranzaksiyada: UPDATE ... RETURNING yangi qiymatlarni
+# beradi, so'ng faqat hozirgina kesib o'tilgan threshold'lar tekshiriladi.
+# INSERT OR IGNORE + (username, badge) kaliti nishon takrorlanishiga yo'l
+# qo'ymaydi, shuning uchun parallel tablar ham hech narsa yo'qotmaydi.
+
+XP_PER_LEVEL = 100
+
+_rules = None
+_versions = {}
+_clock = itertools.count(1)
+
+
+def version(username):
+    return _versions.get(username, 0)
+
+
+def _changed(username):
+    # Versiya commit'dan keyin oshadi — keshlar eski qiymatni qayta saqlamaydi
+    def bump():
+        _versions[username] = next(_clock)
+    db.on_commit(bump)
+
+
+def _now():
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def level_for(xp):
+    return max(1, xp // XP_PER_LEVEL + 1)
+
+
+def badge_rules():
+    """(badge, metric, threshold, description) — jarayon uchun bir marta o'qiladi."""
+    global _rules
+    if _rules is None:
+        _rules = [tuple(r) for r in db.query(
+            '''SELECT badge, metric, threshold, description
+               FROM badge_rules ORDER BY position''')]
+    return _rules
+
+
+def _award(c, username, crossed, now):
+    # crossed: {metric: (eski, yangi)} — eski < threshold <= yangi
+    crossed = {m: v for m, v in crossed.items() if v[1] > v[0]}
+    if not crossed:
+        return []
+    where = " OR ".join(
+        "(metric = ? AND threshold > ? AND threshold <= ?)" for _ in crossed)
+    params = [username, now]
+    for metric, (old, new) in crossed.items():
+        params += [metric, old, new]
+    rows = c.execute(f'''INSERT OR IGNORE INTO user_badges(username, badge, earned)
+                         SELECT ?, badge, ? FROM badge_rules WHERE {where}
+                         RETURNING badge''', params).fetchall()
+    return [r[0] for r in rows]
+
+
+def add_xp(username, amount):
+    """XP va xabarlar sonini oshiradi. Yangi qiymatlar va nishonlarni qaytaradi
+    (foydalanuvchi topilmasa — None)."""
+    now = _now()
+    with db.transaction() as c:
+        row = c.execute(
+            '''UPDATE users SET xp = COALESCE(xp, 0) + :amount,
+                   total_messages = COALESCE(total_messages, 0) + 1,
+                   level = MAX(1, (COALESCE(xp, 0) + :amount) / :per_level + 1)
+               WHERE username = :username
+               RETURNING xp, level, total_messages''',
+            {"amount": amount, "per_level": XP_PER_LEVEL,
+             "username": username}).fetchone()
+        if row is None:
+            return None
+        _changed(username)
+        xp, level, total = row
+        badges = _award(c, username, {
+            "total_messages": (total - 1, total),
+            "level": (level_for(xp - amount), level),
+        }, now)
+    return {"xp": xp, "level": level, "total_messages": total, "badges": badges}
+
+
+def update_streak(username):
+    """Kunlik streak'ni yangilaydi. Yangi streak va nishonlarni qaytaradi
+    (foydalanuvchi topilmasa — None)."""
+    now = _now()
+    with db.transaction() as c:
+        row = c.execute(
+            '''UPDATE users SET streak = CASE
+                   WHEN date(last_active) IS NULL THEN 1
+                   WHEN julianday(date(:now)) - julianday(date(last_active)) = 1
+                       THEN COALESCE(streak, 0) + 1
+                   WHEN julianday(date(:now)) - julianday(date(last_active)) > 1
+                       THEN 1
+                   ELSE streak END,
+                   last_active = :now
+               WHERE username = :username
+               RETURNING streak''',
+            {"now": now, "username": username}).fetchone()
+        if row is None:
+            return None
+        _changed(username)
+        streak = row[0] or 0
+        # Streak faqat +1 o'sadi yoki 1 ga tushadi — kesib o'tilgani = yangi qiymat
+        badges = _award(c, username, {"streak": (streak - 1, streak)}, now)
+    return {"streak": streak, "badges": badges}
+
+
+def add_badge(username, badge):
+    with db.transaction() as c:
+        added = c.execute(
+            'INSERT OR IGNORE INTO user_badges(username, badge, earned) VALUES (?,?,?)',
+            (username, badge, _now())).rowcount > 0
+        if added:
+            _changed(username)
+    return added
+
+
+def get_user_stats(username):
+    row = db.query_one(
+        '''SELECT xp, streak, level, total_messages, joined,
+                  (SELECT group_concat(badge, char(10)) FROM
+                      (SELECT badge FROM user_badges
+                       WHERE username = u.username ORDER BY earned, badge))
+           FROM users u WHERE username = ?''', (username,))
+    if row:
+        return {
+            "xp": row[0] if row[0] else 0,
+            "streak": row[1] if row[1] else 0,
+            "level": row[2] if row[2] else 1,
+            "badges": row[5].split("\n") if row[5] else [],
+            "total_messages": row[3] if row[3] else 0,
+            "joined": row[4] if row[4] else ""
+        }
+    return {"xp": 0, "streak": 0, "level": 1, "badges": [],
+            "total_messages": 0, "joined": ""}
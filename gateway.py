@@ -0,0 +1,256 @@
+import asyncio
+import collections
+import concurrent.futures
+import itertools
+import os
+import threading
+import time
+
+import llm
+
+# ==========================================
+# 🚦 LLM GATEWAY (NAVBAT VA ADOLATLI TAQSIMOT)
+# ==========================================
+# Barcha sessiyalarning provayderga so'rovlari shu yerdan o'tadi. Alohida
+# thread'dagi asyncio loop ruxsatlarni (slot) taqsimlaydi:
+#   * bir vaqtda ko'pi bilan `max_concurrent` ta so'rov;
+#   * foydalanuvchilar o'rtasida round-robin — bitta o'quvchining 20 ta
+#     so'rovi boshqalarni kuttirib qo'ymaydi;
+#   * qisqa so'rovlar (kam prompt token) oldinda, uzoq kutgan uzun
+#     so'rovlar esa `promote_after` soniyadan keyin oldinga o'tadi.
+# Stream'ning o'zi chaqiruvchi thread'da o'qiladi; slot stream tugaganda
+# yoki yopilganda qaytariladi.
+
+MAX_CONCURRENT = int(os.environ.get("ZUKKO_LLM_CONCURRENCY", "8"))
+SHORT_TOKENS = 600          # shundan kam prompt — "qisqa" so'rov
+PROMOTE_AFTER = 10.0        # uzun so'rov shuncha kutsa — qisqalar qatoriga
+QUEUE_TIMEOUT = 120.0
+POLL_INTERVAL = 0.25
+
+SHORT, LONG = 0, 1
+
+
+class LLMQueueTimeout(llm.LLMError):
+    user_message = "Navbat juda uzun — birozdan so'ng qayta urinib ko'ring."
+    retryable = True
+
+
+class Ticket:
+    def __init__(self, user, cost, seq, now, klass=None):
+        self.user = user
+        self.cost = cost
+        self.seq = seq
+        self.enqueued = now
+        self.granted_at = None
+        self.position = None        # navbatdagi o'rni (1 — keyingi)
+        self.klass = klass
+        self.future = None
+        self.released = False
+        self.cancelled = False
+
+    @property
+    def wait(self):
+        return (self.granted_at or time.monotonic()) - self.enqueued
+
+
+class Gateway:
+    def __init__(self, max_concurrent=MAX_CONCURRENT, short_tokens=SHORT_TOKENS,
+                 promote_after=PROMOTE_AFTER, queue_timeout=QUEUE_TIMEOUT):
+        self.max_concurrent = max_concurrent
+        self.short_tokens = short_tokens
+        self.promote_after = promote_after
+        self.queue_timeout = queue_timeout
+        # sinf -> {user: deque[Ticket]} (kiritilish tartibida — round-robin)
+        self._queues = (collections.OrderedDict(), collections.OrderedDict())
+        self._active = 0
+        self._waiting = 0           # faqat loop yangilaydi; boshqa thread'lar o'qiydi
+        self._seq = itertools.count()
+        self.stats = {"granted": 0, "timeouts": 0, "cancelled": 0, "peak_active": 0}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever,
+                                        name="zukko-llm-gateway", daemon=True)
+        self._thread.start()
+
+    # ---------- loop ichida ----------
+    def _promote(self, now):
+        # Uzoq kutgan uzun so'rovlar qisqalar navbatiga ko'chiriladi
+        long_q, short_q = self._queues[LONG], self._queues[SHORT]
+        for user in list(long_q):
+            q = long_q[user]
+            while q and now - q[0].enqueued >= self.promote_after:
+                ticket = q.popleft()
+                ticket.klass = SHORT
+                short_q.setdefault(user, collections.deque()).append(ticket)
+            if not q:
+                del long_q[user]
+
+    def _next(self):
+        for queues in self._queues:
+            if queues:
+                return queues[next(iter(queues))][0]
+        return None
+
+    def _pop(self, ticket):
+        queues = self._queues[ticket.klass]
+        q = queues[ticket.user]
+        q.remove(ticket)
+        self._waiting -= 1
+        if q:
+            queues.move_to_end(ticket.user)     # round-robin: navbat oxiriga
+        else:
+            del queues[ticket.user]
+
+    def _dispatch(self):
+        self._promote(time.monotonic())
+        while self._active < self.max_concurrent:
+            ticket = self._next()
+            if ticket is None:
+                break
+            self._pop(ticket)
+            self._active += 1
+            self.stats["granted"] += 1
+            self.stats["peak_active"] = max(self.stats["peak_active"], self._active)
+            ticket.granted_at = time.monotonic()
+            ticket.position = 0
+            if not ticket.future.done():
+                ticket.future.set_result(ticket)
+        self._renumber()
+
+    def _renumber(self):
+        # Taqsimlash tartibini taqlid qilib, har bir kutayotganga o'rnini yozadi
+        position = 0
+        for queues in self._queues:
+            lanes = [collections.deque(q) for q in queues.values()]
+            while lanes:
+                remaining = []
+                for lane in lanes:
+                    position += 1
+                    lane.popleft().position = position
+                    if lane:
+                        remaining.append(lane)
+                lanes = remaining
+
+    async def _admit(self, ticket):
+        if ticket.cancelled:
+            # Chaqiruvchi navbatga kirishdan oldin voz kechgan
+            return ticket
+        ticket.future = self._loop.create_future()
+        if ticket.klass is None:
+            ticket.klass = SHORT if ticket.cost <= self.short_tokens else LONG
+        queues = self._queues[ticket.klass]
+        queues.setdefault(ticket.user, collections.deque()).append(ticket)
+        self._waiting += 1
+        self._dispatch()
+        # Uzun so'rovlar vaqt o'tib oldinga chiqishi uchun vaqti-vaqti bilan qayta
+        while not ticket.future.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(ticket.future), self.promote_after / 4)
+            except asyncio.TimeoutError:
+                self._dispatch()
+        return ticket
+
+    def _cancel(self, ticket):
+        if ticket.future is None:
+            # _admit hali ishlamagan: navbatda ham, klassi ham yo'q
+            ticket.cancelled = True
+            return
+        if ticket.granted_at is None:
+            try:
+                self._pop(ticket)
+            except (KeyError, ValueError):
+                pass
+            if not ticket.future.done():
+                ticket.future.cancel()
+            self._renumber()
+        else:
+            self._release(ticket)
+
+    def _release(self, ticket):
+        if ticket.released:
+            return
+        ticket.released = True
+        self._active -= 1
+        self._dispatch()
+
+    # ---------- chaqiruvchi thread'dan ----------
+    def acquire(self, user, cost, on_wait=None, klass=None):
+        """Slot berilguncha kutadi; on_wait(o'rin) navbat o'zgarganda chaqiriladi.
+
+        klass berilmasa — cost bo'yicha (fon ishlari LONG bilan keladi).
+        """
+        ticket = Ticket(user, cost, next(self._seq), time.monotonic(), klass)
+        pending = asyncio.run_coroutine_threadsafe(self._admit(ticket), self._loop)
+        shown = None
+        try:
+            while True:
+                try:
+                    return pending.result(timeout=POLL_INTERVAL)
+                except concurrent.futures.TimeoutError:
+                    if ticket.wait >= self.queue_timeout:
+                        self.stats["timeouts"] += 1
+                        raise LLMQueueTimeout("gateway queue timeout")
+                    if on_wait is not None and ticket.position and ticket.position != shown:
+                        shown = ticket.position
+                        on_wait(shown)
+        except BaseException:
+            # Sessiya to'xtatildi yoki timeout — navbatdan chiqariladi
+            self.stats["cancelled"] += 1
+            self._loop.call_soon_threadsafe(self._cancel, ticket)
+            raise
+
+    def release(self, ticket):
+        self._loop.call_soon_threadsafe(self._release, ticket)
+
+    def stream(self, user, cost, open_stream, on_wait=None):
+        """Slot olib open_stream() ni chaqiradi; slot stream bilan birga qaytadi."""
+        ticket = self.acquire(user, cost, on_wait)
+        try:
+            inner = open_stream()
+        except BaseException:
+            self.release(ticket)
+            raise
+        return _SlotStream(self, ticket, inner)
+
+    def waiting(self):
+        # Navbatlarni bu yerda aylanib chiqib bo'lmaydi — ularni loop o'zgartiradi
+        return self._waiting
+
+    def active(self):
+        return self._active
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+class _SlotStream:
+    """Stream o'rami: tugaganda, xato bo'lganda yoki yopilganda slotni qaytaradi."""
+
+    def __init__(self, gateway, ticket, inner):
+        self._gateway = gateway
+        self._ticket = ticket
+        self._inner = iter(inner)
+        self._done = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._inner)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        if self._done:
+            return
+        self._done = True
+        close = getattr(self._inner, "close", None)
+        try:
+            if close is not None:
+                close()
+        finally:
+            self._gateway.release(self._ticket)
+
+    def __del__(self):
+        self.close()
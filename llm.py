@@ -0,0 +1,162 @@
+import random
+import threading
+import time
+
+import httpx
+import openai
+from openai import OpenAI
+
+# ==========================================
+# 🔌 UMUMIY LLM KLIENT
+# ==========================================
+# Bitta OpenAI klient (va HTTP ulanishlar hovuzi) butun jarayon uchun.
+# Aniq timeout'lar, 429/5xx da jitter'li eksponensial qayta urinish va
+# xom matn o'rniga turlangan xatolar.
+
+DEFAULT_BASE_URL = "https://api.groq.com/openai/v1"
+
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 60.0
+WRITE_TIMEOUT = 10.0
+POOL_TIMEOUT = 5.0
+
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE = 20
+KEEPALIVE_EXPIRY = 120.0
+
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+
+
+class LLMError(Exception):
+    user_message = "AI xizmatida xatolik yuz berdi."
+    retryable = False
+
+
+class LLMRateLimited(LLMError):
+    user_message = "So'rovlar juda ko'p — birozdan so'ng qayta urinib ko'ring."
+    retryable = True
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LLMUnavailable(LLMError):
+    user_message = "AI xizmati vaqtincha ishlamayapti."
+    retryable = True
+
+
+class LLMTimeout(LLMUnavailable):
+    user_message = "AI xizmati javob bermadi (timeout)."
+
+
+class LLMRequestError(LLMError):
+    user_message = "So'rov rad etildi."
+
+
+def _retry_after(exc):
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def classify(exc):
+    """openai/httpx istisnosini LLMError turiga o'giradi."""
+    if isinstance(exc, LLMError):
+        return exc
+    if isinstance(exc, (openai.APITimeoutError, httpx.TimeoutException)):
+        return LLMTimeout(str(exc))
+    if isinstance(exc, openai.RateLimitError):
+        return LLMRateLimited(str(exc), _retry_after(exc))
+    if isinstance(exc, openai.APIStatusError):
+        if exc.status_code >= 500:
+            return LLMUnavailable(str(exc))
+        return LLMRequestError(str(exc))
+    if isinstance(exc, (openai.APIConnectionError, httpx.TransportError)):
+        return LLMUnavailable(str(exc))
+    return LLMError(str(exc))
+
+
+def backoff_delay(attempt, retry_after=None, rnd=random):
+    # "Full jitter": [0, min(cap, base * 2^attempt)]
+    delay = rnd.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+    if retry_after:
+        delay = max(delay, min(retry_after, BACKOFF_CAP))
+    return delay
+
+
+class LLMClient:
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL,
+                 max_retries=MAX_RETRIES, sleep=time.sleep):
+        self.max_retries = max_retries
+        self.sleep = sleep
+        timeout = httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT,
+                                write=WRITE_TIMEOUT, pool=POOL_TIMEOUT)
+        self._http = httpx.Client(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS,
+                                max_keepalive_connections=MAX_KEEPALIVE,
+                                keepalive_expiry=KEEPALIVE_EXPIRY))
+        # SDK ichidagi retry o'chiriladi — siyosat shu yerda
+        self.client = OpenAI(base_url=base_url, api_key=api_key,
+                             http_client=self._http, timeout=timeout,
+                             max_retries=0)
+
+    def _with_retries(self, call):
+        attempt = 0
+        while True:
+            try:
+                return call()
+            except Exception as exc:
+                err = classify(exc)
+                if not err.retryable or attempt >= self.max_retries:
+                    raise err from exc
+                self.sleep(backoff_delay(attempt, getattr(err, "retry_after", None)))
+                attempt += 1
+
+    def stream_chat(self, model, messages, **params):
+        """Stream'ni ochadi; o'qish vaqtidagi xatolar ham LLMError bo'lib chiqadi."""
+        stream = self._with_retries(lambda: self.client.chat.completions.create(
+            model=model, messages=messages, stream=True, **params))
+        return _guarded(stream)
+
+    def complete(self, model, messages, on_usage=None, **params):
+        """Oqimsiz so'rov; provayder usage qaytarsa on_usage(prompt, completion)."""
+        response = self._with_retries(lambda: self.client.chat.completions.create(
+            model=model, messages=messages, **params))
+        if on_usage is not None and getattr(response, "usage", None) is not None:
+            on_usage(response.usage.prompt_tokens, response.usage.completion_tokens)
+        return response.choices[0].message.content or ""
+
+    def warm_up(self):
+        """TLS ulanishni oldindan ochib qo'yadi (fon thread'ida, xatolar e'tiborsiz)."""
+        def ping():
+            try:
+                self.client.models.list()
+            except Exception:
+                pass
+        thread = threading.Thread(target=ping, name="zukko-llm-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        self._http.close()
+
+
+def _guarded(stream):
+    try:
+        for chunk in stream:
+            yield chunk
+    except Exception as exc:
+        raise classify(exc) from exc
+    finally:
+        # Oxirigacha o'qilmasa ham ulanish hovuzga qaytsin
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
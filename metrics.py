@@ -0,0 +1,277 @@
+import bisect
+import functools
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import db
+
+# ==========================================
+# ⏱️ METRIKALAR (HISTOGRAMMA + PROMETHEUS)
+# ==========================================
+# Issiq yo'llar (DB yordamchilari, LLM stream, TTS, sahifalar) vaqti
+# jarayon ichida histogrammalarga yig'iladi va lokal portda Prometheus
+# matn formatida beriladi. ZUKKO_METRICS o'rnatilmagan bo'lsa dekoratorlar
+# asl funksiyani o'zini qaytaradi — hech qanday qo'shimcha chaqiruv yo'q.
+#
+#   ZUKKO_METRICS=1 streamlit run app.py
+#   curl http://127.0.0.1:9464/metrics
+
+ENABLED = os.environ.get("ZUKKO_METRICS", "") not in ("", "0")
+HOST = os.environ.get("ZUKKO_METRICS_HOST", "127.0.0.1")
+PORT = int(os.environ.get("ZUKKO_METRICS_PORT", "9464"))
+BUCKETS = (0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+           0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+FOLD_AT = 4096
+DB_HELPERS = ("query", "query_one", "execute", "executemany")
+
+REGISTRY = []
+
+
+class _Series:
+    # Issiq yo'lda faqat list.append (GIL ostida atomar); bucket'larga
+    # taqsimlash o'qishda yoki FOLD_AT qiymat yig'ilganda qilinadi
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # oxirgisi — +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.pending = []
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        self.pending.append(value)
+        if len(self.pending) >= FOLD_AT:
+            self.fold()
+
+    def fold(self):
+        with self.lock:
+            n = len(self.pending)
+            values = self.pending[:n]
+            del self.pending[:n]
+            for value in values:
+                self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.sum += sum(values)
+            self.count += n
+
+    def snapshot(self):
+        self.fold()
+        with self.lock:
+            return list(self.counts), self.sum, self.count
+
+    def quantile(self, q):
+        return quantile(self.buckets, self.snapshot()[0], q)
+
+
+def quantile(buckets, counts, q):
+    """Bucket ichida chiziqli interpolyatsiya (Prometheus histogram_quantile kabi)."""
+    count = sum(counts)
+    if not count:
+        return None
+    rank = q * count
+    seen = 0
+    for i, n in enumerate(counts):
+        if seen + n >= rank and n:
+            if i == len(buckets):
+                return buckets[-1]
+            lower = buckets[i - 1] if i else 0.0
+            return lower + (buckets[i] - lower) * (rank - seen) / n
+        seen += n
+    return buckets[-1]
+
+
+class Histogram:
+    def __init__(self, name, description, labelnames=(), buckets=BUCKETS):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def labels(self, *values):
+        series = self._series.get(values)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(values, _Series(self.buckets))
+        return series
+
+    def series(self):
+        return sorted(self._series.items())
+
+
+DB_SECONDS = Histogram("zukko_db_seconds", "SQLite yordamchilari va transaction/connection doiralari", ("op",))
+DB_LOCK_WAIT = Histogram("zukko_db_lock_wait_seconds", "BEGIN IMMEDIATE yozish qulfini kutish")
+LLM_TTFT = Histogram("zukko_llm_ttft_seconds", "generate() dan birinchi bo'lakkacha", ("source",))
+LLM_SECONDS = Histogram("zukko_llm_seconds", "generate() dan stream oxirigacha", ("source",))
+TTS_SECONDS = Histogram("zukko_tts_seconds", "Ovoz: gap sintezi va yakuniy kutish", ("stage",))
+PAGE_SECONDS = Histogram("zukko_page_seconds", "Sahifa funksiyalari", ("page",))
+RERUN_SECONDS = Histogram("zukko_rerun_seconds", "Butun main() rerun")
+
+
+# ==========================================
+# 🪝 O'LCHASH YORDAMCHILARI
+# ==========================================
+def timed(histogram, *labels):
+    """Dekorator: funksiya vaqtini histogrammaga yozadi (o'chiq bo'lsa — o'zgarishsiz)."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        series = histogram.labels(*labels)
+        pending = series.pending
+        clock = time.perf_counter
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                pending.append(clock() - t0)
+                if len(pending) >= FOLD_AT:
+                    series.fold()
+        return wrapper
+    return decorate
+
+
+def timed_stream(stream, started, source):
+    """Stream'ni o'tkazadi; birinchi matnli bo'lak (TTFT) va oxirgi vaqtni yozadi."""
+    if not ENABLED:
+        return stream
+    return _timed_stream(stream, started, source)
+
+
+def _timed_stream(stream, started, source):
+    first = None
+    try:
+        for chunk in stream:
+            if first is None and chunk.choices and chunk.choices[0].delta.content:
+                first = time.perf_counter()
+                LLM_TTFT.labels(source).observe(first - started)
+            yield chunk
+    finally:
+        LLM_SECONDS.labels(source).observe(time.perf_counter() - started)
+
+
+def _scope_observer():
+    # op = "transaction:gamification.add_xp" — doirani ochgan funksiya bo'yicha;
+    # seriya har chaqiruv joyi uchun bir marta topiladi
+    by_code = {"connection": {}, "transaction": {}}
+
+    def observe(kind, code, module, seconds):
+        seen = by_code[kind]
+        series = seen.get(code)
+        if series is None:
+            where = getattr(code, "co_qualname", code.co_name)
+            if module and module != "__main__":
+                where = f"{module}.{where}"
+            series = seen.setdefault(code, DB_SECONDS.labels(f"{kind}:{where}"))
+        pending = series.pending
+        pending.append(seconds)
+        if len(pending) >= FOLD_AT:
+            series.fold()
+    return observe
+
+
+def instrument_db():
+    """db modulidagi yordamchilar va doiralarni o'lchovchi o'ramlar bilan almashtiradi (bir marta)."""
+    if getattr(db, "_instrumented", False):
+        return
+    for name in DB_HELPERS:
+        setattr(db, name, timed(DB_SECONDS, name)(getattr(db, name)))
+    db.scope_observer = _scope_observer()
+    db.lock_wait_observer = DB_LOCK_WAIT.labels().observe
+    db._instrumented = True
+
+
+# ==========================================
+# 📤 EKSPORT
+# ==========================================
+def _label_text(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def _le(bound):
+    return f"{bound:g}"
+
+
+def render():
+    """Prometheus text exposition (0.0.4)."""
+    lines = []
+    for h in REGISTRY:
+        lines.append(f"# HELP {h.name} {h.description}")
+        lines.append(f"# TYPE {h.name} histogram")
+        for values, series in h.series():
+            counts, total, count = series.snapshot()
+            cumulative = 0
+            for bound, n in zip(h.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else _le(bound)
+                labels = _label_text(h.labelnames, values, [("le", le)])
+                lines.append(f"{h.name}_bucket{labels} {cumulative}")
+            labels = _label_text(h.labelnames, values)
+            lines.append(f"{h.name}_sum{labels} {total:.6f}")
+            lines.append(f"{h.name}_count{labels} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def summary():
+    """Admin jadvali uchun: har seriya bo'yicha soni, jami va kvantillar (ms)."""
+    rows = []
+    for h in REGISTRY:
+        for values, series in h.series():
+            _, total, count = series.snapshot()
+            if not count:
+                continue
+            rows.append({
+                "metric": h.name,
+                "labels": ",".join(values),
+                "count": count,
+                "total_s": round(total, 3),
+                "mean_ms": round(total / count * 1000, 2),
+                "p50_ms": round(series.quantile(0.50) * 1000, 2),
+                "p95_ms": round(series.quantile(0.95) * 1000, 2),
+                "p99_ms": round(series.quantile(0.99) * 1000, 2),
+            })
+    return rows
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(host=HOST, port=PORT):
+    """/metrics ni fon thread'ida beradi. Port band bo'lsa (boshqa jarayon) — None."""
+    try:
+        server = ThreadingHTTPServer((host, port), _Handler)
+    except OSError:
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="zukko-metrics",
+                     daemon=True).start()
+    return server
+
+
+def setup():
+    """Jarayon boshida bir marta: DB o'ramlari va eksport porti."""
+    if not ENABLED:
+        return None
+    instrument_db()
+    return serve()
@@ -0,0 +1,219 @@
+import threading
+
+import db
+
+# ==========================================
+# 🧱 SXEMA MIGRATSIYALARI
+# ==========================================
+# Har bir qadam raqamlangan va PRAGMA user_version orqali bir marta
+# bajariladi. Yangi o'zgarish — ro'yxat oxiriga yangi funksiya qo'shing,
+# eskilarini hech qachon tahrirlamang.
+
+
+def _m001_base(c):
+    # Asosiy users jadvali (eski bazalarda ustunlar yetishmasligi mumkin)
+    c.execute('''CREATE TABLE IF NOT EXISTS users
+                 (username TEXT PRIMARY KEY, password TEXT, role TEXT)''')
+    existing = [row[1] for row in c.execute("PRAGMA table_info(users)").fetchall()]
+    new_columns = [
+        ("xp", "INTEGER DEFAULT 0"),
+        ("streak", "INTEGER DEFAULT 0"),
+        ("last_active", "TEXT DEFAULT ''"),
+        ("level", "INTEGER DEFAULT 1"),
+        ("badges", "TEXT DEFAULT '[]'"),
+        ("total_messages", "INTEGER DEFAULT 0"),
+        ("joined", "TEXT DEFAULT ''"),
+    ]
+    for col_name, col_type in new_columns:
+        if col_name not in existing:
+            c.execute(f"ALTER TABLE users ADD COLUMN {col_name} {col_type}")
+
+    c.execute('''CREATE TABLE IF NOT EXISTS logs
+                 (username TEXT, action TEXT, time TEXT)''')
+    c.execute('''CREATE TABLE IF NOT EXISTS quiz_scores
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  username TEXT, subject TEXT, score INTEGER,
+                  total INTEGER, time TEXT)''')
+    c.execute('''CREATE TABLE IF NOT EXISTS notes
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  username TEXT, title TEXT, content TEXT,
+                  subject TEXT, time TEXT)''')
+
+
+def _m002_indexes(c):
+    # Admin loglari: ORDER BY time DESC LIMIT 100
+    c.execute("CREATE INDEX IF NOT EXISTS idx_logs_time ON logs(time)")
+    # get_notes / get_quiz_history: username bo'yicha, vaqt tartibida (qoplovchi)
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_notes_user_time
+                 ON notes(username, time, title, subject)''')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_quiz_user_time
+                 ON quiz_scores(username, time, subject, score, total)''')
+    # Reyting: adminlarsiz, xp bo'yicha (qisman va qoplovchi)
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_users_leaderboard
+                 ON users(xp, username, level, streak, role)
+                 WHERE role != 'admin' ''')
+    c.execute("ANALYZE")
+
+
+def _m003_badges(c):
+    # Nishonlar JSON satridan alohida jadvalga
+    c.execute('''CREATE TABLE IF NOT EXISTS user_badges
+                 (username TEXT NOT NULL, badge TEXT NOT NULL, earned TEXT,
+                  PRIMARY KEY (username, badge)) WITHOUT ROWID''')
+    c.execute('''INSERT OR IGNORE INTO user_badges(username, badge, earned)
+                 SELECT u.username, j.value, COALESCE(NULLIF(u.last_active, ''), u.joined)
+                 FROM users u, json_each(u.badges) j
+                 WHERE json_valid(u.badges)''')
+
+    # Yutuq qoidalari: metrika qiymati threshold'dan o'tganda beriladi
+    c.execute('''CREATE TABLE IF NOT EXISTS badge_rules
+                 (badge TEXT PRIMARY KEY, metric TEXT NOT NULL,
+                  threshold INTEGER NOT NULL, description TEXT,
+                  position INTEGER)''')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_badge_rules_metric
+                 ON badge_rules(metric, threshold)''')
+    c.executemany('''INSERT OR IGNORE INTO badge_rules
+                     (badge, metric, threshold, description, position)
+                     VALUES (?,?,?,?,?)''', [
+        ("🌟 Birinchi Qadam", "total_messages", 1, "1 ta xabar yozing", 1),
+        ("💬 Suhbatdosh", "total_messages", 10, "10 ta xabar yozing", 2),
+        ("🔥 Faol O'quvchi", "total_messages", 50, "50 ta xabar yozing", 3),
+        ("🏆 Zukko Master", "total_messages", 100, "100 ta xabar yozing", 4),
+        ("📅 3 Kunlik Streak", "streak", 3, "3 kun ketma-ket kiring", 5),
+        ("🔥 Haftalik Streak", "streak", 7, "7 kun ketma-ket kiring", 6),
+        ("⭐ 5-Daraja", "level", 5, "5-darajaga yeting", 7),
+        ("👑 10-Daraja", "level", 10, "10-darajaga yeting", 8),
+    ])
+
+
+def _m004_llm_cache(c):
+    c.execute('''CREATE TABLE IF NOT EXISTS llm_cache
+                 (key TEXT PRIMARY KEY, response TEXT NOT NULL,
+                  created REAL NOT NULL, last_used REAL NOT NULL,
+                  hits INTEGER DEFAULT 0, size INTEGER NOT NULL)''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_cache(created)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used)')
+
+
+def _m005_notes_keyset(c):
+    # Keyset sahifalash (time, id) bo'yicha — id indeksda aniq ko'rsatiladi
+    c.execute('DROP INDEX IF EXISTS idx_notes_user_time')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_notes_user_time_id
+                 ON notes(username, time, id, title, subject)''')
+
+
+def _m006_notes_fts(c):
+    # Eslatmalar bo'yicha to'liq matnli qidiruv (tashqi kontentli FTS5).
+    # username ham indekslanadi — FTS o'zi egasining eslatmalari bilan kesishtiradi
+    c.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+                     title, content, username,
+                     content='notes', content_rowid='id',
+                     tokenize='unicode61 remove_diacritics 2', prefix='2 3')''')
+    # notes o'zgarganda indeks ham o'zgaradi
+    c.execute('''CREATE TRIGGER IF NOT EXISTS notes_fts_ai AFTER INSERT ON notes BEGIN
+                     INSERT INTO notes_fts(rowid, title, content, username)
+                     VALUES (new.id, new.title, new.content, new.username);
+                 END''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS notes_fts_ad AFTER DELETE ON notes BEGIN
+                     INSERT INTO notes_fts(notes_fts, rowid, title, content, username)
+                     VALUES ('delete', old.id, old.title, old.content, old.username);
+                 END''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS notes_fts_au
+                 AFTER UPDATE OF title, content, username ON notes BEGIN
+                     INSERT INTO notes_fts(notes_fts, rowid, title, content, username)
+                     VALUES ('delete', old.id, old.title, old.content, old.username);
+                     INSERT INTO notes_fts(rowid, title, content, username)
+                     VALUES (new.id, new.title, new.content, new.username);
+                 END''')
+    # Mavjud eslatmalar bir marta indekslanadi
+    c.execute("INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')")
+
+
+def _m007_activity_rollups(c):
+    # Kunlik hisoblagichlar: admin ko'rsatkichlari xom loglarni o'qimaydi
+    c.execute('''CREATE TABLE IF NOT EXISTS activity_daily
+                 (day TEXT NOT NULL, action TEXT NOT NULL, events INTEGER NOT NULL,
+                  PRIMARY KEY (day, action)) WITHOUT ROWID''')
+    c.execute('''CREATE TABLE IF NOT EXISTS activity_users
+                 (day TEXT NOT NULL, username TEXT NOT NULL, events INTEGER NOT NULL,
+                  PRIMARY KEY (day, username)) WITHOUT ROWID''')
+    # Mavjud loglardan bir martalik to'ldirish
+    c.execute('''INSERT OR IGNORE INTO activity_daily(day, action, events)
+                 SELECT substr(time, 1, 10), action, COUNT(*) FROM logs
+                 GROUP BY 1, 2''')
+    c.execute('''INSERT OR IGNORE INTO activity_users(day, username, events)
+                 SELECT substr(time, 1, 10), username, COUNT(*) FROM logs
+                 GROUP BY 1, 2''')
+
+
+def _m008_token_usage(c):
+    # Kunlik token yig'indilari (har so'rov uchun alohida qator emas)
+    c.execute('''CREATE TABLE IF NOT EXISTS token_usage
+                 (username TEXT NOT NULL, day TEXT NOT NULL, mentor TEXT NOT NULL,
+                  requests INTEGER NOT NULL DEFAULT 0,
+                  prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                  completion_tokens INTEGER NOT NULL DEFAULT 0,
+                  estimated INTEGER NOT NULL DEFAULT 0,
+                  PRIMARY KEY (username, day, mentor)) WITHOUT ROWID''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_token_usage_day ON token_usage(day)')
+
+
+def _m009_chat_history(c):
+    # Suhbatlar: xabarlar faqat qo'shiladi, katta matnlar siqilgan (codec)
+    c.execute('''CREATE TABLE IF NOT EXISTS conversations
+                 (id INTEGER PRIMARY KEY, username TEXT NOT NULL, mentor TEXT NOT NULL,
+                  created TEXT, updated TEXT, turns INTEGER NOT NULL DEFAULT 0,
+                  summary TEXT NOT NULL DEFAULT '', summary_upto INTEGER NOT NULL DEFAULT 0)''')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_conversations_user_mentor
+                 ON conversations(username, mentor, updated)''')
+    c.execute('''CREATE TABLE IF NOT EXISTS messages
+                 (id INTEGER PRIMARY KEY,
+                  conversation_id INTEGER NOT NULL REFERENCES conversations(id),
+                  seq INTEGER NOT NULL, role TEXT NOT NULL,
+                  content BLOB NOT NULL, codec INTEGER NOT NULL DEFAULT 0, time TEXT)''')
+    c.execute('''CREATE UNIQUE INDEX IF NOT EXISTS idx_messages_conversation_seq
+                 ON messages(conversation_id, seq)''')
+
+
+MIGRATIONS = [
+    (1, _m001_base),
+    (2, _m002_indexes),
+    (3, _m003_badges),
+    (4, _m004_llm_cache),
+    (5, _m005_notes_keyset),
+    (6, _m006_notes_fts),
+    (7, _m007_activity_rollups),
+    (8, _m008_token_usage),
+    (9, _m009_chat_history),
+]
+
+_lock = threading.Lock()
+_done_for = None
+
+
+def current_version(c):
+    return c.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate():
+    applied = []
+    for version, step in MIGRATIONS:
+        with db.transaction() as c:
+            # Boshqa jarayon bizdan oldin qo'llagan bo'lishi mumkin
+            if current_version(c) >= version:
+                continue
+            step(c)
+            c.execute(f"PRAGMA user_version = {version}")
+        applied.append(version)
+    return applied
+
+
+def ensure_schema():
+    """Jarayon davomida (har bir baza fayli uchun) faqat bir marta ishlaydi."""
+    global _done_for
+    if _done_for == db.DB_PATH:
+        return
+    with _lock:
+        if _done_for != db.DB_PATH:
+            migrate()
+            _done_for = db.DB_PATH
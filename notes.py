@@ -0,0 +1,102 @@
+import datetime
+import re
+
+import db
+
+# ==========================================
+# 📝 ESLATMALAR (SAHIFALAB)
+# ==========================================
+# Ro'yxat keyset bo'yicha sahifalanadi: (time, id) kursori, OFFSET yo'q.
+# Sahifadagi barcha matnlar bitta so'rovda olinadi — har eslatma uchun
+# alohida so'rov (N+1) qilinmaydi.
+
+PAGE_SIZE = 20
+SEARCH_LIMIT = 50
+SUBJECTS = ["Umumiy", "Ingliz tili", "IT", "Ona tili",
+            "Matematika", "Fizika", "Boshqa"]
+
+# Keyset sahifa so'rovlari (idx_notes_user_time_id); bench_queries shularni
+# EXPLAIN QUERY PLAN bilan tekshiradi.
+PAGE_SQL = '''SELECT id, title, subject, time FROM notes
+              WHERE username = ?
+              ORDER BY time DESC, id DESC LIMIT ?'''
+PAGE_AFTER_SQL = '''SELECT id, title, subject, time FROM notes
+                    WHERE username = ? AND (time, id) < (?, ?)
+                    ORDER BY time DESC, id DESC LIMIT ?'''
+
+_word = re.compile(r"\w+")
+
+
+def save_note(username, title, content, subject):
+    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    db.execute('''INSERT INTO notes(username, title, content, subject, time)
+                  VALUES (?,?,?,?,?)''',
+               (username, title, content, subject, now))
+
+
+def list_page(username, cursor=None, page_size=PAGE_SIZE):
+    """(qatorlar, keyingi_kursor). Kursor — oldingi sahifa oxiridagi (time, id)."""
+    if cursor is None:
+        rows = db.query(PAGE_SQL, (username, page_size + 1))
+    else:
+        time_, id_ = cursor
+        rows = db.query(PAGE_AFTER_SQL, (username, time_, id_, page_size + 1))
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = (rows[-1]["time"], rows[-1]["id"])
+    return rows, next_cursor
+
+
+def get_bodies(username, note_ids):
+    """{id: content} — butun sahifa uchun bitta so'rov."""
+    if not note_ids:
+        return {}
+    marks = ",".join("?" * len(note_ids))
+    rows = db.query(f'''SELECT id, content FROM notes
+                        WHERE username = ? AND id IN ({marks})''',
+                    (username, *note_ids))
+    return {r[0]: r[1] for r in rows}
+
+
+def delete_note(username, note_id):
+    db.execute('DELETE FROM notes WHERE id = ? AND username = ?', (note_id, username))
+
+
+# ==========================================
+# 🔎 QIDIRUV (FTS5)
+# ==========================================
+def match_query(text):
+    """Foydalanuvchi matnini xavfsiz FTS5 so'roviga aylantiradi."""
+    # Har so'z qo'shtirnoqda (operatorlar ishlamaydi), oxirgisi prefiks
+    words = _word.findall(text)
+    if not words:
+        return None
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search(username, text, subject=None, limit=SEARCH_LIMIT):
+    """bm25 bo'yicha saralangan natijalar; sarlavhadagi moslik og'irroq."""
+    match = match_query(text)
+    if match is None:
+        return []
+    # Egasi bo'yicha filtr FTS ichida: umumiy so'zlarda butun maktab
+    # bo'yicha bm25 hisoblanmaydi
+    match = f"{{title content}} : ({match})"
+    if _word.search(username):
+        owner = username.replace('"', '""')
+        match = f'username : "{owner}" AND {match}'
+    sql = '''SELECT n.id, n.title, n.subject, n.time,
+                    snippet(notes_fts, -1, '**', '**', '…', 16) AS snippet,
+                    bm25(notes_fts, 5.0, 1.0, 0.0) AS score
+             FROM notes_fts JOIN notes n ON n.id = notes_fts.rowid
+             WHERE notes_fts MATCH ? AND n.username = ?'''
+    params = [match, username]
+    if subject:
+        sql += " AND n.subject = ?"
+        params.append(subject)
+    sql += " ORDER BY score LIMIT ?"
+    params.append(limit)
+    return db.query(sql, params)
@@ -0,0 +1,159 @@
+import base64
+import functools
+import hashlib
+import hmac
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# ==========================================
+# 🔐 PAROLLAR: KDF, TEKSHIRISH HOVUZI, LIMITER
+# ==========================================
+# Xesh formati o'zini tavsiflaydi:  scrypt$ln=14,r=8,p=1$<tuz>$<xesh>
+# Narx (ln = log2 N) o'zgarsa, eski xeshlar kirishda qayta xeshlanadi.
+# Eski tuzsiz SHA-256 (64 hex) ham qabul qilinadi va darhol almashtiriladi.
+# scrypt GIL'ni qo'yib yuboradi, lekin har biri ~16 MiB xotira oladi —
+# shuning uchun tekshirish chegaralangan hovuzda bajariladi.
+
+SCHEME = "scrypt"
+COST_LN = int(os.environ.get("ZUKKO_SCRYPT_LN", "14"))
+BLOCK_SIZE = 8
+PARALLEL = 1
+SALT_BYTES = 16
+KEY_BYTES = 32
+VERIFY_WORKERS = int(os.environ.get("ZUKKO_VERIFY_WORKERS", str(os.cpu_count() or 2)))
+MAX_PENDING = VERIFY_WORKERS * 8
+
+
+class LoginBusy(Exception):
+    """Tekshirish navbati to'la — keyinroq urinish kerak."""
+
+
+def _b64(data):
+    return base64.b64encode(data).decode().rstrip("=")
+
+
+def _unb64(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _scrypt(password, salt, ln, r, p):
+    n = 1 << ln
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r, dklen=KEY_BYTES)
+
+
+def hash_password(password, ln=None):
+    ln = COST_LN if ln is None else ln
+    salt = os.urandom(SALT_BYTES)
+    key = _scrypt(password, salt, ln, BLOCK_SIZE, PARALLEL)
+    return f"{SCHEME}${'ln=%d,r=%d,p=%d' % (ln, BLOCK_SIZE, PARALLEL)}${_b64(salt)}${_b64(key)}"
+
+
+def _legacy(stored):
+    return len(stored) == 64 and all(ch in "0123456789abcdef" for ch in stored)
+
+
+def verify(password, stored):
+    """(to'g'ri, qayta_xeshlash_kerak)."""
+    if not stored:
+        return False, False
+    if _legacy(stored):
+        legacy = hashlib.sha256(password.encode()).hexdigest()
+        ok = hmac.compare_digest(legacy, stored)
+        return ok, ok
+    try:
+        scheme, params, salt, key = stored.split("$")
+        cost = dict(item.split("=") for item in params.split(","))
+        ln, r, p = int(cost["ln"]), int(cost["r"]), int(cost["p"])
+    except (ValueError, KeyError):
+        return False, False
+    if scheme != SCHEME:
+        return False, False
+    ok = hmac.compare_digest(_scrypt(password, _unb64(salt), ln, r, p), _unb64(key))
+    return ok, ok and (ln, r, p) != (COST_LN, BLOCK_SIZE, PARALLEL)
+
+
+@functools.lru_cache(maxsize=1)
+def dummy_hash():
+    # Mavjud bo'lmagan username uchun ham bir xil vaqt sarflanadi
+    return hash_password("zukko-dummy")
+
+
+class VerifyPool:
+    def __init__(self, workers=VERIFY_WORKERS, max_pending=MAX_PENDING):
+        self._pool = ThreadPoolExecutor(max_workers=workers,
+                                        thread_name_prefix="zukko-verify")
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def _run(self, fn, *args, wait=2.0, timeout=30.0):
+        if not self._slots.acquire(timeout=wait):
+            raise LoginBusy()
+        try:
+            return self._pool.submit(fn, *args).result(timeout=timeout)
+        finally:
+            self._slots.release()
+
+    def verify(self, password, stored):
+        return self._run(verify, password, stored)
+
+    def hash(self, password):
+        return self._run(hash_password, password)
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+
+
+# ==========================================
+# 🚦 TOKEN BUCKET LIMITER
+# ==========================================
+class TokenBucket:
+    """Har kalit uchun `burst` ta token, soniyasiga `rate` tadan to'ladi."""
+
+    def __init__(self, rate, burst, max_keys=100_000, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._buckets = {}      # kalit -> (tokenlar, oxirgi_vaqt)
+
+    def take(self, key):
+        """0 — ruxsat; aks holda necha soniyadan keyin urinish mumkin."""
+        now = self.clock()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                return (1 - tokens) / self.rate
+            self._buckets[key] = (tokens - 1, now)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return 0.0
+
+    def _prune(self, now):
+        # To'lib bo'lgan chelaklar saqlanmaydi — ular default holat bilan bir xil
+        full = [k for k, (t, last) in self._buckets.items()
+                if t + (now - last) * self.rate >= self.burst]
+        for key in full:
+            del self._buckets[key]
+
+
+class LoginLimiter:
+    # Maktab NAT ortida butun sinf bitta IP'dan kiradi — IP chelagi keng
+    def __init__(self, ip_rate=1.0, ip_burst=60, user_rate=1 / 12, user_burst=5):
+        self.by_ip = TokenBucket(ip_rate, ip_burst)
+        self.by_user = TokenBucket(user_rate, user_burst)
+
+    def check(self, ip, username):
+        """0 — ruxsat; aks holda kutish soniyalari. ip=None — IP chelagi o'tkaziladi."""
+        return max(self.check_ip(ip), self.by_user.take(username))
+
+    def check_ip(self, ip):
+        # Mijoz IP'si aniqlanmasa hamma bitta chelakka tushardi — butun maktab
+        # soniyasiga bitta kirish; bunday holda faqat username chelagi ishlaydi
+        if ip is None:
+            return 0.0
+        return self.by_ip.take(ip)
@@ -0,0 +1,20 @@
+import datetime
+
+import db
+
+# ==========================================
+# 📊 QUIZ NATIJALARI
+# ==========================================
+# SQL modul darajasida — benchmarks/bench_queries.py aynan shu so'rovning
+# EXPLAIN QUERY PLAN'ini tekshiradi.
+
+HISTORY_LIMIT = 20
+HISTORY_SQL = f'''SELECT subject, score, total, time FROM quiz_scores
+                  WHERE username = ? ORDER BY time DESC LIMIT {HISTORY_LIMIT}'''
+
+
+def save_score(username, subject, score, total):
+    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    db.execute('''INSERT INTO quiz_scores(username, subject, score, total, time)
+                  VALUES (?,?,?,?,?)''',
+               (username, subject, score, total, now))
@@ -0,0 +1,106 @@
+import threading
+from bisect import bisect_left, insort
+
+import db
+
+# ==========================================
+# 🏆 REYTING INDEKSI (jarayon uchun umumiy)
+# ==========================================
+# Kalit (-xp, username) bo'yicha saralangan ro'yxat. O'qishlar (top-N,
+# o'rin, qo'shnilar) bisect orqali O(log n); yozishda faqat o'zgargan
+# foydalanuvchi kaliti ko'chiriladi. Ishga tushganda SQLite'dan quriladi.
+
+
+class RankingIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._keys = []
+        self._users = {}
+        self._excluded = set()
+
+    def rebuild(self):
+        rows = db.query('SELECT username, role, xp, level, streak FROM users')
+        keys, users, excluded = [], {}, set()
+        for username, role, xp, level, streak in rows:
+            if role == 'admin':
+                excluded.add(username)
+                continue
+            xp = xp or 0
+            users[username] = {"username": username, "xp": xp,
+                               "level": level or 1, "streak": streak or 0}
+            keys.append((-xp, username))
+        keys.sort()
+        with self._lock:
+            self._keys, self._users, self._excluded = keys, users, excluded
+        return len(keys)
+
+    def _admit(self, username):
+        # Indeks qurilgandan keyin paydo bo'lgan foydalanuvchi (ro'yxatdan
+        # o'tish, users.py import) — roli bazadan; adminlar reytingga kirmaydi
+        row = db.query_one('SELECT role, xp, level, streak FROM users WHERE username = ?',
+                           (username,))
+        if row is None:
+            return None
+        with self._lock:
+            if row["role"] == 'admin':
+                self._excluded.add(username)
+                return None
+            entry = self._users.get(username)
+            if entry is None:
+                entry = {"username": username, "xp": row["xp"] or 0,
+                         "level": row["level"] or 1, "streak": row["streak"] or 0}
+                self._users[username] = entry
+                insort(self._keys, (-entry["xp"], username))
+            return entry
+
+    def update(self, username, xp=None, level=None, streak=None):
+        with self._lock:
+            if username in self._excluded:
+                return
+            known = username in self._users
+        if not known and self._admit(username) is None:
+            return
+        with self._lock:
+            entry = self._users.get(username)
+            if entry is None:
+                return
+            if xp is not None and xp != entry["xp"]:
+                del self._keys[bisect_left(self._keys, (-entry["xp"], username))]
+                insort(self._keys, (-xp, username))
+                entry["xp"] = xp
+            if level is not None:
+                entry["level"] = level
+            if streak is not None:
+                entry["streak"] = streak
+
+    def remove(self, username):
+        with self._lock:
+            entry = self._users.pop(username, None)
+            if entry is not None:
+                del self._keys[bisect_left(self._keys, (-entry["xp"], username))]
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _slice(self, start, stop):
+        # (o'rin, yozuv) — o'rin 1 dan boshlanadi
+        return [(i + 1, dict(self._users[name]))
+                for i, (_, name) in enumerate(self._keys[start:stop], start)]
+
+    def top(self, n=10):
+        with self._lock:
+            return self._slice(0, n)
+
+    def rank(self, username):
+        with self._lock:
+            entry = self._users.get(username)
+            if entry is None:
+                return None
+            return bisect_left(self._keys, (-entry["xp"], username)) + 1
+
+    def around(self, username, k=2):
+        with self._lock:
+            pos = self.rank(username)
+            if pos is None:
+                return []
+            return self._slice(max(0, pos - 1 - k), pos + k)
@@ -0,0 +1,133 @@
+import collections
+import hashlib
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+import db
+import streaming
+
+# ==========================================
+# 💾 LLM JAVOBLAR KESHI
+# ==========================================
+# Kalit: model + parametrlar + normallashtirilgan (system prompt, xabarlar).
+# Xotiradagi LRU -> SQLite jadvali (llm_cache), TTL va hajm bo'yicha
+# tozalash. Keshdan olingan javob xuddi stream kabi qayta "oqiziladi".
+
+MEMORY_ITEMS = 512
+TTL_SECONDS = 7 * 24 * 3600
+MAX_DB_BYTES = 50 * 1024 * 1024
+MAX_TURNS = 3               # faqat qisqa suhbatlar keshlanadi
+EVICT_EVERY = 100           # har shuncha yozuvda bir marta tozalash
+
+_spaces = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    return _spaces.sub(" ", text).strip().lower()
+
+
+def cacheable(messages):
+    return 0 < len(messages) <= MAX_TURNS
+
+
+def make_key(model, params, full_history):
+    payload = json.dumps({
+        "model": model,
+        "params": params,
+        "messages": [[m["role"], normalize_text(m["content"])] for m in full_history],
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def replay(text, chunk_size=24):
+    """Keshdagi javobni OpenAI stream chunk'lari shaklida qaytaradi."""
+    for i in range(0, len(text), chunk_size):
+        delta = SimpleNamespace(content=text[i:i + chunk_size])
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+class ResponseCache:
+    def __init__(self, memory_items=MEMORY_ITEMS, ttl=TTL_SECONDS,
+                 max_db_bytes=MAX_DB_BYTES, clock=time.time):
+        self.memory_items = memory_items
+        self.ttl = ttl
+        self.max_db_bytes = max_db_bytes
+        self.clock = clock
+        self._lru = collections.OrderedDict()   # key -> (created, text)
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "stores": 0}
+
+    def _remember(self, key, created, text):
+        self._lru[key] = (created, text)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.memory_items:
+            self._lru.popitem(last=False)
+
+    def get(self, key):
+        now = self.clock()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl:
+                    self._lru.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return entry[1]
+                del self._lru[key]
+
+        row = db.query_one('SELECT response, created FROM llm_cache WHERE key = ?', (key,))
+        if row is None or now - row[1] > self.ttl:
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+        db.execute('UPDATE llm_cache SET last_used = ?, hits = hits + 1 WHERE key = ?',
+                   (now, key))
+        with self._lock:
+            self._remember(key, row[1], row[0])
+            self.stats["db_hits"] += 1
+        return row[0]
+
+    def put(self, key, text):
+        now = self.clock()
+        db.execute('''INSERT OR REPLACE INTO llm_cache(key, response, created, last_used, hits, size)
+                      VALUES (?,?,?,?,0,?)''', (key, text, now, now, len(text.encode())))
+        with self._lock:
+            self._remember(key, now, text)
+            self.stats["stores"] += 1
+            self._puts += 1
+            evict = self._puts % EVICT_EVERY == 0
+        if evict:
+            self.evict()
+
+    def evict(self):
+        now = self.clock()
+        with db.transaction() as c:
+            c.execute('DELETE FROM llm_cache WHERE created < ?', (now - self.ttl,))
+            total = c.execute('SELECT COALESCE(SUM(size), 0) FROM llm_cache').fetchone()[0]
+            if total > self.max_db_bytes:
+                # Eng uzoq ishlatilmaganlardan boshlab, limitgacha
+                c.execute('''DELETE FROM llm_cache WHERE key IN (
+                                 SELECT key FROM (
+                                     SELECT key, SUM(size) OVER (
+                                         ORDER BY last_used DESC, key) AS running
+                                     FROM llm_cache)
+                                 WHERE running > ?)''', (self.max_db_bytes,))
+
+    def recording(self, key, stream):
+        """Stream'ni o'tkazib yuboradi; oxirigacha muvaffaqiyatli o'qilsa keshlaydi."""
+        parts = []
+        for chunk in stream:
+            parts.append(streaming.delta_text(chunk))
+            yield chunk
+        text = "".join(parts)
+        if text:
+            self.put(key, text)
+
+    def hit_rate(self):
+        with self._lock:
+            hits = self.stats["memory_hits"] + self.stats["db_hits"]
+            seen = hits + self.stats["misses"]
+        return hits / seen if seen else 0.0
@@ -0,0 +1,50 @@
+import threading
+
+import gamification
+
+# ==========================================
+# ⚡ SESSIYA STATISTIKA KESHI
+# ==========================================
+# Bitta rerun'da get_user_stats bir necha marta chaqiriladi (sidebar,
+# dashboard, statistika...). Kesh sessiya ichida saqlanadi va
+# gamification.version() o'zgarganda (har bir yozuvdan keyin) eskiradi.
+
+_lock = threading.Lock()
+totals = {"hits": 0, "misses": 0}
+
+
+def _count(key):
+    with _lock:
+        totals[key] += 1
+
+
+def hit_rate():
+    with _lock:
+        seen = totals["hits"] + totals["misses"]
+        return totals["hits"] / seen if seen else 0.0
+
+
+class SessionStatsCache:
+    def __init__(self):
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, username, loader=gamification.get_user_stats):
+        current = gamification.version(username)
+        entry = self._entries.get(username)
+        if entry is not None and entry[0] == current:
+            self.hits += 1
+            _count("hits")
+            return entry[1]
+        stats = loader(username)
+        self._entries[username] = (current, stats)
+        self.misses += 1
+        _count("misses")
+        return stats
+
+    def invalidate(self, username=None):
+        if username is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(username, None)
@@ -0,0 +1,81 @@
+import collections
+import time
+
+# ==========================================
+# 📡 STREAM RENDERER
+# ==========================================
+# Har bir chunk uchun placeholder.markdown(butun_matn) chaqirish O(n²):
+# o'sib borayotgan javob qayta-qayta yuboriladi va chiziladi. Bu yerda
+# bo'laklar ro'yxatga yig'iladi va faqat vaqt yoki bayt limiti to'lganda
+# chiziladi.
+
+CURSOR = "▌"
+
+# Oxirgi javoblar o'lchovlari (admin/metrikalar uchun)
+history = collections.deque(maxlen=200)
+
+
+def delta_text(chunk):
+    if not chunk.choices:
+        return ""
+    return chunk.choices[0].delta.content or ""
+
+
+class StreamRenderer:
+    def __init__(self, render, interval=0.08, max_bytes=512, started=None,
+                 on_delta=None, clock=time.perf_counter):
+        self.render = render
+        self.on_delta = on_delta
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.started = started if started is not None else clock()
+        self.parts = []
+        self.stats = {}
+
+    def consume(self, stream):
+        """Stream'ni oxirigacha o'qiydi va to'liq matnni qaytaradi."""
+        first_at = None
+        last_flush = self.started
+        pending = 0
+        tokens = 0
+        renders = 0
+        rendered_bytes = 0
+
+        for chunk in stream:
+            text = delta_text(chunk)
+            if not text:
+                continue
+            now = self.clock()
+            if first_at is None:
+                first_at = now
+            tokens += 1
+            self.parts.append(text)
+            if self.on_delta is not None:
+                self.on_delta(text)
+            pending += len(text)
+            if pending >= self.max_bytes or now - last_flush >= self.interval:
+                shown = "".join(self.parts)
+                self.render(shown + CURSOR)
+                renders += 1
+                rendered_bytes += len(shown)
+                last_flush = now
+                pending = 0
+
+        full_text = "".join(self.parts)
+        self.render(full_text)
+        renders += 1
+        rendered_bytes += len(full_text)
+
+        finished = self.clock()
+        gen_time = finished - first_at if first_at is not None else 0.0
+        self.stats = {
+            "ttft": first_at - self.started if first_at is not None else None,
+            "total": finished - self.started,
+            "tokens": tokens,
+            "tokens_per_s": tokens / gen_time if gen_time > 0 else 0.0,
+            "renders": renders,
+            "rendered_bytes": rendered_bytes,
+        }
+        history.append(self.stats)
+        return full_text
@@ -0,0 +1,101 @@
+import argparse
+import hashlib
+import os
+import re
+import sys
+import urllib.request
+
+# ==========================================
+# 🎨 MAVZU: CSS'NI STATIK FAYL SIFATIDA BERISH
+# ==========================================
+# assets/theme.css (manba) -> static/theme.min.css. Streamlit uni
+# /app/static/ orqali beradi (.streamlit/config.toml: enableStaticServing),
+# sahifaga esa har rerun'da faqat kichik <link> tegi yuboriladi. Brauzer
+# faylni bir marta yuklab keshlaydi; ?v=<xesh> mazmun o'zgarganda yangilaydi.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SOURCE = os.path.join(ROOT, "assets", "theme.css")
+STATIC_DIR = os.path.join(ROOT, "static")
+OUTPUT = os.path.join(STATIC_DIR, "theme.min.css")
+FONT_DIR = os.path.join(STATIC_DIR, "fonts")
+STATIC_URL = "./app/static"
+
+# Inter (variable, wght 100-900) repoda YO'Q — static/fonts bo'sh keladi va
+# shrift yuklanmaguncha system-ui ishlatiladi. Deploy paytida bir marta:
+# python theme.py --fonts (Fontsource, versiya qotirilgan)
+FONT_VERSION = "5.2.5"
+FONT_URL = ("https://cdn.jsdelivr.net/fontsource/fonts/inter:vf@" + FONT_VERSION
+            + "/{subset}-wght-normal.woff2")
+FONT_SUBSETS = ("latin", "latin-ext", "cyrillic", "cyrillic-ext")
+
+_comments = re.compile(r"/\*.*?\*/", re.S)
+_spaces = re.compile(r"\s+")
+_around = re.compile(r"\s*([{};,>])\s*")
+_after_colon = re.compile(r":\s+")
+
+
+def minify(css):
+    # Konservativ: selektorlardagi ":" oldidagi bo'shliq saqlanadi
+    # (".a :hover" != ".a:hover"), calc() ichidagi "+ -" tegilmaydi
+    css = _comments.sub("", css)
+    css = _spaces.sub(" ", css)
+    css = _around.sub(r"\1", css)
+    css = _after_colon.sub(":", css)
+    return css.replace(";}", "}").strip()
+
+
+def version(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def build(force=False):
+    """Manba o'zgargan bo'lsa qayta quradi; (yo'l, versiya) qaytaradi."""
+    stale = (force or not os.path.exists(OUTPUT)
+             or os.path.getmtime(OUTPUT) < os.path.getmtime(SOURCE))
+    if stale:
+        with open(SOURCE, encoding="utf-8") as f:
+            data = minify(f.read()).encode()
+        os.makedirs(STATIC_DIR, exist_ok=True)
+        tmp = OUTPUT + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, OUTPUT)
+    else:
+        with open(OUTPUT, "rb") as f:
+            data = f.read()
+    return OUTPUT, version(data)
+
+
+def link_tag():
+    _, v = build()
+    return f'<link rel="stylesheet" href="{STATIC_URL}/theme.min.css?v={v}">'
+
+
+def missing_fonts():
+    return [s for s in FONT_SUBSETS
+            if not os.path.exists(os.path.join(FONT_DIR, f"inter-{s}-wght-normal.woff2"))]
+
+
+def fetch_fonts():
+    os.makedirs(FONT_DIR, exist_ok=True)
+    for subset in missing_fonts():
+        path = os.path.join(FONT_DIR, f"inter-{subset}-wght-normal.woff2")
+        with urllib.request.urlopen(FONT_URL.format(subset=subset), timeout=30) as r:
+            data = r.read()
+        with open(path, "wb") as f:
+            f.write(data)
+        print(f"  {os.path.relpath(path, ROOT)}  {len(data) / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CSS mavzusini qurish")
+    parser.add_argument("--fonts", action="store_true",
+                        help="Inter shriftlarini static/fonts ga yuklab olish")
+    args = parser.parse_args()
+    if args.fonts:
+        fetch_fonts()
+    path, v = build(force=True)
+    print(f"{os.path.relpath(path, ROOT)}  {os.path.getsize(path)} bayt  v={v}")
+    if missing_fonts():
+        print(f"Ogohlantirish: shriftlar yo'q ({', '.join(missing_fonts())}) — "
+              f"system-ui ishlatiladi. python theme.py --fonts", file=sys.stderr)
@@ -0,0 +1,91 @@
+import hashlib
+import io
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+# ==========================================
+# 🎵 OVOZ (TTS) — STREAM BILAN PARALLEL
+# ==========================================
+# Javob hali oqib kelayotganda tugagan gaplar darhol sintezga yuboriladi.
+# Oxirida MP3 bo'laklar tartib bo'yicha ulanadi. Backend almashtiriladi:
+# synthesize(text, lang, slow) -> bytes.
+
+LANG = 'tr'
+MIN_SEGMENT_CHARS = 120     # juda qisqa gaplar qo'shnisiga qo'shiladi
+MAX_CHARS = 6000
+POOL_WORKERS = 8
+
+_pool = ThreadPoolExecutor(max_workers=POOL_WORKERS, thread_name_prefix="zukko-tts")
+
+_sentence_end = re.compile(r"(?<=[.!?…:;])\s+|\n+")
+
+
+def clean_text(text):
+    # Bo'laklarda ``` bo'linib kelishi mumkin — barcha backtick'lar olinadi
+    return text.replace("`", "").replace("#", "").replace("*", "")
+
+
+def cache_key(text, lang=LANG, slow=False):
+    clean = " ".join(clean_text(text).split())
+    return hashlib.sha256(f"{lang}\0{int(slow)}\0{clean}".encode()).hexdigest()
+
+
+class GTTSBackend:
+    def synthesize(self, text, lang=LANG, slow=False):
+        # Faqat shu backend uchun kerak — soxta backend'lar gTTS'siz ishlaydi
+        from gtts import gTTS
+        buf = io.BytesIO()
+        gTTS(text=text, lang=lang, slow=slow).write_to_fp(buf)
+        return buf.getvalue()
+
+
+class SpeechJob:
+    def __init__(self, backend, lang=LANG, slow=False, pool=_pool):
+        self.backend = backend
+        self.lang = lang
+        self.slow = slow
+        self.pool = pool
+        self._buffer = ""
+        self._segment = ""
+        self._chars = 0
+        self._futures = []
+
+    def _submit(self, segment):
+        segment = segment.strip()
+        if not segment or self._chars >= MAX_CHARS:
+            return
+        segment = segment[:MAX_CHARS - self._chars]
+        self._chars += len(segment)
+        self._futures.append(self.pool.submit(
+            self.backend.synthesize, segment, self.lang, self.slow))
+
+    def _take(self, sentence):
+        self._segment = f"{self._segment} {sentence}" if self._segment else sentence
+        if len(self._segment) >= MIN_SEGMENT_CHARS:
+            self._submit(self._segment)
+            self._segment = ""
+
+    def feed(self, delta):
+        """Stream'dan kelgan matn bo'lagi; tugagan gaplar sintezga ketadi."""
+        self._buffer += clean_text(delta)
+        parts = _sentence_end.split(self._buffer)
+        self._buffer = parts.pop()
+        for sentence in parts:
+            if sentence.strip():
+                self._take(sentence.strip())
+
+    def finish(self, timeout=60):
+        """Qolgan matnni yuboradi va barcha bo'laklarni ulab MP3 qaytaradi."""
+        if self._buffer.strip():
+            self._take(self._buffer.strip())
+        self._buffer = ""
+        if self._segment:
+            self._submit(self._segment)
+            self._segment = ""
+        audio = bytearray()
+        for future in self._futures:
+            try:
+                audio += future.result(timeout=timeout)
+            except Exception:
+                continue  # bitta bo'lak xatosi butun ovozni buzmasin
+        return bytes(audio) if audio else None
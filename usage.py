@@ -0,0 +1,125 @@
+import datetime
+import os
+
+import context
+import db
+import llm
+import streaming
+
+# ==========================================
+# 🔢 TOKEN HISOBI VA KVOTALAR
+# ==========================================
+# Har so'rovning prompt/completion tokenlari stream oxiridagi usage
+# bo'lagidan olinadi (stream_options.include_usage); provayder bermasa —
+# lokal tokenizer bilan taxmin. Yozuvlar write-behind navbati orqali
+# token_usage (user, kun, mentor) jadvaliga guruhlab qo'shiladi.
+# Kunlik va oylik kvota so'rov yuborilishidan oldin tekshiriladi.
+
+DAILY_TOKENS = int(os.environ.get("ZUKKO_DAILY_TOKENS", "100000"))       # 0 — cheksiz
+MONTHLY_TOKENS = int(os.environ.get("ZUKKO_MONTHLY_TOKENS", "1500000"))
+STREAM_OPTIONS = {"include_usage": True}
+
+
+class QuotaExceeded(llm.LLMError):
+    retryable = False
+
+    def __init__(self, period, used, limit):
+        super().__init__(f"{period} quota exceeded: {used}/{limit}")
+        self.period = period
+        self.used = used
+        self.limit = limit
+        when = "ertaga" if period == "daily" else "keyingi oy"
+        self.user_message = (f"Token limiti tugadi ({used:,}/{limit:,}). "
+                             f"Limit {when} yangilanadi.")
+
+
+def _today():
+    return datetime.date.today()
+
+
+def record(username, mentor, prompt_tokens, completion_tokens, estimated=False, day=None):
+    """Write-behind handler: bitta so'rovni kunlik yig'indiga qo'shadi."""
+    day = day or _today().isoformat()
+    with db.transaction() as c:
+        c.execute('''INSERT INTO token_usage(username, day, mentor, requests,
+                         prompt_tokens, completion_tokens, estimated)
+                     VALUES (?,?,?,1,?,?,?)
+                     ON CONFLICT(username, day, mentor) DO UPDATE SET
+                         requests = requests + 1,
+                         prompt_tokens = prompt_tokens + excluded.prompt_tokens,
+                         completion_tokens = completion_tokens + excluded.completion_tokens,
+                         estimated = estimated + excluded.estimated''',
+                  (username, day, mentor or "", prompt_tokens, completion_tokens,
+                   int(estimated)))
+
+
+def used(username, today=None):
+    """(bugun, shu oy) sarflangan tokenlar."""
+    today = today or _today()
+    row = db.query_one('''SELECT COALESCE(SUM(CASE WHEN day = ? THEN prompt_tokens
+                                                  + completion_tokens END), 0),
+                                 COALESCE(SUM(prompt_tokens + completion_tokens), 0)
+                          FROM token_usage WHERE username = ? AND day >= ?''',
+                       (today.isoformat(), username, today.replace(day=1).isoformat()))
+    return row[0], row[1]
+
+
+def check_quota(username, estimate=0, daily=DAILY_TOKENS, monthly=MONTHLY_TOKENS):
+    day_used, month_used = used(username)
+    if daily and day_used + estimate > daily:
+        raise QuotaExceeded("daily", day_used, daily)
+    if monthly and month_used + estimate > monthly:
+        raise QuotaExceeded("monthly", month_used, monthly)
+
+
+def _usage_of(chunk):
+    # OpenAI: chunk.usage; Groq eski javoblarda: chunk.x_groq.usage
+    usage = getattr(chunk, "usage", None)
+    if usage is None:
+        extra = getattr(chunk, "x_groq", None)
+        usage = extra.get("usage") if isinstance(extra, dict) else getattr(extra, "usage", None)
+    if usage is None:
+        return None
+    if isinstance(usage, dict):
+        return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+    return usage.prompt_tokens, usage.completion_tokens
+
+
+def metered(stream, prompt_estimate, on_usage):
+    """Stream'ni o'tkazadi; oxirida (yoki uzilganda) on_usage(prompt, completion, taxminiy)."""
+    parts = []
+    reported = None
+    try:
+        for chunk in stream:
+            counts = _usage_of(chunk)
+            if counts is not None:
+                reported = counts
+            parts.append(streaming.delta_text(chunk))
+            yield chunk
+    finally:
+        # Birinchi bo'lakdan oldin uzilgan (navbat timeout'i va h.k.) so'rov hisoblanmaydi
+        if reported is not None:
+            on_usage(reported[0], reported[1], False)
+        elif parts:
+            on_usage(prompt_estimate, context.count_tokens("".join(parts)), True)
+
+
+def _since(days):
+    return (_today() - datetime.timedelta(days=days - 1)).isoformat()
+
+
+def top_consumers(days=30, limit=10):
+    return db.query('''SELECT username, SUM(requests) AS requests,
+                              SUM(prompt_tokens) AS prompt_tokens,
+                              SUM(completion_tokens) AS completion_tokens,
+                              SUM(prompt_tokens + completion_tokens) AS total
+                       FROM token_usage WHERE day >= ?
+                       GROUP BY username ORDER BY total DESC LIMIT ?''',
+                    (_since(days), limit))
+
+
+def by_mentor(days=30):
+    return db.query('''SELECT mentor, SUM(requests) AS requests,
+                              SUM(prompt_tokens + completion_tokens) AS total
+                       FROM token_usage WHERE day >= ?
+                       GROUP BY mentor ORDER BY total DESC''', (_since(days),))
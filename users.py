@@ -0,0 +1,255 @@
+import argparse
+import csv
+import datetime
+import itertools
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import db
+import migrations
+import passwords
+
+ROLES = ("student", "admin")
+IMPORT_BATCH = 5000
+HASH_CHUNK = 256
+EXPORT_COLUMNS = ["username", "role", "xp", "level", "streak",
+                  "total_messages", "joined", "last_active"]
+
+
+def _now():
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _insert(c, username, password_hash, role, now):
+    """Yangi foydalanuvchi; username band bo'lsa False (istisnosiz)."""
+    return c.execute('''INSERT INTO users(username, password, role, xp, streak,
+                        last_active, level, badges, total_messages, joined)
+                        VALUES (?,?,?,0,0,?,1,'[]',0,?)
+                        ON CONFLICT(username) DO NOTHING''',
+                     (username, password_hash, role, now, now)).rowcount == 1
+
+
+def create_user(username, password, role="student", pool=None):
+    # KDF sekin — tranzaksiyadan tashqarida; ilovada chegaralangan hovuzda
+    if pool is not None:
+        password_hash = pool.hash(password)
+    else:
+        password_hash = passwords.hash_password(password)
+    now = _now()
+    with db.transaction() as c:
+        return _insert(c, username.lower().strip(), password_hash, role, now)
+
+
+def authenticate(username, password, pool):
+    """To'g'ri bo'lsa users qatori, aks holda None. Eski xeshlar almashtiriladi."""
+    username = username.lower().strip()
+    row = db.query_one('SELECT username, password, role FROM users WHERE username = ?',
+                       (username,))
+    stored = row["password"] if row else passwords.dummy_hash()
+    ok, rehash = pool.verify(password, stored)
+    if row is None or not ok:
+        return None
+    if rehash:
+        # Parallel kirishda boshqa sessiya allaqachon almashtirgan bo'lishi mumkin
+        db.execute('UPDATE users SET password = ? WHERE username = ? AND password = ?',
+                   (pool.hash(password), username, stored))
+    return row
+
+
+# ==========================================
+# 👥 FOYDALANUVCHILAR (ADMIN KO'RINISHI)
+# ==========================================
+# Filtr, saralash va sahifalash SQL'da bajariladi: xotirada faqat bitta
+# sahifa turadi, jami soni COUNT bilan olinadi. Sahifalash keyset —
+# kursor oldingi sahifa oxiridagi (saralash qiymati, username).
+
+PAGE_SIZE = 50
+COLUMNS = "username, role, xp, level, streak, total_messages, joined"
+
+# nom -> (ustun, kamayish tartibida)
+SORTS = {
+    "xp": ("xp", True),
+    "level": ("level", True),
+    "total_messages": ("total_messages", True),
+    "streak": ("streak", True),
+    "joined": ("joined", True),
+    "username": ("username", False),
+}
+
+
+def _where(role=None, min_level=None, max_level=None, search=None):
+    clauses, params = [], []
+    if role:
+        clauses.append("role = ?")
+        params.append(role)
+    if min_level is not None:
+        clauses.append("level >= ?")
+        params.append(min_level)
+    if max_level is not None:
+        clauses.append("level <= ?")
+        params.append(max_level)
+    if search:
+        clauses.append("instr(username, ?) > 0")
+        params.append(search.lower().strip())
+    return clauses, params
+
+
+def count(role=None, min_level=None, max_level=None, search=None):
+    clauses, params = _where(role, min_level, max_level, search)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return db.query_one(f"SELECT COUNT(*) FROM users {where}", params)[0]
+
+
+def count_by_role():
+    return {r[0]: r[1] for r in db.query("SELECT role, COUNT(*) FROM users GROUP BY role")}
+
+
+def browse(sort="xp", cursor=None, page_size=PAGE_SIZE,
+           role=None, min_level=None, max_level=None, search=None):
+    """(qatorlar, keyingi_kursor) — bitta sahifa."""
+    column, desc = SORTS[sort]
+    clauses, params = _where(role, min_level, max_level, search)
+    if cursor is not None:
+        value, username = cursor
+        op = "<" if desc else ">"
+        if column == "username":
+            clauses.append(f"username {op} ?")
+            params.append(username)
+        else:
+            clauses.append(f"({column}, username) {op} (?, ?)")
+            params.extend((value, username))
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    direction = "DESC" if desc else "ASC"
+    order = "username" if column == "username" else f"{column} {direction}, username"
+    rows = db.query(f'''SELECT {COLUMNS} FROM users {where}
+                        ORDER BY {order} {direction} LIMIT ?''',
+                    (*params, page_size + 1))
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = (rows[-1][column], rows[-1]["username"])
+    return rows, next_cursor
+
+
+# ==========================================
+# 📥 CSV IMPORT / EKSPORT
+# ==========================================
+# Import: CSV oqim bo'lib o'qiladi, parollar jarayonlar hovuzida
+# xeshlanadi, har IMPORT_BATCH qator bitta tranzaksiyada yoziladi.
+# Band username yoki noto'g'ri qator butun partiyani to'xtatmaydi —
+# errors ro'yxatiga (qator raqami, username, sabab) tushadi.
+
+def _parse(lineno, row):
+    username = (row.get("username") or "").lower().strip()
+    password = row.get("password") or ""
+    role = (row.get("role") or "student").strip().lower()
+    if not username:
+        return None, (lineno, username, "username bo'sh")
+    if not password:
+        return None, (lineno, username, "parol bo'sh")
+    if role not in ROLES:
+        return None, (lineno, username, f"noma'lum rol: {role}")
+    return (lineno, username, password, role), None
+
+
+def import_csv(path, batch_size=IMPORT_BATCH, workers=None, on_error=None):
+    """{"created", "failed", "errors"} qaytaradi; on_error(qator, username, sabab)."""
+    created = 0
+    errors = []
+
+    def fail(error):
+        errors.append(error)
+        if on_error is not None:
+            on_error(*error)
+
+    def write(batch, hashes):
+        nonlocal created
+        hashes = list(hashes)   # xeshlar tranzaksiyadan oldin tayyor bo'lsin
+        now = _now()
+        with db.transaction() as c:
+            for (lineno, username, _, role), password_hash in zip(batch, hashes):
+                if _insert(c, username, password_hash, role, now):
+                    created += 1
+                else:
+                    fail((lineno, username, "username band"))
+
+    with open(path, newline="", encoding="utf-8-sig") as f, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        # 1-qator sarlavha, ma'lumotlar 2-qatordan
+        rows = enumerate(csv.DictReader(f), start=2)
+        previous = None
+        while True:
+            batch = []
+            for lineno, row in itertools.islice(rows, batch_size):
+                parsed, error = _parse(lineno, row)
+                if error:
+                    fail(error)
+                else:
+                    batch.append(parsed)
+            # Keyingi partiya xeshlanayotganda oldingisi yoziladi
+            current = None
+            if batch:
+                plain = [b[2] for b in batch]
+                current = (batch, pool.map(passwords.hash_password, plain,
+                                           chunksize=HASH_CHUNK))
+            if previous is not None:
+                write(*previous)
+            if current is None:
+                break
+            previous = current
+    return {"created": created, "failed": len(errors), "errors": sorted(errors)}
+
+
+def export_csv(out, role=None):
+    """Parollarsiz eksport; qatorlar kursor orqali oqim bo'lib yoziladi."""
+    writer = csv.writer(out)
+    writer.writerow(EXPORT_COLUMNS)
+    clauses, params = _where(role=role)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    written = 0
+    with db.connection() as conn:
+        cur = conn.execute(f"SELECT {', '.join(EXPORT_COLUMNS)} FROM users {where} "
+                           f"ORDER BY username", params)
+        while True:
+            rows = cur.fetchmany(1000)
+            if not rows:
+                break
+            writer.writerows(tuple(r) for r in rows)
+            written += len(rows)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="O'quvchilarni CSV orqali import/eksport qilish")
+    parser.add_argument("--db", default=db.DB_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="CSV: username,password[,role]")
+    imp.add_argument("csv")
+    imp.add_argument("--batch", type=int, default=IMPORT_BATCH)
+    imp.add_argument("--workers", type=int, default=None)
+    exp = sub.add_parser("export")
+    exp.add_argument("csv", nargs="?", default="-")
+    exp.add_argument("--role", choices=ROLES)
+    args = parser.parse_args(argv)
+
+    db.configure(args.db)
+    migrations.ensure_schema()
+    if args.command == "import":
+        result = import_csv(
+            args.csv, args.batch, args.workers,
+            on_error=lambda line, user, reason: print(
+                f"{args.csv}:{line}: {user or '-'}: {reason}", file=sys.stderr))
+        print(f"{result['created']} ta qo'shildi, {result['failed']} ta xato")
+        return 1 if result["failed"] else 0
+    if args.csv == "-":
+        written = export_csv(sys.stdout, args.role)
+    else:
+        with open(args.csv, "w", newline="", encoding="utf-8") as out:
+            written = export_csv(out, args.role)
+    print(f"{written} ta eksport qilindi", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())